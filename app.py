@@ -1,20 +1,81 @@
-from flask import Flask, request, render_template, Response, jsonify
-from backend.flow import main_pipeline
+from flask import Flask, Request, request, render_template, Response, jsonify, stream_with_context
+from backend.flow import batch_pipeline, plan_stages
+from backend import jobs, metrics
+from backend.worker import start_workers
+from backend.extractor.file_loader import (MAX_FILE_SIZE_MB, HashingFileWriter, get_extension,
+                                           validate_extension)
+import atexit
 import uuid
 import os
 import json
 import time
 
 
+UPLOAD_FOLDER = "uploads"
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+# JSONL text dumps for /batch may be far bigger than a single upload
+MAX_JSONL_SIZE_MB = float(os.environ.get("SOCION_MAX_JSONL_MB", "512"))
+
+
+class IngestRequest(Request):
+    """Write uploaded files straight into UPLOAD_FOLDER, hashing and size-checking as they stream in."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        is_jsonl = get_extension(filename or "") in (".jsonl", ".ndjson")
+        return HashingFileWriter(UPLOAD_FOLDER, MAX_JSONL_SIZE_MB if is_jsonl else MAX_FILE_SIZE_MB)
+
+
 app = Flask(__name__, template_folder="templates", static_folder="static")
+app.request_class = IngestRequest
 
 
-UPLOAD_FOLDER = "uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Worker processes started by `python app.py` itself. Set to 0 when workers
+# run separately (python -m backend.worker).
+LOCAL_WORKERS = int(os.environ.get("SOCION_LOCAL_WORKERS", "1"))
+
+# How long a stream waits on a job that makes no progress
+STREAM_TIMEOUT_S = float(os.environ.get("SOCION_STREAM_TIMEOUT", "600"))
+
+# Scrape-time gauges read from the jobs DB
+metrics.QUEUE_DEPTH.set_function(jobs.queue_depth)
+metrics.READY_WORKERS.set_function(lambda: sum(1 for w in jobs.live_workers() if w["ready"]))
+
 
 
-# Store uploaded file locations
-TASKS = {}
+def save_upload(file, prefix):
+    """
+    Keep an uploaded file: it is already on disk, so this is a rename.
+
+    Returns:
+        tuple: (path, sha256 hex digest). Raises ValueError for a bad
+        extension or a file over the size limit.
+    """
+    validate_extension(file.filename)
+    stream = file.stream
+    filepath = os.path.join(UPLOAD_FOLDER, f"{prefix}_{os.path.basename(file.filename)}")
+    return stream.commit(filepath), stream.hexdigest()
+
+
+
+def analysis_options(values):
+    """
+    The "profile" / "outputs" a request asks for (query string or form;
+    outputs may repeat or be comma-separated), checked against the planner.
+
+    Returns:
+        dict: Options for main_pipeline / batch_pipeline (empty = defaults).
+        Raises ValueError for an unknown profile or output.
+    """
+    options = {}
+    outputs = [name.strip() for item in values.getlist("outputs") for name in item.split(",") if name.strip()]
+    if outputs:
+        options["outputs"] = outputs
+    if values.get("profile"):
+        options["profile"] = values.get("profile")
+    if options:
+        plan_stages(options.get("outputs"), options.get("profile"))
+    return options
 
 
 
@@ -39,6 +100,30 @@ def dashboard():
 
 
 
+@app.route("/ready", methods=["GET"])
+def ready():
+    """Readiness probe – 200 once at least one worker has its models loaded."""
+    workers = jobs.live_workers()
+    status = {
+        "ready": any(w["ready"] for w in workers),
+        "workers": [{"id": w["id"], "host": w["host"], "ready": bool(w["ready"])} for w in workers],
+        "queue_depth": jobs.queue_depth(),
+    }
+    return jsonify(status), (200 if status["ready"] else 503)
+
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus text exposition: stage histograms, error counters, queue / stream gauges."""
+    try:
+        metrics.collect_job_metrics(jobs.consume_job_metrics)
+    except Exception as e:
+        print(f"[WARN] couldn't read job metrics: {e}")
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+
 # ----------------------------------------------------
 # 1️⃣ UPLOAD FILE
 # ----------------------------------------------------
@@ -56,13 +141,21 @@ def upload():
 
 
     task_id = str(uuid.uuid4())
-    filepath = os.path.join(UPLOAD_FOLDER, file.filename)
+
+    # ?timings=1 adds elapsed / per-stage timings to every progress event
+    options = {}
+    if request.args.get("timings") is not None:
+        options["event_timings"] = request.args.get("timings") not in ("0", "false")
 
 
     try:
-        file.save(filepath)
-        TASKS[task_id] = filepath
+        options.update(analysis_options(request.values))
+        # Prefix with the task id so concurrent uploads of the same name don't collide
+        filepath, content_hash = save_upload(file, task_id)
+        jobs.enqueue_job(filepath, content_hash=content_hash, options=options, job_id=task_id)
         print(f"[INFO] File saved: {filepath}")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print("[ERROR] Couldn't save file:", e)
         return jsonify({"error": "Failed to save file"}), 500
@@ -77,25 +170,40 @@ def upload():
 # ----------------------------------------------------
 @app.route("/analyze_stream/<task_id>", methods=["GET"])
 def analyze_stream(task_id):
-    if task_id not in TASKS:
+    if jobs.get_job(task_id) is None:
         return Response(
             "event: error\ndata: Invalid Task ID\n\n",
             mimetype="text/event-stream"
         )
 
-
-    filepath = TASKS[task_id]
+    try:
+        options = analysis_options(request.args)
+    except ValueError as e:
+        return Response(f"event: error\ndata: {e}\n\n", mimetype="text/event-stream")
+    # Profile / outputs can still change until a worker claims the job;
+    # both are replaced so a new profile isn't overridden by older outputs
+    if options:
+        options = {"outputs": options.get("outputs", []), "profile": options.get("profile")}
+    if options and not jobs.update_job_options(task_id, options):
+        print(f"[WARN] job {task_id} already started; can't apply {options}")
+        return Response(
+            "event: error\ndata: Analysis already started; pass profile/outputs to /upload instead\n\n",
+            mimetype="text/event-stream"
+        )
 
 
-    def send_progress(step_text, progress_value):
-        data = json.dumps({"step": step_text, "progress": progress_value})
+    def send_progress(step_text, progress_value, extra=None):
+        payload = {"step": step_text, "progress": progress_value}
+        payload.update(extra or {})
+        data = json.dumps(payload)
         return f"event: progress\ndata: {data}\n\n"
 
 
     def generate():
+        metrics.ACTIVE_STREAMS.inc(endpoint="analyze_stream")
         try:
-            # Stream from main_pipeline generator
-            for event in main_pipeline(filepath):
+            # Tail the job's progress log written by a worker process
+            for _seq, event in jobs.tail_events(task_id, timeout=STREAM_TIMEOUT_S):
                 try:
                     data = json.loads(event)
                     if isinstance(data, dict) and "result" in data:
@@ -107,7 +215,8 @@ def analyze_stream(task_id):
                         # Progress step
                         step = data.get("step", "Processing...")
                         progress = data.get("progress", 0)
-                        yield send_progress(step, progress)
+                        extra = {k: data[k] for k in ("elapsed_s", "timing", "error") if k in data}
+                        yield send_progress(step, progress, extra)
                 except json.JSONDecodeError:
                     # Fallback for non-JSON yields (if any)
                     yield send_progress(str(event), 0)
@@ -116,20 +225,136 @@ def analyze_stream(task_id):
                     break
 
 
-            # Cleanup
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            if task_id in TASKS:
-                del TASKS[task_id]
-
-
         except Exception as e:
             yield f"event: error\ndata: {str(e)}\n\n"
+        finally:
+            metrics.ACTIVE_STREAMS.dec(endpoint="analyze_stream")
 
 
     return Response(generate(), mimetype="text/event-stream")
 
 
 
+# ----------------------------------------------------
+# 3️⃣ BATCH ANALYSIS — MANY FILES OR A JSONL OF TEXTS
+# ----------------------------------------------------
+def iter_jsonl_documents(lines):
+    """
+    Yield {"id", "text"} dicts from JSONL lines; ids default to the line number.
+    A line that isn't a string or an object with a string "text" yields
+    {"id", "error"} instead, so one bad record can't abort the batch.
+    """
+    for line_no, line in enumerate(lines, start=1):
+        try:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            yield {"id": line_no, "error": f"Invalid JSON line: {e}"}
+            continue
+        if isinstance(record, str):
+            record = {"text": record}
+        if not isinstance(record, dict):
+            yield {"id": line_no, "error": f"Expected a string or an object, got {type(record).__name__}"}
+            continue
+        doc_id = record.get("id", line_no)
+        if not isinstance(doc_id, (str, int, float)):
+            doc_id = line_no
+        text = record.get("text")
+        if text is not None and not isinstance(text, str):
+            yield {"id": doc_id, "error": f'"text" must be a string, got {type(text).__name__}'}
+            continue
+        yield {"id": doc_id, "text": text}
+
+
+def iter_jsonl_file(path):
+    """iter_jsonl_documents over a stored JSONL file, opened on first use."""
+    with open(path, "rb") as f:
+        yield from iter_jsonl_documents(f)
+
+
+@app.route("/batch", methods=["POST"])
+def batch():
+    """
+    Accepts multipart "files" (many uploads), a multipart "texts" JSONL file,
+    or a raw application/x-ndjson body of {"id": ..., "text": ...} lines.
+    Streams one `event: document` per input, then `event: done`.
+    ?profile= / ?outputs= pick which analyses run (see plan_stages).
+    """
+    try:
+        options = analysis_options(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    saved_paths = []
+    sources = []
+
+    files = request.files.getlist("files")
+    for file in files:
+        if not file or file.filename == "":
+            continue
+        try:
+            filepath, _content_hash = save_upload(file, uuid.uuid4())
+        except Exception as e:
+            for path in saved_paths:
+                os.remove(path)
+            if isinstance(e, ValueError):
+                return jsonify({"error": f"{file.filename}: {e}"}), 400
+            print("[ERROR] Couldn't save file:", e)
+            return jsonify({"error": f"Failed to save {file.filename}"}), 500
+        saved_paths.append(filepath)
+    if saved_paths:
+        sources.append([{"id": os.path.basename(p).split("_", 1)[1], "path": p} for p in saved_paths])
+
+    texts_file = request.files.get("texts")
+    if texts_file:
+        if texts_file.stream.too_large:
+            for path in saved_paths:
+                os.remove(path)
+            return jsonify({"error": f"texts file exceeds the limit of {MAX_JSONL_SIZE_MB}MB"}), 400
+        # The response streams after the request (and its upload temp files)
+        # is closed: keep the file under its own name and read it from there
+        texts_path = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4()}_texts.jsonl")
+        saved_paths.append(texts_file.stream.commit(texts_path))
+        sources.append(iter_jsonl_file(texts_path))
+    elif not files and request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        # Read lazily so huge backfills never sit in memory all at once
+        sources.append(iter_jsonl_documents(request.stream))
+
+    if not sources:
+        return jsonify({"error": "No files or texts supplied"}), 400
+
+    batch_size = request.args.get("batch_size", type=int)
+
+    def documents():
+        for source in sources:
+            yield from source
+
+    def generate():
+        metrics.ACTIVE_STREAMS.inc(endpoint="batch")
+        try:
+            for event in batch_pipeline(documents(), batch_size=batch_size, **options):
+                yield f"event: document\ndata: {event}\n\n"
+            yield "event: done\ndata: complete\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {str(e)}\n\n"
+        finally:
+            metrics.ACTIVE_STREAMS.dec(endpoint="batch")
+            for path in saved_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream")
+
+
+
 if __name__ == "__main__":
+    # With the debug reloader only the child process (WERKZEUG_RUN_MAIN) serves
+    if LOCAL_WORKERS and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        _worker_processes, _worker_stop = start_workers(LOCAL_WORKERS)
+        # Let workers finish their current job and exit with the app
+        atexit.register(_worker_stop.set)
     app.run(debug=True)
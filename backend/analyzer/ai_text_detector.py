@@ -1,23 +1,44 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch.nn.functional as F
 import json
+from ..inference_server import infer
+from ..model_registry import get_model
+from ..onnx_backend import load_sequence_classifier
 
 class AITextDetector:
-    def __init__(self, model_name="roberta-base-openai-detector"):
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    def __init__(self, model_name="roberta-base-openai-detector", backend="torch"):
+        # backend: "torch", "onnx" or "onnx-int8" (see backend/onnx_backend.py)
+        self.model, self.tokenizer = load_sequence_classifier(model_name, backend)
 
     def detect_ai(self, text):
-        inputs = self.tokenizer(text, 
-                                return_tensors="pt", 
-                                truncation=True, 
-                                max_length=512, 
-                                padding=True)
-        outputs = self.model(**inputs)
-        probs = F.softmax(outputs.logits, dim=1)
-        # Assume label 1 is AI-generated, label 0 is human-written
-        ai_prob = probs[0][1].item()
-        return {"ai_generated_probability": ai_prob}
+        return self.detect_ai_batch([text])[0]
+
+    def detect_ai_batch(self, texts, batch_size=16):
+        """Score many texts, `batch_size` padded sequences per forward pass."""
+        import torch
+        import torch.nn.functional as F
+
+        results = []
+        texts = list(texts)
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(texts[start:start + batch_size],
+                                    return_tensors="pt",
+                                    truncation=True,
+                                    max_length=512,
+                                    padding=True)
+            with torch.no_grad():
+                outputs = self.model(**inputs)
+            probs = F.softmax(outputs.logits, dim=1)
+            # Assume label 1 is AI-generated, label 0 is human-written
+            results.extend({"ai_generated_probability": p[1].item()} for p in probs)
+        return results
+
+def detect_ai_text(text):
+    """AI-generated probability for one text using the shared detector."""
+    # Coalesced with concurrent callers into one forward pass
+    return infer("ai_detector", text, detect_ai_text_batch)
+
+def detect_ai_text_batch(texts):
+    """AI-generated probabilities for many texts using the shared detector."""
+    return get_model("ai_detector").detect_ai_batch(texts)
 
 if __name__ == "__main__":
     detector = AITextDetector()
@@ -1,5 +1,128 @@
-from transformers import pipeline
+import contextlib
 import json
+import os
+import threading
+from ..model_registry import get_model
+from ..inference_server import infer
+
+DEFAULT_CANDIDATE_LABELS = ["Technology", "Education", "Marketing", "Health", "Finance", "Entertainment","Social Media","Sports","Politics","Environment","Travel","Food","Science","Business","Art","Culture","History","Literature","Music","Fashion","Automotive","Real Estate","Legal","Psychology","Philosophy","Religion","Economics","Medicine","Engineering","Agriculture","Telecommunications","Energy","Non-Profit",
+                            "Human Resources","Customer Service","Project Management","Supply Chain","Logistics","Retail","E-commerce","Hospitality","Tourism","Media","Journalism","Advertising","Public Relations","Event Management","Urban Planning","Architecture","Design","Animation","Gaming","Film","Theater","Dance","Photography","Comics","Crafts","DIY","Parenting","Relationships","Wellness","Fitness","Nutrition",
+                            "Mental Health","Spirituality","Self-Improvement","Productivity","Time Management","Leadership","Entrepreneurship","Startups","Investing","Personal Finance","Cryptocurrency","Blockchain","Artificial Intelligence","Machine Learning","Data Science","Big Data","Cloud Computing","Cybersecurity","Software Development","Web Development","Mobile Apps","Gadgets","Wearables","Virtual Reality","Augmented Reality",
+                            "Internet of Things","Smart Home","Robotics","Space Exploration","Climate Change","Sustainability","Wildlife Conservation","Oceanography","Meteorology","Geology","Archaeology","Anthropology","Sociology","Linguistics","Cognitive Science","Neuroscience","Genetics","Biotechnology","Pharmacology","Public Health","Epidemiology","Veterinary Medicine","Dentistry","Nursing",
+                            "Cardiology","Neurology","Gynecology","Psychiatry","Dermatology","ENT","Orthopedics","Emergency Medicine"]
+
+# "exhaustive": run NLI against every candidate label; the score is the
+# label's share of a softmax over all labels (the zero-shot pipeline).
+# "prefilter": shortlist labels by embedding similarity, then run NLI on the
+# shortlist only; the score is the label's own entailment probability
+# (multi-label), so it is on a different, higher scale and the top label can
+# differ. Opt-in until benchmarks/category_benchmark.py shows accuracy parity.
+CATEGORY_MODE = os.environ.get("SOCION_CATEGORY_MODE", "exhaustive")
+PREFILTER_TOP_K = int(os.environ.get("SOCION_CATEGORY_TOP_K", "8"))
+
+# Same hypothesis the zero-shot pipeline builds for each label
+HYPOTHESIS_TEMPLATE = "This example is {}."
+
+# Label embeddings are computed once per label set
+_label_embeddings = {}
+_label_embeddings_lock = threading.Lock()
+
+
+def _get_label_embeddings(candidate_labels):
+    """Normalized embedding matrix for a label set (cached)."""
+    key = tuple(candidate_labels)
+    embeddings = _label_embeddings.get(key)
+    if embeddings is None:
+        with _label_embeddings_lock:
+            embeddings = _label_embeddings.get(key)
+            if embeddings is None:
+                model = get_model("sentence_embedder")
+                embeddings = model.encode(list(key), convert_to_numpy=True, normalize_embeddings=True)
+                _label_embeddings[key] = embeddings
+    return embeddings
+
+
+def shortlist_labels(texts, candidate_labels, top_k=PREFILTER_TOP_K):
+    """
+    Pick the `top_k` labels closest to each text by cosine similarity.
+
+    Args:
+        texts (list): Input text strings.
+        candidate_labels (list): Labels to choose from.
+        top_k (int): Labels kept per text.
+
+    Returns:
+        list: One list of labels per text, most similar first.
+    """
+    import numpy as np
+
+    label_embeddings = _get_label_embeddings(candidate_labels)
+    model = get_model("sentence_embedder")
+    text_embeddings = model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True)
+
+    # Cosine similarity of normalized vectors is a plain dot product
+    similarities = text_embeddings @ label_embeddings.T
+    top_k = min(top_k, len(candidate_labels))
+    shortlists = []
+    for row in similarities:
+        best = np.argpartition(-row, top_k - 1)[:top_k]
+        best = best[np.argsort(-row[best])]
+        shortlists.append([candidate_labels[i] for i in best])
+    return shortlists
+
+
+def _no_grad():
+    try:
+        import torch
+    except ImportError:
+        return contextlib.nullcontext()
+    return torch.no_grad()
+
+
+def entailment_scores(classifier, texts, shortlists, batch_size=8):
+    """
+    Entailment probability of each text against each label of its own
+    shortlist – the zero-shot pipeline's multi_label scores, so a label's
+    score doesn't depend on which other labels were shortlisted. Pairs from
+    all texts share the same padded forward passes.
+
+    Args:
+        classifier: The zero-shot pipeline (its model and tokenizer are used).
+        texts (list): Input text strings.
+        shortlists (list): One list of labels per text.
+        batch_size (int): Premise/hypothesis pairs per forward pass.
+
+    Returns:
+        list: One {label: probability} dict per text, in order.
+    """
+    import numpy as np
+
+    model, tokenizer = classifier.model, classifier.tokenizer
+    label2id = {name.lower(): index for name, index in model.config.label2id.items()}
+    entail = next(index for name, index in label2id.items() if name.startswith("entail"))
+    contra = next(index for name, index in label2id.items() if name.startswith("contra"))
+
+    pairs = [(text, label) for text, labels in zip(texts, shortlists) for label in labels]
+    probabilities = []
+    for start in range(0, len(pairs), batch_size):
+        chunk = pairs[start:start + batch_size]
+        inputs = tokenizer([text for text, _ in chunk],
+                           [HYPOTHESIS_TEMPLATE.format(label) for _, label in chunk],
+                           truncation="only_first", padding=True, return_tensors="pt")
+        with _no_grad():
+            logits = model(**inputs).logits
+        logits = logits.detach().cpu().numpy() if hasattr(logits, "detach") else np.asarray(logits)
+        # Entailment vs contradiction only, as the pipeline does for multi_label
+        logits = logits[:, [contra, entail]]
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities.extend((exp[:, 1] / exp.sum(axis=1)).tolist())
+
+    scores, position = [], 0
+    for labels in shortlists:
+        scores.append(dict(zip(labels, probabilities[position:position + len(labels)])))
+        position += len(labels)
+    return scores
+
 
 def classify_category(text, candidate_labels=None):
     """
@@ -13,19 +136,48 @@ def classify_category(text, candidate_labels=None):
         dict: Predicted category label and confidence score.
     """
     if candidate_labels is None:
-        candidate_labels = ["Technology", "Education", "Marketing", "Health", "Finance", "Entertainment","Social Media","Sports","Politics","Environment","Travel","Food","Science","Business","Art","Culture","History","Literature","Music","Fashion","Automotive","Real Estate","Legal","Psychology","Philosophy","Religion","Economics","Medicine","Engineering","Agriculture","Telecommunications","Energy","Non-Profit",
-                            "Human Resources","Customer Service","Project Management","Supply Chain","Logistics","Retail","E-commerce","Hospitality","Tourism","Media","Journalism","Advertising","Public Relations","Event Management","Urban Planning","Architecture","Design","Animation","Gaming","Film","Theater","Dance","Photography","Comics","Crafts","DIY","Parenting","Relationships","Wellness","Fitness","Nutrition",
-                            "Mental Health","Spirituality","Self-Improvement","Productivity","Time Management","Leadership","Entrepreneurship","Startups","Investing","Personal Finance","Cryptocurrency","Blockchain","Artificial Intelligence","Machine Learning","Data Science","Big Data","Cloud Computing","Cybersecurity","Software Development","Web Development","Mobile Apps","Gadgets","Wearables","Virtual Reality","Augmented Reality",
-                            "Internet of Things","Smart Home","Robotics","Space Exploration","Climate Change","Sustainability","Wildlife Conservation","Oceanography","Meteorology","Geology","Archaeology","Anthropology","Sociology","Linguistics","Cognitive Science","Neuroscience","Genetics","Biotechnology","Pharmacology","Public Health","Epidemiology","Veterinary Medicine","Dentistry","Nursing",
-                            "Cardiology","Neurology","Gynecology","Psychiatry","Dermatology","ENT","Orthopedics","Emergency Medicine"]
+        # Coalesced with concurrent callers into one batched call
+        return infer("category", text, classify_category_batch)
+    return classify_category_batch([text], candidate_labels)[0]
+
+def classify_category_batch(texts, candidate_labels=None, batch_size=8, mode=None, top_k=None):
+    """
+    Classify many texts; NLI pairs are run as padded mini-batches.
+
+    Args:
+        texts (list): Input text strings.
+        candidate_labels (list): List of possible categories (default common domains).
+        batch_size (int): Premise/hypothesis pairs per forward pass.
+        mode (str): "prefilter" or "exhaustive" (default: CATEGORY_MODE).
+        top_k (int): Shortlist size in prefilter mode (default: PREFILTER_TOP_K).
+
+    Returns:
+        list: One [label, score] pair per input text, in order. In exhaustive
+        mode the score is a softmax share over all labels; in prefilter mode
+        it is the label's own entailment probability (multi-label NLI), so
+        scores from the two modes are not comparable.
+    """
+    if not texts:
+        return []
+    if candidate_labels is None:
+        candidate_labels = DEFAULT_CANDIDATE_LABELS
+    mode = mode or CATEGORY_MODE
+    top_k = top_k or PREFILTER_TOP_K
+
+    classifier = get_model("category")
+
+    if mode == "prefilter" and top_k < len(candidate_labels):
+        # Each text has its own shortlist; all texts' pairs are batched together
+        scores = entailment_scores(classifier, list(texts), shortlist_labels(texts, candidate_labels, top_k),
+                                   batch_size=batch_size)
+        return [list(max(text_scores.items(), key=lambda item: item[1])) for text_scores in scores]
 
-    classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-    result = classifier(text, candidate_labels)
-    top_label = result['labels'][0]
-    top_score = result['scores'][0]
+    results = classifier(list(texts), candidate_labels, batch_size=batch_size)
+    if isinstance(results, dict):
+        # Pipeline unwraps single-item lists
+        results = [results]
 
-    return [top_label,top_score]
-    
+    return [[result['labels'][0], result['scores'][0]] for result in results]
 
 
 # Example usage and test
@@ -0,0 +1,102 @@
+import os
+
+from .tokenization import encode_texts
+
+# Sliding-window settings for texts longer than the model's context
+CHUNK_LONG_TEXTS = os.environ.get("SOCION_CHUNK_LONG_TEXTS", "1") != "0"
+CHUNK_MAX_TOKENS = int(os.environ.get("SOCION_CHUNK_MAX_TOKENS", "512"))
+CHUNK_OVERLAP = int(os.environ.get("SOCION_CHUNK_OVERLAP", "64"))
+
+
+def split_token_windows(token_ids, window_size, overlap=CHUNK_OVERLAP):
+    """
+    Split token ids into windows of at most `window_size` tokens.
+
+    Consecutive windows share `overlap` tokens so no sentence is only ever
+    seen cut in half.
+
+    Args:
+        token_ids (list): Token ids without special tokens.
+        window_size (int): Maximum tokens per window.
+        overlap (int): Tokens shared by consecutive windows.
+
+    Returns:
+        list: List of token id lists (one empty window for empty input).
+    """
+    if window_size <= 0:
+        raise ValueError("window_size must be positive")
+    overlap = max(0, min(overlap, window_size - 1))
+    if len(token_ids) <= window_size:
+        return [list(token_ids)]
+
+    stride = window_size - overlap
+    windows = []
+    for start in range(0, len(token_ids), stride):
+        windows.append(list(token_ids[start:start + window_size]))
+        if start + window_size >= len(token_ids):
+            break
+    return windows
+
+
+def classify_long_texts(text_pipeline, texts, max_tokens=CHUNK_MAX_TOKENS,
+                        overlap=CHUNK_OVERLAP, batch_size=16):
+    """
+    Label probabilities for texts of any length with a sequence classifier.
+
+    Each text is tokenized once per vocabulary family (encodings are shared
+    with other models on the same vocabulary) and split into overlapping
+    windows; the windows of all texts run as length-sorted padded batches
+    and each text's scores are averaged over its windows, weighted by
+    window length.
+
+    Args:
+        text_pipeline: A Hugging Face text-classification pipeline.
+        texts (list): Input text strings.
+        max_tokens (int): Window size including special tokens.
+        overlap (int): Tokens shared by consecutive windows.
+        batch_size (int): Windows per forward pass.
+
+    Returns:
+        list: One {label: probability} dict per input text, in order.
+    """
+    import torch
+
+    tokenizer = text_pipeline.tokenizer
+    model = text_pipeline.model
+    max_tokens = min(max_tokens, tokenizer.model_max_length)
+    body_size = max_tokens - tokenizer.num_special_tokens_to_add()
+
+    # 1. Tokenize and window every text
+    windows, owners = [], []
+    for idx, ids in enumerate(encode_texts(tokenizer, list(texts))):
+        for window in split_token_windows(ids, body_size, overlap):
+            windows.append(window)
+            owners.append(idx)
+
+    # 2. Run all windows as padded batches; sorting by length keeps padding
+    #    (wasted compute) to a minimum
+    order = sorted(range(len(windows)), key=lambda i: len(windows[i]))
+    probabilities = [None] * len(windows)
+    for start in range(0, len(order), batch_size):
+        chunk = order[start:start + batch_size]
+        encoded = [tokenizer.build_inputs_with_special_tokens(windows[i]) for i in chunk]
+        batch = tokenizer.pad({"input_ids": encoded}, return_tensors="pt")
+        with torch.no_grad():
+            logits = model(**batch).logits
+        for i, probs in zip(chunk, torch.softmax(logits, dim=-1).tolist()):
+            probabilities[i] = probs
+
+    # 3. Length-weighted average per text
+    labels = [model.config.id2label[i] for i in range(model.config.num_labels)]
+    totals = [[0.0] * len(labels) for _ in texts]
+    weights = [0 for _ in texts]
+    for owner, window, probs in zip(owners, windows, probabilities):
+        weight = max(len(window), 1)
+        weights[owner] += weight
+        for i, p in enumerate(probs):
+            totals[owner][i] += weight * p
+
+    return [
+        {label: total / weights[idx] for label, total in zip(labels, totals[idx])}
+        for idx in range(len(texts))
+    ]
@@ -1,6 +1,59 @@
-from sentence_transformers import SentenceTransformer, util
-import numpy as np
 import json
+import os
+import threading
+from collections import OrderedDict
+from ..model_registry import get_model
+from ..inference_server import infer
+from ..result_cache import hash_bytes
+
+# Paragraph embeddings kept per process, keyed by content hash, so a
+# re-uploaded or lightly edited document only embeds what changed
+EMBEDDING_CACHE_SIZE = int(os.environ.get("SOCION_EMBEDDING_CACHE_SIZE", "50000"))
+# Paragraphs handed to the encoder per call; bounds peak memory on huge documents
+ENCODE_CHUNK_SIZE = int(os.environ.get("SOCION_ENCODE_CHUNK_SIZE", "512"))
+
+_embedding_cache = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+def embed_paragraphs(paragraphs, batch_size=64):
+    """
+    Unit-normalized embeddings for `paragraphs`, one row each, in order.
+
+    Cached paragraphs are not re-encoded; the rest are encoded once per
+    distinct text, ENCODE_CHUNK_SIZE at a time.
+    """
+    import numpy as np
+
+    keys = [hash_bytes(p) for p in paragraphs]
+    vectors = {}
+    with _embedding_cache_lock:
+        for key in keys:
+            vector = _embedding_cache.get(key)
+            if vector is not None:
+                _embedding_cache.move_to_end(key)
+                vectors[key] = vector
+
+    missing = {}
+    for key, paragraph in zip(keys, paragraphs):
+        if key not in vectors:
+            missing.setdefault(key, paragraph)
+
+    if missing:
+        model = get_model("sentence_embedder")
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), ENCODE_CHUNK_SIZE):
+            chunk = missing_keys[start:start + ENCODE_CHUNK_SIZE]
+            encoded = model.encode([missing[key] for key in chunk], batch_size=batch_size,
+                                   convert_to_numpy=True, normalize_embeddings=True)
+            encoded = np.asarray(encoded, dtype=np.float32)
+            with _embedding_cache_lock:
+                for key, vector in zip(chunk, encoded):
+                    vectors[key] = vector
+                    _embedding_cache[key] = vector
+                while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                    _embedding_cache.popitem(last=False)
+
+    return np.stack([vectors[key] for key in keys])
 
 def compute_coherence_score(text):
     """
@@ -12,26 +65,45 @@ def compute_coherence_score(text):
     Returns:
         float: Coherence score between 0 (low coherence) and 1 (high coherence).
     """
-    # Split text into paragraphs filtering out empty ones
-    paragraphs = [p.strip() for p in text.split('\n') if p.strip()]
-    if len(paragraphs) < 2:
-        return 1.0  # Single paragraph, assume full coherence
-
-    # Load sentence transformer model
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-
-    # Encode paragraphs into embeddings
-    embeddings = model.encode(paragraphs, convert_to_tensor=True)
-
-    # Calculate cosine similarity between consecutive paragraphs
-    similarities = []
-    for i in range(len(embeddings) - 1):
-        sim = util.pytorch_cos_sim(embeddings[i], embeddings[i+1]).item()
-        similarities.append(sim)
-
-    # Average similarity as coherence score (clipped between 0 and 1)
-    coherence_score = max(0, min(1, np.mean(similarities)))
-    return coherence_score
+    # Coalesced with concurrent callers into one encoder pass
+    return infer("sentence_embedder", text, compute_coherence_scores)
+
+def compute_coherence_scores(texts, batch_size=64):
+    """
+    Coherence for many texts; paragraphs of all texts are embedded together.
+
+    Args:
+        texts (list): Input multi-paragraph text strings.
+        batch_size (int): Paragraphs per encoder forward pass.
+
+    Returns:
+        list: One coherence score per input text, in order.
+    """
+    import numpy as np
+
+    # Split each text into paragraphs filtering out empty ones
+    doc_paragraphs = [[p.strip() for p in text.split('\n') if p.strip()] for text in texts]
+
+    # Single paragraph texts are fully coherent and need no embedding
+    flat = [p for paras in doc_paragraphs if len(paras) >= 2 for p in paras]
+    embeddings = embed_paragraphs(flat, batch_size) if flat else None
+
+    scores = []
+    offset = 0
+    for paras in doc_paragraphs:
+        if len(paras) < 2:
+            scores.append(1.0)  # Single paragraph, assume full coherence
+            continue
+
+        doc_embeddings = embeddings[offset:offset + len(paras)]
+        offset += len(paras)
+
+        # Cosine similarity of each consecutive pair: row-wise dot product of unit vectors
+        similarities = np.einsum("ij,ij->i", doc_embeddings[:-1], doc_embeddings[1:])
+
+        # Average similarity as coherence score (clipped between 0 and 1)
+        scores.append(float(np.clip(similarities.mean(), 0.0, 1.0)))
+    return scores
 
 # Example usage and test
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
-from transformers import pipeline
 import json
+from ..model_registry import get_model
+from ..inference_server import infer
+from .chunked_inference import CHUNK_LONG_TEXTS, classify_long_texts
 
 def analyze_emotions(text):
     """
@@ -11,15 +13,39 @@ def analyze_emotions(text):
     Returns:
         dict: Emotion probabilities for Joy, Sadness, Anger, Surprise, Fear, etc.
     """
-    emotion_pipeline = pipeline("text-classification", 
-                                model="nateraw/bert-base-uncased-emotion",
-                                return_all_scores=True)
-    
-    results = emotion_pipeline(text)[0]  # List of dicts with labels and scores
-
-    # Convert list to dictionary: {emotion: score}
-    emotions = {item['label'].lower(): item['score'] for item in results}
-    return emotions
+    # Coalesced with concurrent callers into one forward pass
+    return infer("emotion", text, analyze_emotions_batch)
+
+def analyze_emotions_batch(texts, batch_size=16, chunked=None):
+    """
+    Detect emotions for many texts with padded mini-batches.
+
+    Args:
+        texts (list): Input text strings.
+        batch_size (int): Texts (or windows) per forward pass.
+        chunked (bool): Score long texts over sliding token windows instead of
+            truncating them (default: CHUNK_LONG_TEXTS).
+
+    Returns:
+        list: One {emotion: score} dict per input text, in order.
+    """
+    if not texts:
+        return []
+
+    emotion_pipeline = get_model("emotion")
+
+    if chunked is None:
+        chunked = CHUNK_LONG_TEXTS
+
+    if chunked:
+        scores = classify_long_texts(emotion_pipeline, texts, batch_size=batch_size)
+        return [{label.lower(): score for label, score in s.items()} for s in scores]
+
+    # One list of {label, score} dicts per text
+    results = emotion_pipeline(list(texts), batch_size=batch_size, truncation=True)
+
+    # Convert each list to dictionary: {emotion: score}
+    return [{item['label'].lower(): item['score'] for item in scores} for scores in results]
 
 '''
 # Example usage and test
@@ -1,4 +1,80 @@
-import numpy as np
+# Emotion weights positively correlated with engagement
+# e.g., joy and surprise increase engagement; anger, sadness decrease
+EMOTION_WEIGHTS = {
+    'joy': 1.0,
+    'surprise': 0.9,
+    'anger': 0.3,
+    'sadness': 0.4,
+    'fear': 0.5,
+    'neutral': 0.6
+}
+DEFAULT_EMOTION_WEIGHT = 0.6
+
+# Text length at which the length factor saturates (~500 words)
+LENGTH_SATURATION = 500
+
+# Column names read from a pandas DataFrame / pyarrow Table
+SENTIMENT_COLUMN = "sentiment_score"
+LENGTH_COLUMN = "text_length"
+
+
+def _column(table, name):
+    """One column of a pandas DataFrame or pyarrow Table as a float array."""
+    import numpy as np
+
+    if hasattr(table, "column_names"):  # pyarrow.Table
+        return np.asarray(table.column(name).to_numpy(), dtype=np.float64)
+    return np.asarray(table[name].to_numpy(), dtype=np.float64)
+
+
+def predict_engagement_batch(sentiment_scores, text_lengths=None, emotion_scores=None, emotion_labels=None):
+    """
+    Vectorized predict_engagement over many documents.
+
+    Args:
+        sentiment_scores: Array of sentiment confidences (0 to 1), shape (n,).
+            Alternatively a pandas DataFrame or pyarrow Table with columns
+            "sentiment_score", "text_length" and one column per emotion; the
+            other arguments are then taken from it.
+        text_lengths: Array of word (or character) counts, shape (n,).
+        emotion_scores: Emotion confidence matrix, shape (n, len(emotion_labels)).
+        emotion_labels (list): Emotion name of each matrix column. For tables,
+            defaults to every column other than sentiment and length.
+
+    Returns:
+        numpy.ndarray: Engagement scores from 0 to 100, rounded to 2 decimals.
+    """
+    import numpy as np
+
+    if hasattr(sentiment_scores, "column_names") or hasattr(sentiment_scores, "columns"):
+        table = sentiment_scores
+        names = list(table.column_names if hasattr(table, "column_names") else table.columns)
+        if emotion_labels is None:
+            emotion_labels = [n for n in names if n not in (SENTIMENT_COLUMN, LENGTH_COLUMN)]
+        sentiment_scores = _column(table, SENTIMENT_COLUMN)
+        text_lengths = _column(table, LENGTH_COLUMN)
+        emotion_scores = (np.column_stack([_column(table, label) for label in emotion_labels])
+                          if emotion_labels else None)
+
+    sentiment = np.asarray(sentiment_scores, dtype=np.float64)
+    n = sentiment.shape[0]
+    length_norm = np.minimum(np.asarray(text_lengths, dtype=np.float64) / LENGTH_SATURATION, 1.0)
+
+    emotion_labels = list(emotion_labels or [])
+    emotions = (np.asarray(emotion_scores, dtype=np.float64).reshape(n, len(emotion_labels))
+                if emotion_labels else np.zeros((n, 0)))
+    if emotions.shape[1]:
+        # Dominant emotion per row (first column wins ties, like max() over a dict)
+        dominant = np.argmax(emotions, axis=1)
+        weights = np.array([EMOTION_WEIGHTS.get(label, DEFAULT_EMOTION_WEIGHT) for label in emotion_labels])
+        emotion_factor = weights[dominant] * emotions[np.arange(n), dominant]
+    else:
+        emotion_factor = np.zeros(n)
+
+    # Combine factors via weighted sum, clamped between 0 and 100
+    engagement = 100 * (0.4 * sentiment + 0.4 * length_norm + 0.2 * emotion_factor)
+    return np.round(np.clip(engagement, 0, 100), 2)
+
 
 def predict_engagement(sentiment_score, text_length, emotion_scores):
     """
@@ -12,35 +88,14 @@ def predict_engagement(sentiment_score, text_length, emotion_scores):
     Returns:
         float: Engagement score from 0 to 100.
     """
-    # Normalize text length (assuming typical max length ~500 words)
-    length_norm = min(text_length / 500, 1.0)
-
-    # Use sentiment score as positive engagement factor
-    sentiment_factor = sentiment_score
-
-    # Extract dominant emotion and assign weight
-    dominant_emotion = max(emotion_scores, key=emotion_scores.get, default='neutral')
-    emotion_val = emotion_scores.get(dominant_emotion, 0)
-
-    # Define emotion weights positively correlated with engagement
-    # e.g., joy and surprise increase engagement; anger, sadness decrease
-    emotion_weights = {
-        'joy': 1.0,
-        'surprise': 0.9,
-        'anger': 0.3,
-        'sadness': 0.4,
-        'fear': 0.5,
-        'neutral': 0.6
-    }
-
-    emotion_factor = emotion_weights.get(dominant_emotion, 0.6) * emotion_val
-
-    # Combine factors via weighted sum
-    engagement_score = 100 * (0.4 * sentiment_factor + 0.4 * length_norm + 0.2 * emotion_factor)
-
-    # Clamp between 0 and 100
-    engagement_score = np.clip(engagement_score, 0, 100)
-    return round(engagement_score, 2)
+    labels = list(emotion_scores)
+    scores = predict_engagement_batch(
+        [sentiment_score],
+        [text_length],
+        [[emotion_scores[label] for label in labels]],
+        labels,
+    )
+    return float(scores[0])
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,192 @@
+"""
+Scraped-hashtag cache shared by every process on the host.
+
+Entries live in SQLite (WAL mode, one row per (category, keyword), each
+write a single atomic upsert) and are mirrored in a process-local dict so
+repeated lookups never touch the database. Freshness is per entry: rows
+older than the TTL are still returned by `get` (callers decide what to do
+with stale tags) but not by `get_fresh`. Rows nobody has refreshed for
+`max_age_s` (far past the TTL) are purged at most once per PURGE_INTERVAL_S.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+HASHTAG_CACHE_DB = os.environ.get("SOCION_HASHTAG_CACHE_DB", "hashtags_cache.sqlite3")
+# Entries are deleted once this old – well past the refresh TTL, so stale
+# tags stay servable while their refresh is retried
+HASHTAG_CACHE_MAX_AGE_DAYS = float(os.environ.get("SOCION_HASHTAG_CACHE_MAX_AGE_DAYS", "60"))
+PURGE_INTERVAL_S = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashtag_cache (
+    category   TEXT NOT NULL,
+    keyword    TEXT NOT NULL,
+    hashtags   TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (category, keyword)
+);
+CREATE INDEX IF NOT EXISTS hashtag_cache_updated ON hashtag_cache (updated_at);
+CREATE TABLE IF NOT EXISTS hashtag_refresh_leases (
+    category   TEXT NOT NULL,
+    keyword    TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (category, keyword)
+);
+"""
+
+
+class HashtagCacheStore:
+    """
+    Args:
+        db_path (str): SQLite file, shared by all workers.
+        ttl_s (float): Age in seconds after which an entry is stale.
+        legacy_json (str): Old hashtags_cache.json to import once, if present.
+        max_age_s (float): Age in seconds after which an entry is purged;
+            never less than twice the TTL.
+    """
+
+    def __init__(self, db_path=HASHTAG_CACHE_DB, ttl_s=7 * 24 * 3600, legacy_json=None,
+                 max_age_s=HASHTAG_CACHE_MAX_AGE_DAYS * 24 * 3600):
+        self.db_path = db_path
+        self.ttl_s = ttl_s
+        self.legacy_json = legacy_json
+        self.max_age_s = max(max_age_s, 2 * ttl_s)
+        self._last_purge = None
+        # (category, keyword) -> {"hashtags": [...], "updated_at": epoch seconds}
+        self._memory = {}
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(_SCHEMA)
+                    self._import_legacy(conn)
+                    self._initialized = True
+            self._local.conn = conn
+        self._maybe_purge(conn)
+        return conn
+
+    def _maybe_purge(self, conn):
+        now = time.monotonic()
+        with self._init_lock:
+            if self._last_purge is not None and now - self._last_purge < PURGE_INTERVAL_S:
+                return
+            self._last_purge = now
+        try:
+            deleted = self.purge_expired(conn=conn)
+            if deleted:
+                print(f"[INFO] Purged {deleted} hashtag cache entries older than "
+                      f"{self.max_age_s / 86400:.0f} days")
+        except sqlite3.Error as e:
+            print(f"[WARN] Hashtag cache purge failed: {e}")
+
+    def _import_legacy(self, conn):
+        """Copy entries from the old JSON cache; rows already in the store win."""
+        if not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
+        try:
+            with open(self.legacy_json, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+            rows = []
+            for category, entries in legacy.items():
+                for keyword, entry in entries.items():
+                    updated = datetime.fromisoformat(entry["last_updated"]).timestamp()
+                    rows.append((category, keyword, json.dumps(entry["hashtags"], ensure_ascii=False), updated))
+            conn.executemany("INSERT OR IGNORE INTO hashtag_cache VALUES (?, ?, ?, ?)", rows)
+        except Exception as e:
+            print(f"[WARN] Could not import {self.legacy_json}: {e}")
+
+    def is_fresh(self, entry, now=None):
+        return ((now or time.time()) - entry["updated_at"]) < self.ttl_s
+
+    def get(self, category, keyword):
+        """
+        Cached entry for (category, keyword), fresh or stale; None if absent.
+
+        Returns:
+            dict: {"hashtags": [...], "updated_at": epoch seconds}
+        """
+        key = (category, keyword)
+        entry = self._memory.get(key)
+        if entry is not None and self.is_fresh(entry):
+            return entry
+
+        # Not in memory, or stale here – another worker may have refreshed it
+        row = self._connection().execute(
+            "SELECT hashtags, updated_at FROM hashtag_cache WHERE category = ? AND keyword = ?",
+            (category, keyword),
+        ).fetchone()
+        if row is None:
+            return entry
+        entry = {"hashtags": json.loads(row[0]), "updated_at": row[1]}
+        self._memory[key] = entry
+        return entry
+
+    def get_fresh(self, category, keyword):
+        """Hashtags for (category, keyword) if cached and within the TTL, else None."""
+        entry = self.get(category, keyword)
+        if entry is not None and self.is_fresh(entry):
+            return list(entry["hashtags"])
+        return None
+
+    def put(self, category, keyword, hashtags):
+        entry = {"hashtags": list(hashtags), "updated_at": time.time()}
+        self._connection().execute(
+            "INSERT OR REPLACE INTO hashtag_cache (category, keyword, hashtags, updated_at) VALUES (?, ?, ?, ?)",
+            (category, keyword, json.dumps(entry["hashtags"], ensure_ascii=False), entry["updated_at"]),
+        )
+        self._memory[(category, keyword)] = entry
+
+    def claim_refresh(self, category, keyword, lease_s):
+        """
+        Claim the right to refresh (category, keyword) for `lease_s` seconds,
+        so one process on the host scrapes a key instead of every worker.
+
+        Returns:
+            bool: False if another process holds an unexpired claim.
+        """
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT expires_at FROM hashtag_refresh_leases WHERE category = ? AND keyword = ?",
+                (category, keyword),
+            ).fetchone()
+            claimed = row is None or row[0] <= now
+            if claimed:
+                conn.execute("INSERT OR REPLACE INTO hashtag_refresh_leases VALUES (?, ?, ?)",
+                             (category, keyword, now + lease_s))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return claimed
+
+    def purge_expired(self, max_age_s=None, conn=None):
+        """Delete entries older than `max_age_s` (default: self.max_age_s). Returns the count."""
+        cutoff = time.time() - (self.max_age_s if max_age_s is None else max_age_s)
+        deleted = (conn or self._connection()).execute(
+            "DELETE FROM hashtag_cache WHERE updated_at < ?", (cutoff,)
+        ).rowcount
+        (conn or self._connection()).execute(
+            "DELETE FROM hashtag_refresh_leases WHERE expires_at < ?", (time.time(),))
+        for key, entry in list(self._memory.items()):
+            if entry["updated_at"] < cutoff:
+                self._memory.pop(key, None)
+        return deleted
+
+    def clear_memory(self):
+        self._memory.clear()
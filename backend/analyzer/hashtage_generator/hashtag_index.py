@@ -0,0 +1,135 @@
+import difflib
+import heapq
+import json
+import os
+import threading
+from collections import Counter, defaultdict
+from itertools import chain
+
+
+# Fuzzy candidates scored with difflib after the trigram prefilter
+MAX_FUZZY_CANDIDATES = 32
+
+
+def _trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Fuzzy string lookup: a trigram inverted index narrows the options to a
+    few candidates, which are then ranked with difflib's ratio – the same
+    score (and cutoff) `difflib.get_close_matches` uses, without scanning
+    every option.
+    """
+
+    def __init__(self, options):
+        self.options = list(options)
+        self._exact = {option: i for i, option in enumerate(self.options)}
+        self._postings = defaultdict(list)
+        for i, option in enumerate(self.options):
+            for gram in _trigrams(option):
+                self._postings[gram].append(i)
+
+    def __len__(self):
+        return len(self.options)
+
+    def matches(self, target, cutoff=0.6, limit=MAX_FUZZY_CANDIDATES):
+        """All (ratio, option) pairs at or above `cutoff`, best first."""
+        if target in self._exact:
+            return [(1.0, target)]
+
+        overlap = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in _trigrams(target)))
+        candidates = heapq.nlargest(limit, overlap, key=overlap.get)
+
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(target)
+        scored = []
+        for i in candidates:
+            matcher.set_seq1(self.options[i])
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                ratio = matcher.ratio()
+                if ratio >= cutoff:
+                    scored.append((ratio, self.options[i]))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return scored
+
+    def closest(self, target, cutoff=0.6):
+        """Exact match, else the best fuzzy match at or above `cutoff`, else None."""
+        found = self.matches(target, cutoff)
+        return found[0][1] if found else None
+
+
+class HashtagIndex:
+    """
+    In-memory view of hashtags_data.json ({category: {keyword: [tags]}}):
+    fuzzy indexes over category names and keywords, plus precomputed
+    de-duplicated tag lists per category.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.category_order = {category: i for i, category in enumerate(data)}
+        self.categories = TrigramIndex(data.keys())
+        self.keywords = {category: TrigramIndex(entries.keys()) for category, entries in data.items()}
+        # dict.fromkeys keeps first-seen order while dropping duplicates
+        self.category_tags = {
+            category: list(dict.fromkeys(tag for tags in entries.values() for tag in tags))
+            for category, entries in data.items()
+        }
+
+        keyword_categories = defaultdict(list)
+        for category, entries in data.items():
+            for keyword in entries:
+                keyword_categories[keyword].append(category)
+        self.keyword_categories = dict(keyword_categories)
+        self.all_keywords = TrigramIndex(self.keyword_categories.keys())
+
+    def match_category(self, category):
+        return self.categories.closest(category)
+
+    def match_keyword(self, category, keyword):
+        return self.keywords[category].closest(keyword)
+
+    def match_keyword_any_category(self, keyword):
+        """
+        (category, keyword) for the first category, in file order, holding an
+        exact or close match for `keyword`; None if no category does.
+        """
+        best = None
+        for ratio, option in self.all_keywords.matches(keyword):
+            for category in self.keyword_categories[option]:
+                rank = (self.category_order[category], option != keyword, -ratio)
+                if best is None or rank < best[0]:
+                    best = (rank, category, option)
+        return (best[1], best[2]) if best else None
+
+
+class HashtagIndexLoader:
+    """Builds the HashtagIndex once and rebuilds it when the file's mtime changes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._index = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if self._index is not None and mtime == self._mtime:
+            return self._index
+
+        with self._lock:
+            if self._index is None or mtime != self._mtime:
+                data = {}
+                if mtime is not None:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                self._index = HashtagIndex(data)
+                self._mtime = mtime
+            return self._index
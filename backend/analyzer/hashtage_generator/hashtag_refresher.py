@@ -0,0 +1,131 @@
+"""
+Off-request-path refresh of scraped hashtags.
+
+Stale cache entries are served as-is while a small thread pool re-fetches
+them. All scraping goes through one pooled `requests.Session` with retries
+and exponential backoff; keys whose refresh keeps failing are also backed
+off before being tried again. Each refresh first claims a lease in the
+shared cache, so workers on the same host don't scrape the same key at once.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+# Scraping target; point at a local stand-in server for testing
+HASHTAG_SOURCE_URL = os.environ.get("SOCION_HASHTAG_SOURCE_URL", "https://best-hashtags.com").rstrip("/")
+HTTP_TIMEOUT_S = float(os.environ.get("SOCION_HASHTAG_HTTP_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.environ.get("SOCION_HASHTAG_HTTP_RETRIES", "3"))
+HTTP_BACKOFF_S = float(os.environ.get("SOCION_HASHTAG_HTTP_BACKOFF", "0.5"))
+# Concurrent refreshes (and pooled connections) per process
+REFRESH_WORKERS = int(os.environ.get("SOCION_HASHTAG_REFRESH_WORKERS", "4"))
+# First retry delay after a failed refresh; doubles per failure up to the max
+FAILURE_BACKOFF_S = float(os.environ.get("SOCION_HASHTAG_FAILURE_BACKOFF", "60"))
+MAX_FAILURE_BACKOFF_S = 3600.0
+# How long a process's claim on a key blocks other processes from refreshing it
+REFRESH_LEASE_S = float(os.environ.get("SOCION_HASHTAG_REFRESH_LEASE", "300"))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """Process-wide requests.Session with connection pooling and retry/backoff."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF_S,
+                          status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=frozenset({"GET"}))
+            adapter = HTTPAdapter(max_retries=retry, pool_connections=REFRESH_WORKERS,
+                                  pool_maxsize=REFRESH_WORKERS)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+class HashtagRefresher:
+    """
+    Re-fetches cache entries in the background.
+
+    Args:
+        cache (HashtagCacheStore): Where refreshed tags are written.
+        fetch (callable): fetch(category, keyword) -> list of hashtags, where
+            (category, keyword) is the cache key being refreshed.
+        max_workers (int): Refreshes running at once.
+    """
+
+    def __init__(self, cache, fetch, max_workers=REFRESH_WORKERS):
+        self.cache = cache
+        self.fetch = fetch
+        self.max_workers = max(1, max_workers)
+        self._executor = None
+        self._in_flight = {}
+        # key -> (consecutive failures, monotonic time before which we don't retry)
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="hashtag-refresh")
+        return self._executor
+
+    def schedule(self, category, keyword):
+        """
+        Queue a refresh of (category, keyword).
+
+        Returns:
+            bool: False if one is already queued, the key is backing off or
+            another process is refreshing it.
+        """
+        key = (category, keyword)
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            failure = self._failures.get(key)
+            if failure is not None and time.monotonic() < failure[1]:
+                return False
+            try:
+                if not self.cache.claim_refresh(category, keyword, REFRESH_LEASE_S):
+                    return False
+            except Exception as e:
+                print(f"[WARN] Could not claim hashtag refresh for {key}: {e}")
+                return False
+            self._in_flight[key] = self._get_executor().submit(self._refresh, key)
+            return True
+
+    def _refresh(self, key):
+        try:
+            hashtags = self.fetch(*key)
+            if not hashtags:
+                raise ValueError("no hashtags returned")
+            self.cache.put(key[0], key[1], hashtags)
+            with self._lock:
+                self._failures.pop(key, None)
+        except Exception as e:
+            with self._lock:
+                failures = self._failures.get(key, (0, 0))[0] + 1
+                delay = min(MAX_FAILURE_BACKOFF_S, FAILURE_BACKOFF_S * 2 ** (failures - 1))
+                self._failures[key] = (failures, time.monotonic() + delay)
+            print(f"[WARN] Hashtag refresh failed for {key}: {e}; retrying in {delay:.0f}s at the earliest")
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def pending(self):
+        with self._lock:
+            return len(self._in_flight)
+
+    def wait(self, timeout=None):
+        """Block until every refresh queued so far has finished."""
+        with self._lock:
+            futures = list(self._in_flight.values())
+        wait(futures, timeout=timeout)
@@ -1,10 +1,8 @@
-import json
 import os
-import requests
-import difflib
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
 import re
+from .hashtag_cache import HashtagCacheStore
+from .hashtag_refresher import HASHTAG_SOURCE_URL, HTTP_TIMEOUT_S, HashtagRefresher, get_http_session
+from .hashtag_index import HashtagIndexLoader
 
 CACHE_FILE = "hashtags_cache.json"
 DATA_FILE = "hashtags_data.json"
@@ -34,36 +32,24 @@ HEADERS = {
 }
 
 REFRESH_DAYS = 7
+# Categories (in DEFAULT_CANDIDATE_LABELS order) each worker pre-scrapes on
+# start; 0 leaves every scrape to the first lookup
+HASHTAG_WARM_UP = int(os.environ.get("SOCION_HASHTAG_WARM_UP", "0"))
 
-def load_cache():
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-def save_cache(cache):
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=2, ensure_ascii=False)
-
-def load_hashtag_data():
-    if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump({}, f)
-        return {}
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+# Offline dataset, indexed once and rebuilt when the file changes on disk
+_hashtag_index = HashtagIndexLoader(DATA_FILE)
+# Scraped tags, shared across worker processes; CACHE_FILE is imported once
+_cache = HashtagCacheStore(ttl_s=REFRESH_DAYS * 24 * 3600, legacy_json=CACHE_FILE)
 
 def normalize_keyword(keyword):
     return CATEGORY_MAP.get(keyword.lower().strip(), keyword.lower().strip())
 
-def find_closest_match(target, options, cutoff=0.6):
-    matches = difflib.get_close_matches(target, options, n=1, cutoff=cutoff)
-    return matches[0] if matches else None
-
 def scrape_best_hashtags(keyword):
-    url = f"https://best-hashtags.com/hashtag/{keyword.replace(' ', '')}/"
+    from bs4 import BeautifulSoup
+
+    url = f"{HASHTAG_SOURCE_URL}/hashtag/{keyword.replace(' ', '')}/"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = get_http_session().get(url, headers=HEADERS, timeout=HTTP_TIMEOUT_S)
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
             hashtag_div = soup.find('div', class_='tag-box tag-box-v3 margin-bottom-40')
@@ -85,46 +71,37 @@ def scrape_best_hashtags(keyword):
     return []
 
 def get_hashtags_from_data(category, keyword):
-    data = load_hashtag_data()
+    index = _hashtag_index.get()
     category_lower = category.lower().strip() if category else ""
     keyword_lower = keyword.lower().strip() if keyword else ""
 
-    categories = list(data.keys())
     matched_category = None
     matched_keyword = None
 
     # Find category match if category given
     if category_lower:
-        matched_category = category_lower if category_lower in categories else find_closest_match(category_lower, categories)
+        matched_category = index.match_category(category_lower)
 
     # If category found
     if matched_category:
-        keywords = list(data[matched_category].keys())
         # If keyword given find keyword match, else return all hashtags under category
         if keyword_lower:
-            matched_keyword = keyword_lower if keyword_lower in keywords else find_closest_match(keyword_lower, keywords)
+            matched_keyword = index.match_keyword(matched_category, keyword_lower)
         else:
-            all_tags = []
-            for kw in keywords:
-                all_tags.extend(data[matched_category][kw])
-            return list(set(all_tags))  # unique hashtags
+            return list(index.category_tags[matched_category])  # unique hashtags
 
         if matched_keyword:
-            return data[matched_category][matched_keyword]
+            return list(index.data[matched_category][matched_keyword])
         else:
             print(f"No matching keyword found '{keyword}' in category '{matched_category}'.")
             return []
 
     # If no category match but keyword given: search keyword across all categories
     if keyword_lower and not matched_category:
-        for cat in categories:
-            keywords = list(data[cat].keys())
-            if keyword_lower in keywords:
-                return data[cat][keyword_lower]
-            else:
-                close_kw = find_closest_match(keyword_lower, keywords)
-                if close_kw:
-                    return data[cat][close_kw]
+        match = index.match_keyword_any_category(keyword_lower)
+        if match:
+            cat, kw = match
+            return list(index.data[cat][kw])
 
     print("No matching category or keyword found in offline data.")
     return []
@@ -149,102 +126,83 @@ def scrape_hashtags(keyword, category=""):
         print("No keyword or category provided, cannot retrieve hashtags.")
         return []
 
-def get_hashtags(category, keyword):
-    cache = load_cache()
-    norm_category = category.lower().strip() if category else ""
-    norm_keyword = normalize_keyword(keyword) if keyword else ""
-
-    # Use category or keyword or "default" for cache key to avoid key errors
-    cache_cat_key = norm_category if norm_category else "default_category"
-    cache_key_key = norm_keyword if norm_keyword else "default_keyword"
-
-    if cache_cat_key not in cache:
-        cache[cache_cat_key] = {}
-
-    # Preference logic: use category if available else keyword
-    key_to_use = cache_cat_key
-    subkey_to_use = ""
+DEFAULT_CACHE_CATEGORY = "default_category"
 
+def _cache_key(norm_category, norm_keyword):
+    """Category lookups are cached per category, keyword-only lookups per keyword."""
     if norm_category:
-        # If category present, use category key
-        subkey_to_use = ""  # empty string as subkey to get all keywords under this category or handle below
-        # Check if empty string subkey exists in cache, else use fallback below
-        if "" not in cache[cache_cat_key]:
-            # Prepare to fetch all hashtags under the category
-            # We'll handle this by modifying get_hashtags_from_data call if subkey is empty
-            subkey_to_use = None
-        else:
-            subkey_to_use = ""
+        return norm_category, ""
+    return DEFAULT_CACHE_CATEGORY, norm_keyword
+
+def _refetch(cache_category, cache_keyword):
+    """
+    Fill the entry stored under a cache key – the only way scraped tags get
+    into the cache, whether for a first lookup, a stale entry or warm-up.
+
+    Scrapes only – no offline fallback – and raises when nothing comes back,
+    so the refresher keeps any stale entry and backs the key off instead of
+    caching the offline dataset as if it were fresh.
+    """
+    term = cache_keyword if cache_category == DEFAULT_CACHE_CATEGORY else cache_category
+    hashtags = scrape_best_hashtags(term)
+    if not hashtags:
+        raise ValueError(f"no hashtags scraped for '{term}'")
+    return hashtags
 
-    elif norm_keyword:
-        # If no category, use keyword in default category or keyword cache
-        key_to_use = "default_category"
-        subkey_to_use = norm_keyword
-    else:
-        # Neither category nor keyword
-        key_to_use = "default_category"
-        subkey_to_use = "default_keyword"
+_refresher = HashtagRefresher(_cache, _refetch)
 
-    # Check cache for preferred keys
-    if subkey_to_use is not None and subkey_to_use in cache.get(key_to_use, {}):
-        entry = cache[key_to_use][subkey_to_use]
-        last_update = datetime.fromisoformat(entry["last_updated"])
-        if datetime.now() - last_update < timedelta(days=REFRESH_DAYS):
-            print(f"Using cached hashtags for category '{key_to_use}', keyword '{subkey_to_use}'")
-            return entry["hashtags"]
+def get_hashtags(category, keyword):
+    norm_category = category.lower().strip() if category else ""
+    norm_keyword = normalize_keyword(keyword) if keyword else ""
 
-    # If no cached entry or expired, scrape fresh using category or keyword prioritization
-    if norm_category:
-        hashtags = scrape_hashtags("", norm_category)  # Empty keyword, pass category
-        if not hashtags and norm_keyword:
-            # fallback to keyword if category scrape failed
-            hashtags = scrape_hashtags(norm_keyword, "")
-    elif norm_keyword:
-        hashtags = scrape_hashtags(norm_keyword, "")
-    else:
+    if not norm_category and not norm_keyword:
         print("No category or keyword provided, cannot retrieve hashtags.")
         return []
 
-    # Cache updated hashtags under preferring storage key
-    store_cat_key = key_to_use
-    store_key_key = subkey_to_use if subkey_to_use is not None else ""
-
-    if store_cat_key not in cache:
-        cache[store_cat_key] = {}
-
-    cache[store_cat_key][store_key_key] = {
-        "last_updated": datetime.now().isoformat(),
-        "hashtags": hashtags
-    }
-    save_cache(cache)
+    cache_category, cache_keyword = _cache_key(norm_category, norm_keyword)
+    entry = _cache.get(cache_category, cache_keyword)
+    if entry is not None:
+        if _cache.is_fresh(entry):
+            print(f"Using cached hashtags for category '{cache_category}', keyword '{cache_keyword}'")
+        else:
+            # Serve the stale tags now; re-fetch off the request path
+            print(f"Serving stale hashtags for category '{cache_category}', keyword '{cache_keyword}' while refreshing")
+            _refresher.schedule(cache_category, cache_keyword)
+        return list(entry["hashtags"])
+
+    # Nothing scraped yet: answer from the offline data (cheap, in memory)
+    # and scrape in the background like any other refresh
+    _refresher.schedule(cache_category, cache_keyword)
+    hashtags = get_hashtags_from_data(norm_category, "") if norm_category else []
+    if not hashtags and norm_keyword:
+        hashtags = get_hashtags_from_data("", norm_keyword)
     return hashtags
 
-    cache = load_cache()
-    norm_category = category.lower().strip() if category else ""
-    norm_keyword = normalize_keyword(keyword) if keyword else ""
-
-    # Use category or keyword or "default" for cache key to avoid key errors
-    cache_cat_key = norm_category if norm_category else "default_category"
-    cache_key_key = norm_keyword if norm_keyword else "default_keyword"
-
-    if cache_cat_key not in cache:
-        cache[cache_cat_key] = {}
-
-    if cache_key_key in cache[cache_cat_key]:
-        entry = cache[cache_cat_key][cache_key_key]
-        last_update = datetime.fromisoformat(entry["last_updated"])
-        if datetime.now() - last_update < timedelta(days=REFRESH_DAYS):
-            print(f"Using cached hashtags for category '{cache_cat_key}', keyword '{cache_key_key}'")
-            return entry["hashtags"]
-
-    print(f"Fetching fresh hashtags for category '{cache_cat_key}', keyword '{cache_key_key}'")
-    hashtags = scrape_hashtags(keyword, norm_category)
-    cache[cache_cat_key][cache_key_key] = {
-        "last_updated": datetime.now().isoformat(),
-        "hashtags": hashtags
-    }
-    save_cache(cache)
-    return hashtags
+def warm_up_hashtags(categories=None, limit=None):
+    """
+    Queue background scrapes for the first `limit` categories the classifier
+    can emit (default: DEFAULT_CANDIDATE_LABELS, HASHTAG_WARM_UP) that aren't
+    cached and fresh. Off by default – each one is a request to the source
+    site on every worker start. The refresh leases in the shared cache make
+    sure each category is scraped by one worker only.
+
+    Returns:
+        int: Number of refreshes queued.
+    """
+    limit = HASHTAG_WARM_UP if limit is None else limit
+    if limit <= 0:
+        return 0
+    if categories is None:
+        from ..category_classifier import DEFAULT_CANDIDATE_LABELS
+        categories = DEFAULT_CANDIDATE_LABELS
+
+    queued = 0
+    for category in categories[:limit]:
+        cache_category, cache_keyword = _cache_key(category.lower().strip(), "")
+        if _cache.get_fresh(cache_category, cache_keyword) is None:
+            queued += _refresher.schedule(cache_category, cache_keyword)
+    print(f"[INFO] Queued {queued} hashtag refreshes")
+    return queued
 
 # Test
 if __name__ == "__main__":
@@ -1,7 +1,220 @@
-from rake_nltk import Rake
 import json
+import math
+import os
+import re
+import string
+import tempfile
+import threading
+from contextlib import contextmanager
+from collections import Counter, defaultdict
+from itertools import groupby
 
-def extract_keywords(text, max_keywords):
+# "rake": plain RAKE scores. "tfidf": RAKE scores weighted by how rare each
+# phrase is across every document analyzed so far. The pipeline doesn't keep
+# tfidf keywords in the stage cache; a whole-result cache hit returns the
+# earlier result without counting the document again.
+KEYWORD_SCORING = os.environ.get("SOCION_KEYWORD_SCORING", "rake")
+# Optional JSON file the corpus statistics are loaded from and saved to
+KEYWORD_CORPUS_PATH = os.environ.get("SOCION_KEYWORD_CORPUS", "")
+CORPUS_SAVE_EVERY = int(os.environ.get("SOCION_KEYWORD_CORPUS_SAVE_EVERY", "100"))
+# Phrases kept in the corpus; the rarest are pruned beyond this. A phrase
+# missing from the corpus scores like one seen once, so little is lost.
+CORPUS_MAX_PHRASES = int(os.environ.get("SOCION_KEYWORD_CORPUS_MAX_PHRASES", "200000"))
+
+# Same split as nltk's wordpunct_tokenize (what rake_nltk uses by default)
+_WORD_RE = re.compile(r"\w+|[^\w\s]+")
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive advisory lock on `path` (a no-op where fcntl is unavailable)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class KeywordCorpus:
+    """
+    Incremental document frequencies of candidate phrases.
+
+    With a `path`, counts are shared by every process using that file: each
+    save merges this process's new counts into what is on disk (under a
+    file lock) and picks up what the other processes added.
+
+    Args:
+        path (str): JSON file to load from and save to (None: memory only).
+        max_phrases (int): Phrases kept; the rarest are pruned beyond this.
+    """
+
+    def __init__(self, path=None, max_phrases=CORPUS_MAX_PHRASES):
+        self.path = path
+        self.max_phrases = max_phrases
+        self.documents = 0
+        self.doc_freq = Counter()
+        # Counts added since the last save, merged into the file on save
+        self._new_documents = 0
+        self._new_freq = Counter()
+        self._lock = threading.Lock()
+        if path:
+            data = self._read()
+            self.documents = data["documents"]
+            self.doc_freq.update(data["doc_freq"])
+
+    def add(self, phrases):
+        """Count one document given its candidate phrases."""
+        phrases = set(phrases)
+        with self._lock:
+            self.documents += 1
+            self.doc_freq.update(phrases)
+            if self.path:
+                self._new_documents += 1
+                self._new_freq.update(phrases)
+                if self._new_documents >= CORPUS_SAVE_EVERY:
+                    try:
+                        self._save_locked()
+                    except (OSError, ValueError) as e:
+                        # Keep the new counts; the next save retries them
+                        print(f"[WARN] Could not save keyword corpus: {e}")
+            elif len(self.doc_freq) > self.max_phrases * 5 // 4:
+                # Prune in steps, not on every add
+                self.doc_freq = self._pruned(self.doc_freq)
+
+    def idf(self, phrase):
+        # Smoothed, so phrases seen in every document still score above zero
+        return math.log((1 + self.documents) / (1 + self.doc_freq.get(phrase, 0))) + 1.0
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {"documents": 0, "doc_freq": {}}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _pruned(self, doc_freq):
+        if len(doc_freq) <= self.max_phrases:
+            return doc_freq
+        return Counter(dict(doc_freq.most_common(self.max_phrases)))
+
+    def _save_locked(self):
+        with _file_lock(f"{self.path}.lock"):
+            data = self._read()
+            documents = data["documents"] + self._new_documents
+            doc_freq = Counter(data["doc_freq"])
+            doc_freq.update(self._new_freq)
+            doc_freq = self._pruned(doc_freq)
+
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"documents": documents, "doc_freq": doc_freq}, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except Exception:
+                os.remove(tmp_path)
+                raise
+
+        self.documents, self.doc_freq = documents, doc_freq
+        self._new_documents = 0
+        self._new_freq = Counter()
+
+
+class KeywordEngine:
+    """
+    RAKE keyword extraction with the stopword set and tokenizers built once.
+
+    Scores match rake_nltk's default configuration (degree / frequency,
+    repeated phrases kept).
+
+    Args:
+        stopwords (iterable): Words that break phrases (default: NLTK English).
+        sentence_tokenizer (callable): text -> sentences (default: nltk.sent_tokenize).
+        corpus (KeywordCorpus): Document frequencies for "tfidf" scoring.
+    """
+
+    def __init__(self, stopwords=None, sentence_tokenizer=None, corpus=None):
+        if stopwords is None:
+            from nltk.corpus import stopwords as nltk_stopwords
+            stopwords = nltk_stopwords.words("english")
+        if sentence_tokenizer is None:
+            from nltk.tokenize import sent_tokenize
+            sentence_tokenizer = sent_tokenize
+        self.to_ignore = frozenset(stopwords) | frozenset(string.punctuation)
+        self.sentence_tokenizer = sentence_tokenizer
+        self.corpus = corpus
+
+    def phrases(self, text):
+        """Candidate phrases (tuples of lowercase words), in text order."""
+        to_ignore = self.to_ignore
+        phrases = []
+        for sentence in self.sentence_tokenizer(text):
+            words = _WORD_RE.findall(sentence.lower())
+            phrases.extend(tuple(group) for keep, group in groupby(words, lambda w: w not in to_ignore) if keep)
+        return phrases
+
+    @staticmethod
+    def rake_scores(phrases):
+        """[(score, phrase_text)] for every phrase, best first (as rake_nltk ranks them)."""
+        frequency = Counter()
+        degree = defaultdict(int)
+        for phrase in phrases:
+            length = len(phrase)
+            for word in phrase:
+                frequency[word] += 1
+                degree[word] += length
+        ranked = [(sum(degree[w] / frequency[w] for w in phrase), " ".join(phrase)) for phrase in phrases]
+        ranked.sort(reverse=True)
+        return ranked
+
+    def _top(self, ranked, max_keywords, scoring):
+        if scoring == "tfidf" and self.corpus is not None:
+            ranked = [(score * self.corpus.idf(phrase), phrase) for score, phrase in ranked]
+            ranked.sort(reverse=True)
+        return [{"keyword": phrase, "score": score} for score, phrase in ranked[:max_keywords]]
+
+    def extract(self, text, max_keywords=10, scoring=None):
+        scoring = scoring or KEYWORD_SCORING
+        ranked = self.rake_scores(self.phrases(text))
+        if scoring == "tfidf" and self.corpus is not None:
+            self.corpus.add(phrase for _, phrase in ranked)
+        return self._top(ranked, max_keywords, scoring)
+
+    def extract_batch(self, texts, max_keywords=10, scoring=None):
+        """
+        Keywords for many documents. In "tfidf" mode the whole batch is added
+        to the corpus first, so documents in it are scored against each other.
+        """
+        scoring = scoring or KEYWORD_SCORING
+        ranked_docs = [self.rake_scores(self.phrases(text)) for text in texts]
+        if scoring == "tfidf" and self.corpus is not None:
+            for ranked in ranked_docs:
+                self.corpus.add(phrase for _, phrase in ranked)
+        return [self._top(ranked, max_keywords, scoring) for ranked in ranked_docs]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_keyword_engine():
+    """Process-wide KeywordEngine (stopwords loaded on first use)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = KeywordEngine(corpus=KeywordCorpus(KEYWORD_CORPUS_PATH or None))
+        return _engine
+
+
+def extract_keywords(text, max_keywords=10):
     """
     Extract keywords and key phrases from text using RAKE.
 
@@ -12,16 +225,12 @@ def extract_keywords(text, max_keywords):
     Returns:
         list: List of dictionaries with keyword phrase and score.
     """
-    r = Rake()  # Uses NLTK stopwords by default
-    r.extract_keywords_from_text(text)
-    ranked_phrases = r.get_ranked_phrases_with_scores()
-    
-    # Sort by score descending and limit to max_keywords
-    top_keywords = sorted(ranked_phrases, key=lambda x: x[0], reverse=True)[:max_keywords]
-    
-    # Format result as list of dicts
-    keywords = [{"keyword": phrase, "score": score} for score, phrase in top_keywords]
-    return keywords
+    return get_keyword_engine().extract(text, max_keywords)
+
+
+def extract_keywords_batch(texts, max_keywords=10):
+    """extract_keywords for a list of texts; returns one keyword list per text."""
+    return get_keyword_engine().extract_batch(texts, max_keywords)
 
 # Example usage and test
 if __name__ == "__main__":
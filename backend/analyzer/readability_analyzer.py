@@ -1,5 +1,145 @@
-import textstat
 import json
+import re
+from functools import lru_cache
+
+# Formulas and tokenization follow textstat (English), but the text is
+# tokenized once and every metric is derived from the same counts.
+_NONCONTRACTION_APOSTROPHE_RE = re.compile(r"\'(?!(?:[tsd]|ve|ll|re))")
+_PUNCTUATION_RE = re.compile(r"[^\w\s\']")
+_SENTENCE_RE = re.compile(r"\b[^.!?]+[.!?]*")
+
+# textstat's English constants
+FRE_BASE, FRE_SENTENCE_LENGTH, FRE_SYLL_PER_WORD = 206.835, 1.015, 84.6
+DIFFICULT_SYLLABLES = 3
+LONG_WORD_LETTERS = 6
+READING_MS_PER_CHAR = 14.69
+
+_syllable_sources = None
+
+
+def _get_syllable_sources():
+    """(cmudict or None, pyphen dictionary), loaded once."""
+    global _syllable_sources
+    if _syllable_sources is None:
+        import pyphen
+        try:
+            from nltk.corpus import cmudict
+            pronunciations = cmudict.dict()
+        except (ImportError, LookupError):
+            pronunciations = None
+        _syllable_sources = (pronunciations, pyphen.Pyphen(lang="en_US"))
+    return _syllable_sources
+
+
+@lru_cache(maxsize=None)
+def _easy_words():
+    from importlib import resources
+    with resources.files("textstat").joinpath("resources/en/easy_words.txt").open() as f:
+        return frozenset(line.strip() for line in f)
+
+
+@lru_cache(maxsize=65536)
+def count_word_syllables(word):
+    """Syllables in one lowercase word: CMUdict stress marks, else pyphen hyphenation points + 1."""
+    pronunciations, hyphenator = _get_syllable_sources()
+    if pronunciations is not None:
+        phones = pronunciations.get(word)
+        if phones:
+            return sum(1 for phone in phones[0] if phone[-1].isdigit())
+    return len(hyphenator.positions(word)) + 1
+
+
+def _clean(text):
+    return _PUNCTUATION_RE.sub("", _NONCONTRACTION_APOSTROPHE_RE.sub("", text))
+
+
+def text_statistics(text):
+    """
+    Every count the readability formulas need, from one pass over the text.
+
+    Args:
+        text (str): Input text string.
+
+    Returns:
+        dict: words, sentences, syllables, letters, characters, polysyllables
+            (3+ syllables), difficult_words, long_words and raw_tokens.
+    """
+    raw_tokens = text.split()
+    characters = sum(len(token) for token in raw_tokens)
+
+    words = _clean(text).split()
+    easy_words = _easy_words()
+    syllables = polysyllables = difficult = long_words = letters = 0
+    for word in words:
+        lower = word.lower()
+        count = count_word_syllables(lower)
+        syllables += count
+        if count >= DIFFICULT_SYLLABLES:
+            polysyllables += 1
+            if lower not in easy_words:
+                difficult += 1
+        word_letters = len(word) - word.count("'")
+        letters += word_letters
+        if word_letters > LONG_WORD_LETTERS:
+            long_words += 1
+
+    sentences = 0
+    if text:
+        fragments = _SENTENCE_RE.findall(text)
+        # Fragments of two words or fewer (e.g. "Dr.", list markers) don't count
+        sentences = max(1, sum(1 for fragment in fragments if len(_clean(fragment).split()) > 2))
+
+    return {
+        "words": len(words),
+        "sentences": sentences,
+        "syllables": syllables,
+        "letters": letters,
+        "characters": characters,
+        "raw_tokens": len(raw_tokens),
+        "polysyllables": polysyllables,
+        "difficult_words": difficult,
+        "long_words": long_words,
+    }
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else 0.0
+
+
+def readability_scores(stats):
+    """Readability formulas (as textstat defines them) from text_statistics() counts."""
+    words, sentences = stats["words"], stats["sentences"]
+    words_per_sentence = _ratio(words, sentences)
+    syllables_per_word = _ratio(stats["syllables"], words)
+    chars_per_word = _ratio(stats["characters"], stats["raw_tokens"])
+
+    if words_per_sentence and syllables_per_word:
+        flesch = FRE_BASE - FRE_SENTENCE_LENGTH * words_per_sentence - FRE_SYLL_PER_WORD * syllables_per_word
+        fk_grade = 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+    else:
+        flesch = fk_grade = 0.0
+
+    fog = 0.4 * (words_per_sentence + 100 * stats["difficult_words"] / words) if words else 0.0
+    smog = (1.043 * (30 * stats["polysyllables"] / sentences) ** 0.5 + 3.1291) if sentences else 0.0
+    ari = (4.71 * chars_per_word + 0.5 * words_per_sentence - 21.43) if chars_per_word and words_per_sentence else 0.0
+
+    letters_per_100 = 100 * _ratio(stats["letters"], words)
+    sentences_per_100 = 100 * _ratio(sentences, words)
+    coleman_liau = ((0.058 * letters_per_100) - (0.296 * sentences_per_100) - 15.8
+                    if letters_per_100 and sentences_per_100 else 0.0)
+    lix = (words_per_sentence + 100 * stats["long_words"] / words) if words else 0.0
+
+    return {
+        "flesch_reading_ease": flesch,
+        "flesch_kincaid_grade": fk_grade,
+        "gunning_fog": fog,
+        "smog_index": smog,
+        "automated_readability_index": ari,
+        "coleman_liau_index": coleman_liau,
+        "lix": lix,
+        "reading_time_seconds": READING_MS_PER_CHAR * stats["characters"] / 1000,
+    }
+
 
 def analyze_readability(text):
     """
@@ -11,15 +151,7 @@ def analyze_readability(text):
     Returns:
         dict: Readability scores including Flesch Reading Ease and Grade Level.
     """
-    scores = {
-        "flesch_reading_ease": textstat.flesch_reading_ease(text),
-        "flesch_kincaid_grade": textstat.flesch_kincaid_grade(text),
-        "gunning_fog": textstat.gunning_fog(text),
-        "smog_index": textstat.smog_index(text),
-        "automated_readability_index": textstat.automated_readability_index(text),
-        # Add more metrics as needed
-    }
-    return scores
+    return readability_scores(text_statistics(text))
 
 # Example usage and test
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
-from transformers import pipeline
 import json
+from ..model_registry import get_model
+from ..inference_server import infer
+from .chunked_inference import CHUNK_LONG_TEXTS, classify_long_texts
 
 def analyze_sentiment(text):
     """
@@ -11,15 +13,42 @@ def analyze_sentiment(text):
     Returns:
         dict: Dictionary with sentiment label and confidence score.
     """
-    # Load sentiment analysis pipeline (download model if needed)
-    sentiment_pipeline = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+    # Coalesced with concurrent callers into one forward pass
+    return infer("sentiment", text, analyze_sentiment_batch)
 
-    result = sentiment_pipeline(text)[0]  # returns list with one dict
-    label = result['label'].lower()  # 'POSITIVE' or 'NEGATIVE'
-    score = result['score']
+def analyze_sentiment_batch(texts, batch_size=16, chunked=None):
+    """
+    Analyze sentiment of many texts with padded mini-batches.
+
+    Args:
+        texts (list): Input text strings.
+        batch_size (int): Texts (or windows) per forward pass.
+        chunked (bool): Score long texts over sliding token windows instead of
+            truncating them (default: CHUNK_LONG_TEXTS).
+
+    Returns:
+        list: One {"sentiment", "confidence"} dict per input text, in order.
+    """
+    if not texts:
+        return []
+
+    # Shared sentiment pipeline (loaded once per process)
+    sentiment_pipeline = get_model("sentiment")
+
+    if chunked is None:
+        chunked = CHUNK_LONG_TEXTS
+
+    if chunked:
+        results = []
+        for scores in classify_long_texts(sentiment_pipeline, texts, batch_size=batch_size):
+            label = max(scores, key=scores.get)
+            results.append({"label": label, "score": scores[label]})
+    else:
+        results = sentiment_pipeline(list(texts), batch_size=batch_size, truncation=True)
 
     # Transformer does not directly return neutral, so we classify only pos/neg
-    return {"sentiment": label, "confidence": score}
+    # ('POSITIVE' or 'NEGATIVE' → lower-case)
+    return [{"sentiment": r['label'].lower(), "confidence": r['score']} for r in results]
 
 # Example usage and test
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import threading
+import weakref
+from array import array
+from collections import OrderedDict
+
+from ..result_cache import hash_bytes
+
+# Token ids kept per process, summed over all cached documents (4 bytes each)
+TOKEN_CACHE_MAX_TOKENS = int(os.environ.get("SOCION_TOKEN_CACHE_MAX_TOKENS", "5000000"))
+
+# tokenizer -> family key, computed once per tokenizer instance
+_families = weakref.WeakKeyDictionary()
+_families_lock = threading.Lock()
+
+
+def vocab_family(tokenizer):
+    """
+    Key shared by every tokenizer that maps text to the same ids.
+
+    For fast tokenizers it hashes the normalizer, pre-tokenizer and model
+    (vocabulary) – so e.g. the DistilBERT and BERT uncased tokenizers share
+    a family even though their classes and max lengths differ.
+    """
+    with _families_lock:
+        family = _families.get(tokenizer)
+    if family is not None:
+        return family
+
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        spec = json.loads(backend.to_str())
+        spec = {key: spec.get(key) for key in ("normalizer", "pre_tokenizer", "model")}
+    else:
+        spec = {"class": type(tokenizer).__name__, "vocab": sorted(tokenizer.get_vocab().items())}
+    family = hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    with _families_lock:
+        _families[tokenizer] = family
+    return family
+
+
+class TokenCache:
+    """LRU of token ids (no special tokens) keyed by (vocab family, text hash)."""
+
+    def __init__(self, max_tokens=TOKEN_CACHE_MAX_TOKENS):
+        self.max_tokens = max_tokens
+        self._entries = OrderedDict()
+        self._tokens = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            ids = self._entries.get(key)
+            if ids is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return ids
+
+    def put(self, key, ids):
+        if len(ids) > self.max_tokens:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._tokens -= len(previous)
+            self._entries[key] = ids
+            self._tokens += len(ids)
+            while self._tokens > self.max_tokens:
+                _, evicted = self._entries.popitem(last=False)
+                self._tokens -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"documents": len(self._entries), "tokens": self._tokens,
+                    "hits": self.hits, "misses": self.misses}
+
+
+TOKEN_CACHE = TokenCache()
+
+
+def encode_texts(tokenizer, texts, cache=TOKEN_CACHE):
+    """
+    Token ids (without special tokens) for each text, tokenizing each
+    distinct text at most once per vocabulary family across all callers.
+
+    Args:
+        tokenizer: A Hugging Face tokenizer.
+        texts (list): Input text strings.
+        cache (TokenCache): Where encodings are shared.
+
+    Returns:
+        list: One sequence of token ids per text, in order.
+    """
+    family = vocab_family(tokenizer)
+    keys = [(family, hash_bytes(text)) for text in texts]
+    encoded = [cache.get(key) for key in keys]
+
+    missing = {}
+    for i, ids in enumerate(encoded):
+        if ids is None:
+            missing.setdefault(keys[i], []).append(i)
+    if missing:
+        first_texts = [texts[positions[0]] for positions in missing.values()]
+        results = tokenizer(first_texts, add_special_tokens=False, verbose=False)["input_ids"]
+        for (key, positions), ids in zip(missing.items(), results):
+            ids = array("I", ids)
+            cache.put(key, ids)
+            for i in positions:
+                encoded[i] = ids
+    return encoded
@@ -1,16 +1,17 @@
-from docx import Document
 from io import BytesIO
 
 def extract_text_from_docx(docx_input):
     """
-    Accepts path or bytes for docx.
+    Accepts path, binary file-like object or bytes for docx.
 
     If bytes, wrap in BytesIO.
     """
-    if isinstance(docx_input, bytes):
+    from docx import Document
+
+    if isinstance(docx_input, (bytes, bytearray, memoryview)):
         docx_file = BytesIO(docx_input)
     else:
-        docx_file = docx_input  # assume path string
+        docx_file = docx_input  # path string or file-like object
 
     doc = Document(docx_file)
     paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
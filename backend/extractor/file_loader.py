@@ -1,43 +1,116 @@
+import hashlib
 import os
-import shutil
+import tempfile
 
 # Allowed extensions and max file size (e.g., 10MB)
 ALLOWED_EXTENSIONS = {'.pdf', '.docx', '.jpg', '.png','.jpeg', '.bmp', '.tiff'}
 MAX_FILE_SIZE_MB = 10
-TEMP_FOLDER = 'temp/'
-
-def ensure_temp_folder():
-    if not os.path.exists(TEMP_FOLDER):
-        os.makedirs(TEMP_FOLDER)
 
 def get_extension(filename):
     return os.path.splitext(filename)[1].lower()
 
-def validate_file(file_path):
-    # Check extension
-    ext = get_extension(file_path)
+def validate_extension(filename):
+    ext = get_extension(filename)
     if ext not in ALLOWED_EXTENSIONS:
         raise ValueError(f"Unsupported file extension: {ext}")
+    return ext
+
+def validate_file(file_path):
+    # Check extension
+    validate_extension(file_path)
 
     # Check file size
     size_in_mb = os.path.getsize(file_path) / (1024 * 1024)
     if size_in_mb > MAX_FILE_SIZE_MB:
         raise ValueError(f"File size {size_in_mb:.2f}MB exceeds the limit of {MAX_FILE_SIZE_MB}MB.")
 
-def save_temp_file(file_path):
-    ensure_temp_folder()
-    filename = os.path.basename(file_path)
-    temp_path = os.path.join(TEMP_FOLDER, filename)
-
-    # Copy file to temp folder
-    shutil.copy2(file_path, temp_path)
-    return temp_path
-
 def load_file(file_path):
+    """Validate an on-disk file and return its path (extractors read it in place)."""
     validate_file(file_path)
-    temp_path = save_temp_file(file_path)
+    return file_path
+
+
+class HashingFileWriter:
+    """
+    Writable upload sink: bytes go straight to a temp file in `dest_dir`
+    while being hashed and size-checked, so an upload is written exactly once.
+
+    Bytes past `max_size_mb` are dropped and `too_large` is set instead of
+    raising mid-upload; call commit() to move the file to its final name.
+    """
+
+    def __init__(self, dest_dir, max_size_mb=MAX_FILE_SIZE_MB):
+        os.makedirs(dest_dir, exist_ok=True)
+        fd, self.name = tempfile.mkstemp(dir=dest_dir, suffix=".part")
+        self._file = os.fdopen(fd, "w+b")
+        self._hash = hashlib.sha256()
+        self.max_size_mb = max_size_mb
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.size = 0
+        self.too_large = False
+        self.committed = False
+
+    # --- file-like interface used by the upload parser -----------------
+    def write(self, data):
+        if self.too_large:
+            return len(data)
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.too_large = True
+            return len(data)
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def read(self, *args):
+        return self._file.read(*args)
+
+    def readline(self, *args):
+        return self._file.readline(*args)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def seek(self, *args):
+        return self._file.seek(*args)
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        return self._file.flush()
+
+    def close(self):
+        """Close; an upload that was never committed is deleted."""
+        if not self._file.closed:
+            self._file.close()
+        if not self.committed and os.path.exists(self.name):
+            os.remove(self.name)
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
 
-    with open(temp_path, 'rb') as f:
-        raw_data = f.read()
+    # --- ingest API ------------------------------------------------------
+    def hexdigest(self):
+        """sha256 of everything written so far."""
+        return self._hash.hexdigest()
 
-    return raw_data
+    def commit(self, final_path):
+        """Move the upload to `final_path` (a rename, not a copy) and return it."""
+        if self.too_large:
+            raise ValueError(f"File exceeds the limit of {self.max_size_mb}MB.")
+        self._file.flush()
+        self._file.close()
+        os.replace(self.name, final_path)
+        self.name = final_path
+        self.committed = True
+        return final_path
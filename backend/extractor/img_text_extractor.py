@@ -1,17 +1,28 @@
-import easyocr
+from ..model_registry import get_model
+from .ocr_engine import extract_text_from_image
 
 def extract_text_with_easyocr(image_path, languages=['en']):
     """
     Extracts text from an image using EasyOCR.
 
+    English images go through the shared OCR engine (pooled warm readers,
+    downscaling / binarization, page-parallel multi-page TIFFs).
+
     Args:
-        image_path (str): Path to the input image file.
+        image_path (str): Path to the input image file (bytes or a binary
+            file-like object also work).
         languages (list): List of language codes (default is English).
 
     Returns:
         str: Extracted text as a plain string.
     """
+    if list(languages) == ['en']:
+        return extract_text_from_image(image_path, get_model("ocr"))
+
+    import easyocr
     reader = easyocr.Reader(languages)
+    if hasattr(image_path, "read"):
+        image_path = image_path.read()  # EasyOCR takes paths, bytes or arrays
     results = reader.readtext(image_path, detail=0)  # detail=0 returns only text parts
     text = "\n".join(results)
     return text
@@ -1,46 +1,66 @@
-import os
-from .file_loader import load_file,get_extension
-from .pdf_text_extractor import extract_text_from_pdf
+from .file_loader import load_file,get_extension,validate_extension
+from .pdf_text_extractor import iter_pdf_pages
 from .docx_text_extractor import extract_text_from_docx
 from .img_text_extractor import extract_text_with_easyocr
 
-def master_text_extractor(file_path):
+def master_text_extractor(source, filename=None):
+    """
+    Extract text from a PDF, DOCX or image.
 
-    temp_path = None
+    Args:
+        source: Path of the file, or an open binary file-like object / buffer.
+        filename (str): Original name, required when `source` is not a path
+            (used to pick the extractor).
+
+    Returns:
+        str: Extracted text.
+    """
+    for event in iter_text_extraction(source, filename):
+        if "text" in event:
+            return event["text"]
+    return ""
+
+def iter_text_extraction(source, filename=None):
+    """
+    Same as master_text_extractor, but as a generator with progress.
+
+    Yields:
+        {"page": i, "pages": n, "page_text": "..."} for each PDF page, in
+        order, as soon as it is extracted; then {"text": full_text} last.
+    """
     extracted_text = ""
 
     try:
-        temp_path = load_file(file_path)
-        ext = get_extension(file_path).lower()
+        if isinstance(source, str) and filename is None:
+            # Path on disk: validated and read in place, never copied
+            source = load_file(source)
+            ext = get_extension(source)
+        else:
+            ext = validate_extension(filename or "")
 
         if ext == '.pdf':
             print("→ Using PDF Extractor")
-            extracted_text = extract_text_from_pdf(temp_path)
+            pages = []
+            for index, page_count, page_text in iter_pdf_pages(source):
+                pages.append(page_text)
+                yield {"page": index + 1, "pages": page_count, "page_text": page_text}
+            # Pages keep their form-feed separators
+            extracted_text = "".join(pages).strip()
 
         elif ext == '.docx':
             print("→ Using DOCX Extractor")
-            extracted_text = extract_text_from_docx(temp_path)
+            extracted_text = extract_text_from_docx(source)
 
         elif ext in {'.jpg', '.jpeg', '.png', '.bmp', '.tiff'}:
             print("→ Using OCR Extractor")
-            extracted_text = extract_text_with_easyocr(temp_path)
+            extracted_text = extract_text_with_easyocr(source)
 
         else:
             raise ValueError(f"No extractor available for extension {ext}")
 
-        # Save extracted text
-        with open("output_text.txt", "w", encoding="utf-8") as f:
-            f.write(extracted_text)
-
-        print(f"→ Success! {len(extracted_text):,} characters saved to output_text.txt")
-        return extracted_text
+        print(f"→ Success! {len(extracted_text):,} characters extracted")
+        yield {"text": extracted_text}
 
     except Exception as e:
         print(f"Error extracting text: {e}")
         raise
-
-    finally:
-        # Always clean temp file if it exists
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
-            print("→ Temp file cleaned")
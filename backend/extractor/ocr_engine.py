@@ -0,0 +1,124 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+
+# Warm EasyOCR readers kept per process (one per concurrent recognition).
+# Each reader holds its own detector + recognizer weights, so keep this small.
+OCR_POOL_SIZE = int(os.environ.get("SOCION_OCR_POOL_SIZE", "2"))
+# Images with a known resolution are scaled down to this one; every image
+# is kept within OCR_MAX_SIDE pixels
+OCR_TARGET_DPI = int(os.environ.get("SOCION_OCR_TARGET_DPI", "150"))
+OCR_MAX_SIDE = int(os.environ.get("SOCION_OCR_MAX_SIDE", "2000"))
+OCR_BINARIZE = os.environ.get("SOCION_OCR_BINARIZE", "1") != "0"
+# Text regions recognized per forward pass
+OCR_BATCH_SIZE = int(os.environ.get("SOCION_OCR_BATCH_SIZE", "16"))
+
+
+class OCRReaderPool:
+    """Pool of warm EasyOCR readers; grows lazily up to `size`."""
+
+    def __init__(self, languages=('en',), size=OCR_POOL_SIZE):
+        self.languages = list(languages)
+        self.size = max(1, size)
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 1
+        self._idle.put(self._new_reader())  # one warm reader up front
+
+    def _new_reader(self):
+        import easyocr
+        return easyocr.Reader(self.languages, verbose=False)
+
+    @contextmanager
+    def reader(self):
+        """Borrow a reader; creates one if all are busy and the pool isn't full."""
+        try:
+            reader = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_grow = self._created < self.size
+                if can_grow:
+                    self._created += 1
+            reader = self._new_reader() if can_grow else self._idle.get()
+        try:
+            yield reader
+        finally:
+            self._idle.put(reader)
+
+
+def _open_image(source):
+    from PIL import Image
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = BytesIO(source)
+    return Image.open(source)
+
+
+def _otsu_threshold(gray):
+    """Otsu's threshold for a uint8 grayscale array."""
+    import numpy as np
+
+    prob = np.bincount(gray.ravel(), minlength=256) / gray.size
+    omega = np.cumsum(prob)                    # class-0 weight per threshold
+    mu = np.cumsum(prob * np.arange(256))      # class-0 cumulative mean
+    denominator = omega * (1.0 - omega)
+    between = np.zeros(256)
+    valid = denominator > 0
+    between[valid] = (mu[-1] * omega[valid] - mu[valid]) ** 2 / denominator[valid]
+    return int(np.argmax(between))
+
+
+def preprocess_image(image):
+    """
+    Grayscale, downscale to OCR_TARGET_DPI / OCR_MAX_SIDE and (optionally)
+    binarize one PIL image. Returns a uint8 numpy array.
+
+    Only images that carry a resolution (image.info["dpi"], e.g. scans and
+    rendered PDF pages) are scaled by DPI; screenshots and most PNG / JPEG
+    uploads have none and are only bounded by OCR_MAX_SIDE.
+    """
+    import numpy as np
+    from PIL import Image
+
+    image = image.convert("L")
+
+    scale = min(1.0, OCR_MAX_SIDE / float(max(image.size)))
+    source_dpi = (image.info.get("dpi") or (0,))[0]
+    if source_dpi:
+        scale = min(scale, OCR_TARGET_DPI / float(source_dpi))
+    if scale < 1.0:
+        new_size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        image = image.resize(new_size, Image.LANCZOS)
+
+    gray = np.asarray(image, dtype=np.uint8)
+    if OCR_BINARIZE:
+        gray = np.where(gray > _otsu_threshold(gray), 255, 0).astype(np.uint8)
+    return gray
+
+
+def recognize(pool, array):
+    """OCR one preprocessed image array with a reader borrowed from `pool`."""
+    with pool.reader() as reader:
+        # batch_size groups detected text regions into one recognizer pass
+        return "\n".join(reader.readtext(array, detail=0, batch_size=OCR_BATCH_SIZE))
+
+
+def extract_text_from_image(source, pool):
+    """
+    OCR an image (path, bytes or binary file-like). Multi-page TIFFs are
+    OCR'd page by page in parallel; pages are joined with form feeds.
+    """
+    from PIL import ImageSequence
+
+    with _open_image(source) as image:
+        frames = [preprocess_image(frame) for frame in ImageSequence.Iterator(image)]
+
+    if len(frames) == 1:
+        return recognize(pool, frames[0])
+
+    with ThreadPoolExecutor(max_workers=min(pool.size, len(frames)), thread_name_prefix="ocr") as executor:
+        pages = list(executor.map(lambda frame: recognize(pool, frame), frames))
+    return "\f".join(pages)
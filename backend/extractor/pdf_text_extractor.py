@@ -1,8 +1,224 @@
-from pdfminer.high_level import extract_text
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO, StringIO
+
+# Layout analysis is CPU-bound, so big PDFs are split by page range over a
+# process pool. Small PDFs aren't worth the hand-off and run in-process.
+PDF_WORKERS = int(os.environ.get("SOCION_PDF_WORKERS", str(os.cpu_count() or 1)))
+PAGES_PER_TASK = int(os.environ.get("SOCION_PDF_PAGES_PER_TASK", "4"))
+
+# Pages whose text layer has fewer visible characters than this are treated
+# as scanned: they are rasterized and OCR'd instead.
+HYBRID_OCR = os.environ.get("SOCION_PDF_HYBRID_OCR", "1") != "0"
+MIN_PAGE_TEXT_CHARS = int(os.environ.get("SOCION_PDF_MIN_PAGE_CHARS", "20"))
+OCR_RENDER_DPI = int(os.environ.get("SOCION_PDF_OCR_DPI", "200"))
+
+_pool = None
+_pool_lock = threading.Lock()
+_ocr_executor = None
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # "spawn": the parent may already run torch / tokenizer threads
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _as_pdf_file(pdf_input):
+    if isinstance(pdf_input, (bytes, bytearray, memoryview)):
+        return BytesIO(pdf_input)
+    return pdf_input
+
+
+def count_pdf_pages(pdf_input):
+    """Number of pages in a PDF (path, file-like object or bytes)."""
+    from pdfminer.pdfpage import PDFPage
+
+    pdf_input = _as_pdf_file(pdf_input)
+    if isinstance(pdf_input, str):
+        with open(pdf_input, "rb") as fp:
+            return sum(1 for _ in PDFPage.get_pages(fp))
+    pdf_input.seek(0)
+    return sum(1 for _ in PDFPage.get_pages(pdf_input))
+
+
+def _extract_pages(fp, first, last):
+    """Text of pages [first, last) of an open PDF; one string per page, each ending in a form feed."""
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    resources = PDFResourceManager()
+    pages = []
+    for page in PDFPage.get_pages(fp, pagenos=set(range(first, last))):
+        buffer = StringIO()
+        device = TextConverter(resources, buffer, laparams=LAParams())
+        PDFPageInterpreter(resources, device).process_page(page)
+        device.close()
+        pages.append(buffer.getvalue())
+    return pages
+
+
+def _extract_page_range(pdf_path, first, last):
+    """Process-pool task: open the file and extract pages [first, last)."""
+    with open(pdf_path, "rb") as fp:
+        return _extract_pages(fp, first, last)
+
+
+def _iter_text_layer(pdf_input, page_count, workers=None):
+    """
+    Yield (page_index, page_text) from the PDF's text layer, in page order.
+
+    Paths are split into PAGES_PER_TASK-page ranges over a process pool;
+    file-like objects and bytes are extracted in-process.
+    """
+    workers = PDF_WORKERS if workers is None else workers
+    parallel = (isinstance(pdf_input, str) and workers > 1 and page_count > PAGES_PER_TASK)
+    if not parallel:
+        if isinstance(pdf_input, str):
+            with open(pdf_input, "rb") as fp:
+                pages = _extract_pages(fp, 0, page_count)
+        else:
+            pdf_input.seek(0)
+            pages = _extract_pages(pdf_input, 0, page_count)
+        for index, text in enumerate(pages):
+            yield index, text
+        return
+
+    pool = _get_pool()
+    futures = [
+        (first, pool.submit(_extract_page_range, pdf_input, first, min(first + PAGES_PER_TASK, page_count)))
+        for first in range(0, page_count, PAGES_PER_TASK)
+    ]
+    # Results are consumed in submission order, so pages come out in order
+    for first, future in futures:
+        for offset, text in enumerate(future.result()):
+            yield first + offset, text
+
+
+def has_text_layer(page_text, min_chars=MIN_PAGE_TEXT_CHARS):
+    """True if a page's extracted text has at least `min_chars` visible characters."""
+    return sum(1 for ch in page_text if not ch.isspace()) >= min_chars
 
-def extract_text_from_pdf(pdf_path):
-    text = extract_text(pdf_path)
-    # Further cleaning of newlines or whitespace can be done here if necessary
-    return text.strip()
 
+class _PageRenderer:
+    """Rasterizes single PDF pages with pypdfium2 (opened on first use)."""
 
+    def __init__(self, pdf_input):
+        self._source = pdf_input
+        self._document = None
+
+    def render(self, index, dpi=OCR_RENDER_DPI):
+        import pypdfium2 as pdfium
+
+        if self._document is None:
+            source = self._source
+            if not isinstance(source, str):
+                # pdfminer shares the stream; give pdfium its own copy
+                position = source.tell()
+                source.seek(0)
+                data = source.read()
+                source.seek(position)
+                source = data
+            self._document = pdfium.PdfDocument(source)
+        image = self._document[index].render(scale=dpi / 72).to_pil()
+        # to_pil() carries no resolution; preprocess_image scales by it
+        image.info["dpi"] = (dpi, dpi)
+        return image
+
+    def close(self):
+        if self._document is not None:
+            self._document.close()
+
+
+def _get_ocr_executor():
+    global _ocr_executor
+    from .ocr_engine import OCR_POOL_SIZE
+    with _pool_lock:
+        if _ocr_executor is None:
+            _ocr_executor = ThreadPoolExecutor(max_workers=OCR_POOL_SIZE, thread_name_prefix="pdf-ocr")
+        return _ocr_executor
+
+
+def _ocr_page_image(image):
+    from ..model_registry import get_model
+    from .ocr_engine import preprocess_image, recognize
+
+    return recognize(get_model("ocr"), preprocess_image(image)) + "\f"
+
+
+def iter_pdf_pages(pdf_input, workers=None, hybrid_ocr=None):
+    """
+    Yield (page_index, page_count, page_text) in page order as pages finish.
+
+    With hybrid OCR (default: HYBRID_OCR), pages without a usable text layer
+    are rasterized and OCR'd in parallel; every other page keeps its text.
+    """
+    hybrid_ocr = HYBRID_OCR if hybrid_ocr is None else hybrid_ocr
+    pdf_input = _as_pdf_file(pdf_input)
+    page_count = count_pdf_pages(pdf_input)
+
+    if not hybrid_ocr:
+        for index, text in _iter_text_layer(pdf_input, page_count, workers):
+            yield index, page_count, text
+        return
+
+    renderer = _PageRenderer(pdf_input)
+    # Entries are (index, text, text) or (index, Future, text-layer fallback)
+    # – flushed strictly in order
+    pending = deque()
+    try:
+        for index, text in _iter_text_layer(pdf_input, page_count, workers):
+            if not hybrid_ocr or has_text_layer(text):
+                pending.append((index, text, text))
+            else:
+                try:
+                    # pdfium isn't thread-safe: render here, OCR on the pool
+                    image = renderer.render(index)
+                    pending.append((index, _get_ocr_executor().submit(_ocr_page_image, image), text))
+                except ImportError:
+                    print("[WARN] pypdfium2 not installed – scanned pages can't be OCR'd")
+                    pending.append((index, text, text))
+                    hybrid_ocr = False
+                except Exception as e:
+                    # A corrupt page must not abort the rest of the document
+                    print(f"[WARN] Could not render page {index + 1} for OCR: {e}")
+                    pending.append((index, text, text))
+
+            while pending and (isinstance(pending[0][1], str) or pending[0][1].done()):
+                yield _resolve_page(pending.popleft(), page_count)
+
+        while pending:
+            yield _resolve_page(pending.popleft(), page_count)
+    finally:
+        renderer.close()
+
+
+def _resolve_page(entry, page_count):
+    index, value, fallback = entry
+    if not isinstance(value, str):
+        try:
+            value = value.result()
+        except Exception as e:
+            print(f"[WARN] OCR failed on page {index + 1}: {e}")
+            value = fallback
+    return index, page_count, value
+
+
+def extract_text_from_pdf(pdf_input):
+    """
+    Accepts a path, a binary file-like object (incl. mmap) or bytes.
+
+    Pages are separated by form feeds ('\\f'), as pdfminer does.
+    """
+    text = "".join(page_text for _, _, page_text in iter_pdf_pages(pdf_input))
+    # Further cleaning of newlines or whitespace can be done here if necessary
+    return text.strip()
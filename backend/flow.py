@@ -1,17 +1,344 @@
 # backend/flow.py
+import copy
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-from .extractor.master_extractor import master_text_extractor
+from itertools import islice
+from .extractor.file_loader import get_extension
+from .extractor.master_extractor import master_text_extractor, iter_text_extraction
 from .analyzer.readability_analyzer import analyze_readability
-from .analyzer.sentiment_analyzer import analyze_sentiment
-from .analyzer.emotion_detection import analyze_emotions
-from .analyzer.keyword_extractor import extract_keywords
-from .analyzer.ai_text_detector import AITextDetector
-from .analyzer.consistency_checker import compute_coherence_score
-from .analyzer.category_classifier import classify_category
+from .analyzer.sentiment_analyzer import analyze_sentiment, analyze_sentiment_batch
+from .analyzer.emotion_detection import analyze_emotions, analyze_emotions_batch
+from .analyzer.keyword_extractor import KEYWORD_SCORING, extract_keywords, extract_keywords_batch
+from .analyzer.ai_text_detector import detect_ai_text, detect_ai_text_batch
+from .analyzer.consistency_checker import compute_coherence_score, compute_coherence_scores
+from .analyzer.category_classifier import (CATEGORY_MODE, PREFILTER_TOP_K, classify_category,
+                                           classify_category_batch)
 from .analyzer.hashtage_generator.hashtag_suggestor import get_hashtags
 from .analyzer.engagement_predictor import predict_engagement
+from . import metrics, model_registry
+from .metrics import EVENT_TIMINGS
+from .model_registry import MODEL_IDS, get_backend
+from .result_cache import (CACHE_ENABLED, RESULT_CACHE, STAGE_CACHE, hash_bytes, hash_file,
+                           result_key, stage_key)
+
+
+# Run independent stages on a thread pool instead of one after another.
+# Override per call with main_pipeline(..., concurrent=True/False).
+CONCURRENT_STAGES = os.environ.get("SOCION_CONCURRENT_STAGES", "0") == "1"
+STAGE_WORKERS = int(os.environ.get("SOCION_STAGE_WORKERS", "4"))
+
+# Documents per batch_pipeline() chunk (each model sees them as mini-batches)
+BATCH_SIZE = int(os.environ.get("SOCION_BATCH_SIZE", "32"))
+
+
+# ----------------------------------------------------------------------
+# STAGE RUNNERS – each gets the text and the results finished so far
+# ----------------------------------------------------------------------
+def _run_category(text, results):
+    return classify_category(text)
+
+
+def _run_readability(text, results):
+    return analyze_readability(text)
+
+
+def _run_sentiment(text, results):
+    return analyze_sentiment(text)
+
+
+def _run_emotion(text, results):
+    return analyze_emotions(text)
+
+
+def _run_keywords(text, results):
+    return extract_keywords(text, 10)
+
+
+def _batch_keywords(texts):
+    return extract_keywords_batch(texts, 10)
+
+
+def _run_ai_detection(text, results):
+    return detect_ai_text(text)
+
+
+def _run_coherence(text, results):
+    return compute_coherence_score(text)
+
+
+def _run_hashtags(text, results):
+    category = results["category"]
+    cat_name = category[0] if category and len(category) > 0 else ""
+    return get_hashtags(cat_name, "")
+
+
+def _run_engagement(text, results):
+    return predict_engagement(
+        results["sentiment"].get("confidence", 0.0),
+        len(text.split()),
+        results["emotion"],
+    )
+
+
+# ----------------------------------------------------------------------
+# STAGE TABLE – order is the sequential order; "deps" is the real graph.
+# "batch" (optional) scores a list of texts at once for batch_pipeline().
+# "version" (optional) makes a stage's output cacheable per text; bump it
+# whenever the stage's model or logic changes. "models" (optional) lists the
+# registry models a stage may load, so their load time is timed separately.
+# ----------------------------------------------------------------------
+PIPELINE_VERSION = "1.0"
+
+
+def _model_version(name):
+    """Checkpoint id, plus the inference backend when it isn't plain PyTorch."""
+    backend = get_backend(name)
+    return MODEL_IDS[name] if backend == "torch" else f"{MODEL_IDS[name]}:{backend}"
+
+
+PIPELINE_STAGES = [
+    {"name": "category", "deps": (), "run": _run_category, "fallback": ["unknown", 0.0],
+     "models": ("category", "sentence_embedder"),
+     "version": f"{_model_version('category')}+{CATEGORY_MODE}{PREFILTER_TOP_K}"
+                f"+{_model_version('sentence_embedder')}@2",
+     "batch": classify_category_batch, "start": "Classifying category...", "done": "Category classified"},
+    {"name": "readability", "deps": (), "run": _run_readability, "fallback": {},
+     "version": "readability@2",
+     "start": "Analyzing readability...", "done": "Readability complete"},
+    {"name": "sentiment", "deps": (), "run": _run_sentiment, "fallback": {},
+     "models": ("sentiment",),
+     "version": f"{_model_version('sentiment')}@1",
+     "batch": analyze_sentiment_batch, "start": "Analyzing sentiment...", "done": "Sentiment complete"},
+    {"name": "emotion", "deps": (), "run": _run_emotion, "fallback": {},
+     "models": ("emotion",),
+     "version": f"{_model_version('emotion')}@1",
+     "batch": analyze_emotions_batch, "start": "Detecting emotions...", "done": "Emotion detection complete"},
+    # tfidf scores depend on the corpus seen so far, not on the text alone
+    {"name": "keywords", "deps": (), "run": _run_keywords, "fallback": [],
+     "version": f"rake+{KEYWORD_SCORING}@1", "cache": KEYWORD_SCORING != "tfidf",
+     "batch": _batch_keywords, "start": "Extracting keywords...", "done": "Keywords extracted"},
+    {"name": "ai_detection", "deps": (), "run": _run_ai_detection, "fallback": {},
+     "models": ("ai_detector",),
+     "version": f"{_model_version('ai_detector')}@1",
+     "batch": detect_ai_text_batch, "start": "Detecting AI-generated text...", "done": "AI detection complete"},
+    {"name": "coherence", "deps": (), "run": _run_coherence, "fallback": 0.0,
+     "models": ("sentence_embedder",),
+     "version": f"{_model_version('sentence_embedder')}@1",
+     "batch": compute_coherence_scores, "start": "Computing coherence score...", "done": "Coherence calculated"},
+    {"name": "hashtags", "deps": ("category",), "run": _run_hashtags, "fallback": [],
+     "start": "Generating hashtags...", "done": "Hashtags ready"},
+    {"name": "engagement", "deps": ("sentiment", "emotion"), "run": _run_engagement, "fallback": 0.0,
+     "start": "Predicting engagement...", "done": "Engagement predicted"},
+]
+
+# Changes whenever any stage version does → invalidates cached full results
+PIPELINE_FINGERPRINT = hash_bytes(
+    PIPELINE_VERSION + "|" + "|".join(f"{s['name']}={s.get('version', '')}" for s in PIPELINE_STAGES)
+)
+
+# Progress window covered by the analysis stages (extraction ends at 35 %)
+STAGES_PROGRESS_START = 38
+STAGES_PROGRESS_END = 89
+
+
+# ----------------------------------------------------------------------
+# PROFILES – named sets of wanted outputs (stage names). The planner adds
+# whatever they depend on; every other stage is skipped, models and all.
+# ----------------------------------------------------------------------
+PROFILES = {
+    "full": tuple(s["name"] for s in PIPELINE_STAGES),
+    "quick": ("sentiment", "keywords", "readability"),
+    "seo": ("category", "keywords", "hashtags", "readability"),
+}
+
+_STAGES_BY_NAME = {s["name"]: s for s in PIPELINE_STAGES}
+
+
+def validate_profile(profile):
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{profile}'; expected one of {', '.join(PROFILES)}")
+    return profile
+
+
+# Used when a request names neither a profile nor outputs
+DEFAULT_PROFILE = validate_profile(os.environ.get("SOCION_PROFILE", "full"))
+
+
+def plan_stages(outputs=None, profile=None):
+    """
+    The stages needed for the requested outputs, dependencies included.
+
+    Args:
+        outputs (list): Stage names wanted in the result, e.g.
+            ["sentiment", "keywords"] (a comma-separated string also works).
+            Takes precedence over `profile`.
+        profile (str): Key of PROFILES (default: DEFAULT_PROFILE).
+
+    Returns:
+        list: Stage dicts from PIPELINE_STAGES, in table order. Raises
+        ValueError for an unknown profile or output.
+    """
+    if isinstance(outputs, str):
+        outputs = [name.strip() for name in outputs.split(",")]
+    outputs = [name for name in outputs or () if name]
+    if not outputs:
+        outputs = PROFILES[validate_profile(profile or DEFAULT_PROFILE)]
+
+    unknown = [name for name in outputs if name not in _STAGES_BY_NAME]
+    if unknown:
+        raise ValueError(f"Unknown output(s) {', '.join(unknown)}; expected any of {', '.join(_STAGES_BY_NAME)}")
+
+    needed, todo = set(), list(outputs)
+    while todo:
+        name = todo.pop()
+        if name not in needed:
+            needed.add(name)
+            todo.extend(_STAGES_BY_NAME[name]["deps"])
+    return [stage for stage in PIPELINE_STAGES if stage["name"] in needed]
+
+
+def _stage_cache_key(stage, text_hash):
+    """Stage-cache key, or None if the stage isn't cacheable.
+
+    Only versioned stages without dependencies are cached: their output is a
+    function of the text alone. Stages can opt out with "cache": False.
+    """
+    if (not CACHE_ENABLED or not text_hash or "version" not in stage or stage["deps"]
+            or not stage.get("cache", True)):
+        return None
+    return stage_key(text_hash, stage["name"], stage["version"])
+
+
+def _cold_models(models):
+    """The models in `models` that aren't loaded yet (their load lands on this run)."""
+    return [name for name in models if not model_registry.is_loaded(name)]
+
+
+def _timing(started, cold_models, **fields):
+    """
+    Timing dict for work that began at `started`, splitting off the load
+    time of any of `cold_models` that got loaded meanwhile.
+    """
+    seconds = time.perf_counter() - started
+    loads = {name: round(model_registry.load_seconds(name), 6)
+             for name in cold_models if model_registry.is_loaded(name)}
+    model_load = min(seconds, sum(loads.values()))
+    return dict(seconds=round(seconds, 6), model_load_s=round(model_load, 6),
+                inference_s=round(seconds - model_load, 6), model_loads=loads, **fields)
+
+
+def _run_stage(stage, text, results, text_hash=None, timings=None):
+    """
+    Run one stage; on failure log and return its safe fallback (never raises).
+
+    If `timings` is a dict, the stage's timing is stored under its name.
+    """
+    started = time.perf_counter()
+    cold = _cold_models(stage.get("models", ()))
+    cached, error = False, False
+
+    key = _stage_cache_key(stage, text_hash)
+    value = STAGE_CACHE.get(key) if key else None
+    if value is not None:
+        cached = True
+    else:
+        try:
+            value = stage["run"](text, results)
+        except Exception as e:
+            print(f"[WARN] {stage['name']} failed: {e}")
+            value, error = copy.copy(stage["fallback"]), True
+        else:
+            if key:
+                STAGE_CACHE.put(key, value)
+
+    if timings is not None:
+        timings[stage["name"]] = _timing(started, cold, cached=cached, error=error)
+    return value
+
+
+def _run_stages_sequential(text, results, progress, stages, text_hash=None, timings=None):
+    """Run `stages` in table order, yielding start/done progress for each."""
+    # Progress slot per stage (6 % each for the full table)
+    width = (STAGES_PROGRESS_END - STAGES_PROGRESS_START + 3) // len(stages)
+    for i, stage in enumerate(stages):
+        yield from progress(stage["start"], STAGES_PROGRESS_START + width * i)
+        results[stage["name"]] = _run_stage(stage, text, results, text_hash, timings)
+        yield from progress(stage["done"], STAGES_PROGRESS_START + width * i + width // 2, stage=stage["name"])
+
+
+def _run_stages_concurrent(text, results, progress, stages, max_workers, text_hash=None, timings=None):
+    """
+    Schedule `stages` on a thread pool as soon as their dependencies finish.
+    Progress is emitted in completion order.
+    """
+    pending = list(stages)
+    total = len(pending)
+    span = STAGES_PROGRESS_END - STAGES_PROGRESS_START
+    running = {}
+
+    yield from progress(f"Running {total} analysis stages in parallel...", STAGES_PROGRESS_START)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as pool:
+        while pending or running:
+            # Submit everything whose dependencies are satisfied
+            for stage in [s for s in pending if all(d in results for d in s["deps"])]:
+                pending.remove(stage)
+                # Dependents only read finished results, so a snapshot is safe
+                running[pool.submit(_run_stage, stage, text, dict(results), text_hash, timings)] = stage
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                results[stage["name"]] = future.result()
+                done_count = len([s for s in stages if s["name"] in results])
+                yield from progress(stage["done"], STAGES_PROGRESS_START + span * done_count // total,
+                                    stage=stage["name"])
+
+
+def _run_stages_batch(texts, stages, timings=None):
+    """
+    Run `stages` over a list of texts. Model stages with a "batch" runner
+    see all texts at once; the rest run per text. Returns one results dict per text.
+
+    `timings`, if given, is a list of one dict per text that receives the
+    timing of every stage run on that text alone (including its "error" flag).
+    """
+    text_hashes = [hash_bytes(text) for text in texts] if CACHE_ENABLED else [None] * len(texts)
+    timings = timings if timings is not None else [None] * len(texts)
+    all_results = [{} for _ in texts]
+    for stage in stages:
+        stage_started = time.perf_counter()
+        if "batch" in stage:
+            # Serve what we can from the stage cache, batch the rest
+            keys = [_stage_cache_key(stage, h) for h in text_hashes]
+            misses = []
+            for i, key in enumerate(keys):
+                cached = STAGE_CACHE.get(key) if key else None
+                if cached is not None:
+                    all_results[i][stage["name"]] = cached
+                else:
+                    misses.append(i)
+
+            try:
+                values = stage["batch"]([texts[i] for i in misses]) if misses else []
+                for i, value in zip(misses, values):
+                    all_results[i][stage["name"]] = value
+                    if keys[i]:
+                        STAGE_CACHE.put(keys[i], value)
+            except Exception as e:
+                # Fall back to per-text runs so one bad document can't sink the chunk
+                print(f"[WARN] batched {stage['name']} failed, retrying per document: {e}")
+
+        for i, text in enumerate(texts):
+            if stage["name"] not in all_results[i]:
+                all_results[i][stage["name"]] = _run_stage(stage, text, all_results[i], text_hashes[i],
+                                                           timings[i])
+        if texts:
+            metrics.BATCH_STAGE_SECONDS.observe(time.perf_counter() - stage_started, stage=stage["name"])
+    return all_results
 
 
 # ----------------------------------------------------------------------
@@ -33,7 +360,7 @@ def aggregate_results(
     return {
         "metadata": {
             "timestamp": datetime.now().isoformat(),
-            "pipeline_version": "1.0",
+            "pipeline_version": PIPELINE_VERSION,
         },
         "extracted_text": extracted_text or "",
         "category": category_result or ["unknown", 0.0],
@@ -49,167 +376,280 @@ def aggregate_results(
     }
 
 
+# Result fields filled in by each stage
+STAGE_RESULT_FIELDS = {
+    "category": ("category",),
+    "readability": ("readability_analysis",),
+    "sentiment": ("sentiment_analysis",),
+    "emotion": ("emotion_detection",),
+    "keywords": ("extracted_keywords", "best_keyword"),
+    "ai_detection": ("ai_text_detection",),
+    "coherence": ("coherence_score",),
+    "hashtags": ("hashtag_suggestions",),
+    "engagement": ("engagement_score",),
+}
+
+SKIPPED_SECTION = {"skipped": True}
+
+
+def _aggregate_stage_results(text, results):
+    """
+    aggregate_results() from a {stage name: value} dict. The fields of stages
+    that didn't run hold SKIPPED_SECTION – so they can't be mistaken for real
+    defaults like a 0.0 score – and are listed in metadata["skipped_stages"].
+    """
+    skipped = [stage["name"] for stage in PIPELINE_STAGES if stage["name"] not in results]
+    results = dict(results, **{name: copy.copy(_STAGES_BY_NAME[name]["fallback"]) for name in skipped})
+    result = aggregate_results(
+        extracted_text=text,
+        category_result=results["category"],
+        readability_result=results["readability"],
+        sentiment_result=results["sentiment"],
+        emotion_result=results["emotion"],
+        keywords=results["keywords"],
+        ai_detection_result=results["ai_detection"],
+        coherence_score=results["coherence"],
+        hashtag_suggestions=results["hashtags"],
+        engagement_score=results["engagement"],
+    )
+    for name in skipped:
+        for field in STAGE_RESULT_FIELDS[name]:
+            result[field] = dict(SKIPPED_SECTION)
+    result["metadata"]["skipped_stages"] = skipped
+    return result
+
+
 # ----------------------------------------------------------------------
 # MAIN PIPELINE – GENERATOR THAT STREAMS JSON
 # ----------------------------------------------------------------------
-def main_pipeline(input_file: str):
+def main_pipeline(input_file: str, concurrent: bool = None, content_hash: str = None,
+                  event_timings: bool = None, outputs=None, profile: str = None):
     """
     Yields JSON strings:
         {"step": "...", "progress": N}
     Final yield:
         {"result": {...}}
+
+    The result's metadata carries "timings" (total, extraction and per-stage
+    seconds, with model loading split from inference), "input" (file type,
+    bytes, chars, words), "failed_stages" and "skipped_stages" (not needed by
+    the requested outputs). Runs that end without a result put an "error"
+    code on their last event.
+
+    Args:
+        input_file (str): Path of the uploaded file.
+        concurrent (bool): Run independent stages in parallel
+            (default: CONCURRENT_STAGES).
+        content_hash (str): sha256 of the file's bytes, if already known.
+        event_timings (bool): Add "elapsed_s" to every progress event and the
+            stage's timing to each stage's "done" event (default: EVENT_TIMINGS).
+        outputs (list): Stage names wanted in the result (see plan_stages);
+            stages nobody needs are skipped.
+        profile (str): Named output set from PROFILES, used when `outputs`
+            is empty (default: DEFAULT_PROFILE).
     """
+    if concurrent is None:
+        concurrent = CONCURRENT_STAGES
+    if event_timings is None:
+        event_timings = EVENT_TIMINGS
+
+    started = time.perf_counter()
+    stage_timings = {}
 
     # ------------------------------------------------------------------
     # Helper – always yields a valid JSON progress line
     # ------------------------------------------------------------------
-    def step(message: str, prog: int):
+    def step(message: str, prog: int, stage: str = None, error: str = None):
         """Yield a progress JSON string."""
-        yield json.dumps({"step": message, "progress": prog})
+        event = {"step": message, "progress": prog}
+        if error:
+            event["error"] = error
+        if event_timings:
+            event["elapsed_s"] = round(time.perf_counter() - started, 6)
+            if stage in stage_timings:
+                event["timing"] = stage_timings[stage]
+        yield json.dumps(event)
+
+    file_type = get_extension(input_file).lstrip(".")
+    try:
+        input_info = {"file_type": file_type, "bytes": os.path.getsize(input_file)}
+    except OSError:
+        input_info = {"file_type": file_type}
 
     # ------------------------------------------------------------------
     # 0. Upload already done → start at 30 %
     # ------------------------------------------------------------------
     yield from step("Preparing analysis...", 30)
 
+    try:
+        stages = plan_stages(outputs, profile)
+    except ValueError as e:
+        yield from step(f"Invalid analysis options: {e}", 100, error="invalid_options")
+        return
+    # Partial results are cached apart from full ones
+    fingerprint = PIPELINE_FINGERPRINT
+    if len(stages) < len(PIPELINE_STAGES):
+        fingerprint += ":" + ",".join(stage["name"] for stage in stages)
+
+    # ------------------------------------------------------------------
+    # Same bytes analyzed before → answer straight from the cache
+    # ------------------------------------------------------------------
+    cache_key = None
+    if CACHE_ENABLED:
+        try:
+            cache_key = result_key(content_hash or hash_file(input_file), fingerprint)
+        except OSError as e:
+            print(f"[WARN] couldn't hash {input_file}: {e}")
+        cached = RESULT_CACHE.get(cache_key) if cache_key else None
+        if cached is not None:
+            yield from step("Loaded cached analysis", 100)
+            timings = {"total_s": round(time.perf_counter() - started, 6), "extraction_s": 0.0,
+                       "extraction_model_loads": {}, "stages": {}}
+            metadata = dict(cached.get("metadata", {}), cache_hit=True, timings=timings)
+            yield json.dumps({"result": dict(cached, metadata=metadata)})
+            return
+
     # ------------------------------------------------------------------
     # 1. TEXT EXTRACTION
     # ------------------------------------------------------------------
     yield from step("Extracting text...", 32)
+    extraction_started = time.perf_counter()
+    cold = _cold_models(("ocr",))
+    text = ""
     try:
-        text = master_text_extractor(input_file)
+        for event in iter_text_extraction(input_file):
+            if "text" in event:
+                text = event["text"]
+            else:
+                # Per-page progress for PDFs, 32 → 35 %
+                yield from step(f"Extracted page {event['page']}/{event['pages']}",
+                                32 + 3 * event["page"] // event["pages"])
     except Exception as e:
-        yield from step(f"Extraction failed: {e}", 100)
+        yield from step(f"Extraction failed: {e}", 100, error="extraction_failed")
         return
+    extraction = _timing(extraction_started, cold)
     yield from step("Text extracted", 35)
 
     if not text or not text.strip():
-        yield from step("No usable text found", 100)
+        yield from step("No usable text found", 100, error="no_text")
         return
 
     # ------------------------------------------------------------------
-    # 2. CATEGORY
+    # 2-10. ANALYSIS STAGES (planned from PIPELINE_STAGES)
     # ------------------------------------------------------------------
-    yield from step("Classifying category...", 38)
-    try:
-        category = classify_category(text)
-    except Exception as e:
-        category = ["unknown", 0.0]
-    yield from step("Category classified", 41)
+    results = {}
+    text_hash = hash_bytes(text) if CACHE_ENABLED else None
+    if concurrent:
+        yield from _run_stages_concurrent(text, results, step, stages, STAGE_WORKERS, text_hash, stage_timings)
+    else:
+        yield from _run_stages_sequential(text, results, step, stages, text_hash, stage_timings)
 
     # ------------------------------------------------------------------
-    # 3. READABILITY
+    # FINAL AGGREGATION
     # ------------------------------------------------------------------
-    yield from step("Analyzing readability...", 44)
-    try:
-        readability = analyze_readability(text)
-    except Exception as e:
-        readability = {}
-    yield from step("Readability complete", 47)
+    yield from step("Finalising results...", 92)
+    result = _aggregate_stage_results(text, results)
+    result["metadata"].update(
+        timings={
+            "total_s": round(time.perf_counter() - started, 6),
+            "extraction_s": extraction["seconds"],
+            "extraction_model_loads": extraction["model_loads"],
+            # Table order, whichever order they finished in
+            "stages": {s["name"]: stage_timings[s["name"]] for s in stages},
+        },
+        input=dict(input_info, chars=len(text), words=len(text.split())),
+        failed_stages=[name for name, timing in stage_timings.items() if timing["error"]],
+    )
+    timings = result["metadata"]["timings"]
+    print(f"[INFO] pipeline done in {timings['total_s']:.2f}s (extraction {timings['extraction_s']:.2f}s; "
+          + ", ".join(f"{name} {t['seconds']:.2f}s" for name, t in timings["stages"].items()) + ")")
+    # A stage that failed (model load, scrape, OCR...) may work next time:
+    # never pin its fallback to these bytes
+    if cache_key and not result["metadata"]["failed_stages"]:
+        RESULT_CACHE.put(cache_key, result)
+    yield from step("Analysis complete", 100)
 
     # ------------------------------------------------------------------
-    # 4. SENTIMENT
+    # SEND FINAL RESULT
     # ------------------------------------------------------------------
-    yield from step("Analyzing sentiment...", 50)
-    try:
-        sentiment = analyze_sentiment(text)
-    except Exception as e:
-        sentiment = {}
-    yield from step("Sentiment complete", 53)
+    yield json.dumps({"result": result})
 
-    # ------------------------------------------------------------------
-    # 5. EMOTION
-    # ------------------------------------------------------------------
-    yield from step("Detecting emotions...", 56)
-    try:
-        emotion = analyze_emotions(text)
-    except Exception as e:
-        emotion = {}
-    yield from step("Emotion detection complete", 59)
 
-    # ------------------------------------------------------------------
-    # 6. KEYWORDS
-    # ------------------------------------------------------------------
-    yield from step("Extracting keywords...", 62)
-    try:
-        keywords = extract_keywords(text, 10)
-    except Exception as e:
-        keywords = []
-    yield from step("Keywords extracted", 65)
+# ----------------------------------------------------------------------
+# BATCH PIPELINE – MANY DOCUMENTS, BATCHED INFERENCE
+# ----------------------------------------------------------------------
+def batch_pipeline(documents, batch_size: int = None, outputs=None, profile: str = None):
+    """
+    Analyze many documents, running model stages as mini-batches across them.
 
-    # ------------------------------------------------------------------
-    # 7. AI-TEXT DETECTION
-    # ------------------------------------------------------------------
-    yield from step("Detecting AI-generated text...", 68)
-    try:
-        ai_detector = AITextDetector()
-        ai_result = ai_detector.detect_ai(text)
-    except Exception as e:
-        ai_result = {}
-    yield from step("AI detection complete", 71)
+    Args:
+        documents (iterable): Dicts with an "id" and either "text" or "path".
+        batch_size (int): Documents per chunk (default: BATCH_SIZE).
+        outputs (list): Stage names wanted (see plan_stages).
+        profile (str): Named output set, used when `outputs` is empty.
 
-    # ------------------------------------------------------------------
-    # 8. COHERENCE – **THIS WAS CRASHING**
-    # ------------------------------------------------------------------
-    yield from step("Computing coherence score...", 74)
-    try:
-        coherence = compute_coherence_score(text)
-    except Exception as e:
-        # <-- safe fallback, never raises
-        coherence = 0.0
-        print(f"[WARN] coherence_score failed: {e}")
-    yield from step("Coherence calculated", 77)
+    Yields JSON strings, one per document, in input order:
+        {"id": ..., "result": {...}}  or  {"id": ..., "error": "..."}
 
-    # ------------------------------------------------------------------
-    # 9. HASHTAGS
-    # ------------------------------------------------------------------
-    yield from step("Generating hashtags...", 80)
-    try:
-        cat_name = category[0] if category and len(category) > 0 else ""
-        hashtags = get_hashtags(cat_name, "")
-    except Exception as e:
-        hashtags = []
-        print(f"[WARN] hashtag generation failed: {e}")
-    yield from step("Hashtags ready", 83)
+    Results carry metadata["input"] and ["failed_stages"]. This runs in the
+    calling (web) process, so documents are observed in `metrics` here.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    stages = plan_stages(outputs, profile)
+    documents = iter(documents)
 
-    # ------------------------------------------------------------------
-    # 10. ENGAGEMENT PREDICTION
-    # ------------------------------------------------------------------
-    yield from step("Predicting engagement...", 86)
-    try:
-        engagement_score = predict_engagement(
-            sentiment.get("confidence", 0.0),
-            len(text.split()),
-            emotion,
-        )
-    except Exception as e:
-        engagement_score = 0.0
-        print(f"[WARN] engagement prediction failed: {e}")
-    yield from step("Engagement predicted", 89)
+    while True:
+        chunk = list(islice(documents, batch_size))
+        if not chunk:
+            return
 
-    # ------------------------------------------------------------------
-    # FINAL AGGREGATION
-    # ------------------------------------------------------------------
-    yield from step("Finalising results...", 92)
-    result = aggregate_results(
-        extracted_text=text,
-        category_result=category,
-        readability_result=readability,
-        sentiment_result=sentiment,
-        emotion_result=emotion,
-        keywords=keywords,
-        ai_detection_result=ai_result,
-        coherence_score=coherence,
-        hashtag_suggestions=hashtags,
-        engagement_score=engagement_score,
-    )
-    yield from step("Analysis complete", 100)
+        # 1. Text extraction (files only) – failures are reported per document
+        # errors: index -> (reason code for metrics, message)
+        texts, errors = [], {}
+        for i, doc in enumerate(chunk):
+            text = doc.get("text")
+            if doc.get("error"):
+                # Rejected upstream (e.g. a malformed JSONL record)
+                errors[i] = ("invalid_document", doc["error"])
+            elif not isinstance(text, (str, type(None))):
+                errors[i] = ("invalid_document", f'"text" must be a string, got {type(text).__name__}')
+            elif text is None and doc.get("path"):
+                try:
+                    text = master_text_extractor(doc["path"])
+                except Exception as e:
+                    errors[i] = ("extraction_failed", f"Extraction failed: {e}")
+            if i not in errors and (not text or not text.strip()):
+                errors[i] = ("no_text", "No usable text found")
+            texts.append(text)
+
+        # 2. Analysis – only documents that have text
+        usable = [i for i in range(len(chunk)) if i not in errors]
+        doc_timings = {i: {} for i in usable}
+        stage_results = dict(zip(usable, _run_stages_batch([texts[i] for i in usable], stages,
+                                                           [doc_timings[i] for i in usable])))
+
+        # 3. Stream back in input order
+        for i, doc in enumerate(chunk):
+            if i in errors:
+                reason, message = errors[i]
+                metrics.BATCH_DOCUMENTS.inc(outcome="error")
+                metrics.PIPELINE_ERRORS.inc(reason=reason)
+                yield json.dumps({"id": doc.get("id"), "error": message})
+                continue
+
+            result = _aggregate_stage_results(texts[i], stage_results[i])
+            input_info = {"chars": len(texts[i]), "words": len(texts[i].split())}
+            if doc.get("path"):
+                input_info["file_type"] = get_extension(doc["path"]).lstrip(".")
+            failed = [name for name, timing in doc_timings[i].items() if timing["error"]]
+            result["metadata"].update(input=input_info, failed_stages=failed)
+
+            metrics.BATCH_DOCUMENTS.inc(outcome="ok")
+            metrics.INPUT_WORDS.observe(input_info["words"])
+            for name in failed:
+                metrics.STAGE_ERRORS.inc(stage=name)
+            yield json.dumps({"id": doc.get("id"), "result": result})
 
-    # ------------------------------------------------------------------
-    # SEND FINAL RESULT
-    # ------------------------------------------------------------------
-    yield json.dumps({"result": result})
-    
 
 # ----------------------------------------------------------------------
 # OPTIONAL: keep the old non-streaming version for quick CLI tests
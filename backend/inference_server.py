@@ -0,0 +1,183 @@
+# backend/inference_server.py
+"""
+Dynamic micro-batching for single-text model calls.
+
+Each model gets one request queue and one worker thread. Texts that arrive
+within a short window (max_wait_ms) are coalesced, up to max_batch_size, into
+one batched forward pass, and each result is handed back to its caller through
+a Future. Callers that run in the same process at the same time (threads
+serving concurrent documents) therefore share forward passes instead of
+competing for the same model one example at a time.
+
+Off by default: a worker process analyzes one job at a time, so there is
+nobody to coalesce with and every call would only wait out the window.
+Enable it (SOCION_MICRO_BATCHING=1) when one process serves many documents
+concurrently.
+
+Each queue's thread serializes the calls made through that queue only. A
+model can still be used from other threads – the category prefilter encodes
+with the sentence embedder inside the "category" queue, and batch_pipeline
+calls batch functions directly – so models must tolerate concurrent inference.
+A batch that fails is retried one input at a time, so one bad input only
+fails its own caller.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+# Enable/disable routing single-text calls through the batchers
+MICRO_BATCHING = os.environ.get("SOCION_MICRO_BATCHING", "0") == "1"
+
+# Defaults for every queue; per-model values can be set with configure()
+DEFAULT_MAX_BATCH_SIZE = int(os.environ.get("SOCION_MAX_BATCH_SIZE", "16"))
+DEFAULT_MAX_WAIT_MS = float(os.environ.get("SOCION_MAX_WAIT_MS", "5"))
+
+
+class MicroBatcher:
+    """One queue + worker thread in front of a batch function for one model."""
+
+    def __init__(self, name, batch_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        """
+        Args:
+            name (str): Model / queue name (used for the thread name and stats).
+            batch_fn (callable): Takes a list of inputs, returns a list of outputs
+                in the same order.
+            max_batch_size (int): Most inputs coalesced into one call.
+            max_wait_ms (float): How long the first input waits for company.
+        """
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._thread = threading.Thread(target=self._loop, daemon=True,
+                                        name=f"microbatch-{name}")
+        self._thread.start()
+
+    def submit(self, item):
+        """Queue one input; returns a Future resolving to its output."""
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item):
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(item).result()
+
+    def pending(self):
+        """Number of inputs waiting to be batched."""
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._stats_lock:
+            avg = self._items / self._batches if self._batches else 0.0
+            return {
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(avg, 2),
+                "pending": self.pending(),
+            }
+
+    def _collect(self):
+        """Block for the first input, then gather more until full or the window closes."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _call(self, items):
+        outputs = self.batch_fn(items)
+        if len(outputs) != len(items):
+            raise RuntimeError(
+                f"{self.name}: batch function returned {len(outputs)} results for {len(items)} inputs")
+        return outputs
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            # Callers may have given up (cancelled) while waiting
+            batch = [(item, fut) for item, fut in batch if fut.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                outputs = self._call(items)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    continue
+                # Don't let one caller's bad input fail everyone coalesced with it
+                print(f"[WARN] {self.name}: batch of {len(batch)} failed ({e}); retrying one by one")
+                for item, fut in batch:
+                    try:
+                        fut.set_result(self._call([item])[0])
+                    except Exception as item_error:
+                        fut.set_exception(item_error)
+                continue
+
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(items)
+            for (_, fut), output in zip(batch, outputs):
+                fut.set_result(output)
+
+
+# ----------------------------------------------------------------------
+# PROCESS-WIDE QUEUES – one per model name
+# ----------------------------------------------------------------------
+_batchers = {}
+_batch_config = {}
+_batchers_lock = threading.Lock()
+
+
+def configure(name, max_batch_size=None, max_wait_ms=None):
+    """Set the batching window for `name`. Applies to queues created afterwards."""
+    config = _batch_config.setdefault(name, {})
+    if max_batch_size is not None:
+        config["max_batch_size"] = max_batch_size
+    if max_wait_ms is not None:
+        config["max_wait_ms"] = max_wait_ms
+
+
+def get_batcher(name, batch_fn):
+    """Return the queue for `name`, creating it around `batch_fn` on first use."""
+    batcher = _batchers.get(name)
+    if batcher is not None:
+        return batcher
+    with _batchers_lock:
+        if name not in _batchers:
+            _batchers[name] = MicroBatcher(name, batch_fn, **_batch_config.get(name, {}))
+        return _batchers[name]
+
+
+def infer(name, item, batch_fn):
+    """
+    Run `batch_fn` on a single input, coalesced with concurrent callers.
+
+    Falls back to a direct `batch_fn([item])[0]` call when micro-batching is off.
+    """
+    if not MICRO_BATCHING:
+        return batch_fn([item])[0]
+    return get_batcher(name, batch_fn).submit(item).result()
+
+
+def batcher_stats():
+    """{name: stats} for every queue created in this process."""
+    return {name: batcher.stats() for name, batcher in list(_batchers.items())}
@@ -0,0 +1,405 @@
+# backend/jobs.py
+"""
+Durable job queue backed by SQLite.
+
+The web tier enqueues one job per upload and tails its progress log; worker
+processes (backend/worker.py) claim queued jobs, run main_pipeline and append
+every event it yields. State survives restarts: jobs whose worker stopped
+heart-beating are put back in the queue, up to MAX_JOB_ATTEMPTS times (a job
+that keeps killing its worker is failed instead), and a job still running
+JOB_TIMEOUT_S after it started is failed. Finished jobs and their
+event logs are purged after JOB_RETENTION_HOURS.
+
+Any process on the same host that can open JOBS_DB (and read the upload
+folder) can be a worker, so scaling out is a matter of starting more of
+them. JOBS_DB must be on a local filesystem: SQLite's WAL mode relies on
+shared memory and does not work over network filesystems.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+JOBS_DB = os.environ.get("SOCION_JOBS_DB", "jobs.sqlite3")
+
+# A worker that hasn't heart-beaten for this long is considered dead
+WORKER_TIMEOUT_S = float(os.environ.get("SOCION_WORKER_TIMEOUT", "60"))
+# A running job is failed once it has run this long
+JOB_TIMEOUT_S = float(os.environ.get("SOCION_JOB_TIMEOUT", "1800"))
+# Claims per job before a job whose workers keep dying is marked failed
+MAX_JOB_ATTEMPTS = int(os.environ.get("SOCION_MAX_JOB_ATTEMPTS", "3"))
+# Finished jobs (and their progress logs, which hold the full result) are
+# deleted this long after they finish
+JOB_RETENTION_HOURS = float(os.environ.get("SOCION_JOB_RETENTION_HOURS", "24"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+TERMINAL_STATES = (DONE, FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT PRIMARY KEY,
+    filepath     TEXT NOT NULL,
+    content_hash TEXT,
+    options      TEXT NOT NULL DEFAULT '{}',
+    status       TEXT NOT NULL,
+    worker_id    TEXT,
+    created_at   REAL NOT NULL,
+    started_at   REAL,
+    finished_at  REAL,
+    attempts     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id  TEXT NOT NULL,
+    seq     INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+
+-- One row per finished job, written by the worker; /metrics folds them in
+-- and deletes them, so each is counted once across web restarts
+CREATE TABLE IF NOT EXISTS job_metrics (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id     TEXT NOT NULL,
+    payload    TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS workers (
+    id        TEXT PRIMARY KEY,
+    pid       INTEGER,
+    host      TEXT,
+    ready     INTEGER NOT NULL DEFAULT 0,
+    heartbeat REAL NOT NULL
+);
+"""
+
+_local = threading.local()
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+def get_connection(db_path=None):
+    """Per-thread SQLite connection (WAL mode, autocommit, schema created once)."""
+    db_path = db_path or JOBS_DB
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with _init_lock:
+            if db_path not in _initialized:
+                conn.executescript(_SCHEMA)
+                _initialized.add(db_path)
+        connections[db_path] = conn
+    return conn
+
+
+# ----------------------------------------------------------------------
+# WEB TIER
+# ----------------------------------------------------------------------
+def enqueue_job(filepath, content_hash=None, options=None, job_id=None):
+    """Add a job for `filepath` and return its id."""
+    job_id = job_id or str(uuid.uuid4())
+    get_connection().execute(
+        "INSERT INTO jobs (id, filepath, content_hash, options, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (job_id, filepath, content_hash, json.dumps(options or {}), QUEUED, time.time()),
+    )
+    return job_id
+
+
+def get_job(job_id):
+    """Job row as a dict, or None."""
+    row = get_connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    job["options"] = json.loads(job["options"] or "{}")
+    return job
+
+
+def update_job_options(job_id, options):
+    """
+    Merge `options` into a job's options while it is still queued.
+
+    Returns:
+        bool: False if the job doesn't exist or a worker already claimed it.
+    """
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT options FROM jobs WHERE id = ? AND status = ?", (job_id, QUEUED)).fetchone()
+        if row is not None:
+            merged = dict(json.loads(row["options"] or "{}"), **options)
+            conn.execute("UPDATE jobs SET options = ? WHERE id = ?", (json.dumps(merged), job_id))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return row is not None
+
+
+def tail_events(job_id, after_seq=0, poll_interval=0.25, timeout=None):
+    """
+    Yield (seq, payload) for a job's events as they are appended.
+
+    Stops once the job is finished and every event has been yielded, or after
+    `timeout` seconds without progress.
+    """
+    conn = get_connection()
+    last_progress = time.monotonic()
+    while True:
+        rows = conn.execute(
+            "SELECT seq, payload FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+            (job_id, after_seq),
+        ).fetchall()
+        for row in rows:
+            after_seq = row["seq"]
+            yield row["seq"], row["payload"]
+        if rows:
+            last_progress = time.monotonic()
+            continue
+
+        job = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None:
+            return
+        if job["status"] in TERMINAL_STATES:
+            # Pick up anything appended between the two queries
+            late = conn.execute(
+                "SELECT seq, payload FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after_seq),
+            ).fetchall()
+            for row in late:
+                yield row["seq"], row["payload"]
+            return
+        if timeout is not None and time.monotonic() - last_progress > timeout:
+            return
+        time.sleep(poll_interval)
+
+
+def consume_job_metrics(limit=1000):
+    """
+    Remove and return up to `limit` job metrics rows, oldest first.
+
+    Returns:
+        list: [(seq, payload dict)]; each row is returned to one caller only.
+    """
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute("SELECT seq, payload FROM job_metrics ORDER BY seq LIMIT ?", (limit,)).fetchall()
+        if rows:
+            conn.execute("DELETE FROM job_metrics WHERE seq <= ?", (rows[-1]["seq"],))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return [(row["seq"], json.loads(row["payload"])) for row in rows]
+
+
+def queue_depth():
+    """Number of jobs waiting for a worker."""
+    return get_connection().execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+
+
+def live_workers(max_age=WORKER_TIMEOUT_S):
+    """Workers that heart-beat within `max_age` seconds."""
+    rows = get_connection().execute(
+        "SELECT * FROM workers WHERE heartbeat >= ?", (time.time() - max_age,)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+# ----------------------------------------------------------------------
+# WORKER SIDE
+# ----------------------------------------------------------------------
+def claim_next_job(worker_id):
+    """Atomically move the oldest queued job to running and return it (or None)."""
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = ?, worker_id = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+            (RUNNING, worker_id, time.time(), row["id"]),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return get_job(row["id"])
+
+
+def append_event(job_id, payload):
+    """Append one pipeline event (a JSON string) to the job's progress log."""
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "INSERT INTO job_events (job_id, seq, payload) "
+            "SELECT ?, COALESCE(MAX(seq), 0) + 1, ? FROM job_events WHERE job_id = ?",
+            (job_id, payload, job_id),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def record_job_metrics(job_id, payload):
+    """
+    Store what a finished job measured, for /metrics to aggregate.
+
+    Args:
+        payload (dict): {"metadata": result metadata} for a result, or
+            {"error": reason code} for a job that ended without one.
+    """
+    get_connection().execute(
+        "INSERT INTO job_metrics (job_id, payload, created_at) VALUES (?, ?, ?)",
+        (job_id, json.dumps(payload), time.time()),
+    )
+
+
+def finish_job(job_id, status=DONE):
+    """
+    Mark a running job finished.
+
+    Returns:
+        bool: False if it had already ended (e.g. failed by fail_overdue_jobs).
+    """
+    cur = get_connection().execute(
+        "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+        (status, time.time(), job_id, RUNNING),
+    )
+    return cur.rowcount > 0
+
+
+def heartbeat(worker_id, ready=False):
+    get_connection().execute(
+        "INSERT INTO workers (id, pid, host, ready, heartbeat) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(id) DO UPDATE SET ready = excluded.ready, heartbeat = excluded.heartbeat",
+        (worker_id, os.getpid(), os.uname().nodename if hasattr(os, "uname") else "", int(ready), time.time()),
+    )
+
+
+def remove_worker(worker_id):
+    get_connection().execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+
+
+def _fail_job_locked(conn, job_id, message, reason):
+    """Inside a write transaction: end a job as FAILED with a final event and metrics row."""
+    now = time.time()
+    conn.execute(
+        "INSERT INTO job_events (job_id, seq, payload) "
+        "SELECT ?, COALESCE(MAX(seq), 0) + 1, ? FROM job_events WHERE job_id = ?",
+        (job_id, json.dumps({"step": message, "progress": 100, "error": reason}), job_id),
+    )
+    conn.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?", (FAILED, now, job_id))
+    conn.execute("INSERT INTO job_metrics (job_id, payload, created_at) VALUES (?, ?, ?)",
+                 (job_id, json.dumps({"error": reason}), now))
+
+
+def requeue_stale_jobs(max_age=WORKER_TIMEOUT_S, max_attempts=MAX_JOB_ATTEMPTS):
+    """
+    Put running jobs of dead workers back in the queue. A job already
+    claimed `max_attempts` times is marked failed instead, so one input that
+    crashes workers (OOM, native segfault) can't take them down one by one.
+
+    Returns:
+        int: Jobs requeued.
+    """
+    conn = get_connection()
+    cutoff = time.time() - max_age
+    query = ("SELECT id, filepath, attempts FROM jobs WHERE status = ? AND worker_id NOT IN "
+             "(SELECT id FROM workers WHERE heartbeat >= ?)")
+    # Read-only check first; the write lock is only taken when there's work
+    if conn.execute(query + " LIMIT 1", (RUNNING, cutoff)).fetchone() is None:
+        return 0
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        stale = conn.execute(query, (RUNNING, cutoff)).fetchall()
+        exhausted = [row for row in stale if row["attempts"] >= max_attempts]
+        for row in exhausted:
+            _fail_job_locked(conn, row["id"], f"Analysis failed: worker died {row['attempts']} times",
+                             "worker_crashed")
+        requeued = [row["id"] for row in stale if row["attempts"] < max_attempts]
+        conn.executemany("UPDATE jobs SET status = ?, worker_id = NULL WHERE id = ?",
+                         [(QUEUED, job_id) for job_id in requeued])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    for row in exhausted:
+        print(f"[WARN] job {row['id']} failed after {row['attempts']} attempts")
+        if os.path.exists(row["filepath"]):
+            os.remove(row["filepath"])
+    return len(requeued)
+
+
+def fail_overdue_jobs(timeout=JOB_TIMEOUT_S):
+    """
+    Fail running jobs that started more than `timeout` seconds ago, so a
+    handler that hangs while its worker keeps heart-beating can't leave the
+    job (and its stream) running forever. Returns how many.
+    """
+    conn = get_connection()
+    cutoff = time.time() - timeout
+    query = "SELECT id, filepath, worker_id FROM jobs WHERE status = ? AND started_at < ?"
+    if conn.execute(query + " LIMIT 1", (RUNNING, cutoff)).fetchone() is None:
+        return 0
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        overdue = conn.execute(query, (RUNNING, cutoff)).fetchall()
+        for row in overdue:
+            _fail_job_locked(conn, row["id"], f"Analysis failed: no result after {timeout:.0f}s", "timeout")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    for row in overdue:
+        print(f"[WARN] job {row['id']} on {row['worker_id']} timed out after {timeout:.0f}s")
+        if os.path.exists(row["filepath"]):
+            os.remove(row["filepath"])
+    return len(overdue)
+
+
+def purge_finished_jobs(max_age_hours=JOB_RETENTION_HOURS):
+    """
+    Delete jobs that finished more than `max_age_hours` ago, with their
+    events and metrics rows. Returns how many jobs.
+    """
+    conn = get_connection()
+    cutoff = time.time() - max_age_hours * 3600
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "DELETE FROM job_events WHERE job_id IN "
+            "(SELECT id FROM jobs WHERE status IN (?, ?) AND finished_at < ?)",
+            (*TERMINAL_STATES, cutoff),
+        )
+        cur = conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                           (*TERMINAL_STATES, cutoff))
+        conn.execute("DELETE FROM job_metrics WHERE created_at < ?", (cutoff,))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return cur.rowcount
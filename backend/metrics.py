@@ -0,0 +1,271 @@
+# backend/metrics.py
+"""
+Process-local metrics with Prometheus text exposition (no client library).
+
+The pipeline runs in worker processes, so it does not observe these
+directly: main_pipeline attaches structured timings to the result metadata,
+the worker stores them per job (jobs.record_job_metrics) and the web tier
+folds every new row in (and deletes it) with collect_job_metrics() when
+/metrics is scraped – whether or not anyone streamed the job. batch_pipeline runs in the web
+process and observes its documents itself. Everything is rendered by
+REGISTRY.render().
+"""
+import math
+import os
+import threading
+from collections import OrderedDict
+
+
+# Add elapsed time and per-stage timings to every SSE progress event by
+# default (also per upload with /upload?timings=1)
+EVENT_TIMINGS = os.environ.get("SOCION_EVENT_TIMINGS", "0") == "1"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds – from cached stages (~ms) up to cold model loads (minutes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+# Job metrics rows folded in per fetch
+_JOB_METRICS_PAGE = 1000
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def _samples(self):
+        with self._lock:
+            series = sorted(self._series.items())
+        return [(f"{self.name}_total", _label_text(self.labelnames, key), value) for key, value in series]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = float(value)
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        """Read the (unlabelled) value from `function()` at scrape time."""
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            try:
+                return [(self.name, "", float(self._function()))]
+            except Exception as e:
+                print(f"[WARN] gauge {self.name} unavailable: {e}")
+                return []
+        with self._lock:
+            series = sorted(self._series.items())
+        return [(self.name, _label_text(self.labelnames, key), value) for key, value in series]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            series = sorted((key, list(s["counts"]), s["sum"]) for key, s in self._series.items())
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _label_text(self.labelnames, key, [("le", _format_value(bound))])
+                samples.append((f"{self.name}_bucket", labels, cumulative))
+            labels = _label_text(self.labelnames, key)
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ----------------------------------------------------------------------
+# PIPELINE METRICS
+# ----------------------------------------------------------------------
+PIPELINE_SECONDS = Histogram("socion_pipeline_seconds", "End-to-end analysis time per document.")
+EXTRACTION_SECONDS = Histogram("socion_extraction_seconds", "Text extraction time.", ("file_type",))
+STAGE_SECONDS = Histogram("socion_stage_seconds", "Wall time per analysis stage.", ("stage",))
+STAGE_INFERENCE_SECONDS = Histogram(
+    "socion_stage_inference_seconds", "Analysis stage time excluding model loading.", ("stage",))
+MODEL_LOAD_SECONDS = Histogram("socion_model_load_seconds", "Model load time paid by a request.", ("model",))
+INPUT_BYTES = Histogram("socion_input_bytes", "Size of analyzed uploads.", ("file_type",), buckets=SIZE_BUCKETS)
+INPUT_WORDS = Histogram("socion_input_words", "Words of extracted text.", buckets=SIZE_BUCKETS)
+STAGE_ERRORS = Counter("socion_stage_errors", "Analysis stages that failed and returned their fallback.",
+                       ("stage",))
+PIPELINE_ERRORS = Counter("socion_pipeline_errors", "Documents that produced no result.", ("reason",))
+RESULT_CACHE_HITS = Counter("socion_result_cache_hits", "Documents answered from the result cache.")
+BATCH_DOCUMENTS = Counter("socion_batch_documents", "Documents analyzed by batch_pipeline.", ("outcome",))
+BATCH_STAGE_SECONDS = Histogram("socion_batch_stage_seconds",
+                                "Wall time per analysis stage over one batch_pipeline chunk.", ("stage",))
+
+QUEUE_DEPTH = Gauge("socion_queue_depth", "Jobs waiting for a worker.")
+READY_WORKERS = Gauge("socion_ready_workers", "Workers with their models loaded.")
+ACTIVE_STREAMS = Gauge("socion_active_streams", "Open SSE streams.", ("endpoint",))
+
+_job_metrics_lock = threading.Lock()
+
+
+def observe_result(metadata):
+    """
+    Record a finished document's metadata["timings"] / ["input"] / ["failed_stages"].
+
+    Args:
+        metadata (dict): The result's "metadata" block from main_pipeline.
+    """
+    timings = metadata.get("timings") or {}
+    source = metadata.get("input") or {}
+    file_type = source.get("file_type", "unknown")
+
+    if "total_s" in timings:
+        PIPELINE_SECONDS.observe(timings["total_s"])
+    if metadata.get("cache_hit"):
+        RESULT_CACHE_HITS.inc()
+        return
+
+    if "extraction_s" in timings:
+        EXTRACTION_SECONDS.observe(timings["extraction_s"], file_type=file_type)
+    # Concurrent stages sharing a model (e.g. the sentence embedder) all
+    # report its one load; count each model once per document
+    loads = dict(timings.get("extraction_model_loads", {}))
+    for stage, timing in timings.get("stages", {}).items():
+        STAGE_SECONDS.observe(timing["seconds"], stage=stage)
+        STAGE_INFERENCE_SECONDS.observe(timing["inference_s"], stage=stage)
+        loads.update(timing.get("model_loads", {}))
+        if timing.get("error"):
+            STAGE_ERRORS.inc(stage=stage)
+    for name, seconds in loads.items():
+        MODEL_LOAD_SECONDS.observe(seconds, model=name)
+
+    if "bytes" in source:
+        INPUT_BYTES.observe(source["bytes"], file_type=file_type)
+    if "words" in source:
+        INPUT_WORDS.observe(source["words"])
+
+
+def collect_job_metrics(fetch):
+    """
+    Observe the job metrics rows workers wrote and nobody has consumed yet.
+
+    Args:
+        fetch (callable): fetch(limit) -> [(seq, payload)] that removes the
+            rows it returns, e.g. jobs.consume_job_metrics, so a restarted
+            web process doesn't count retained rows again; payload is
+            {"metadata": ...} or {"error": ...}.
+
+    Returns:
+        int: Rows observed.
+    """
+    observed = 0
+    with _job_metrics_lock:
+        while True:
+            rows = fetch(_JOB_METRICS_PAGE)
+            for _, payload in rows:
+                if "metadata" in payload:
+                    observe_result(payload["metadata"])
+                else:
+                    PIPELINE_ERRORS.inc(reason=payload.get("error", "unknown"))
+            observed += len(rows)
+            if len(rows) < _JOB_METRICS_PAGE:
+                return observed
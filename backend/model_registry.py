@@ -0,0 +1,218 @@
+# backend/model_registry.py
+"""
+Process-wide model registry.
+
+Every analyzer asks this module for its model instead of building one per
+call.  Each model is loaded at most once per process (guarded by a per-model
+lock, so concurrent first requests do not load it twice) and then reused.
+"""
+import os
+import threading
+import time
+
+from .onnx_backend import load_sentence_transformer, load_sequence_classifier, validate_backend
+
+
+# ----------------------------------------------------------------------
+# MODEL IDS – single place to change which checkpoint a stage uses
+# ----------------------------------------------------------------------
+MODEL_IDS = {
+    "sentiment": "distilbert-base-uncased-finetuned-sst-2-english",
+    "emotion": "nateraw/bert-base-uncased-emotion",
+    "category": "facebook/bart-large-mnli",
+    "ai_detector": "roberta-base-openai-detector",
+    "sentence_embedder": "all-MiniLM-L6-v2",
+    "ocr": "easyocr-en",
+}
+
+
+# ----------------------------------------------------------------------
+# BACKENDS – "torch" (default), "onnx" or "onnx-int8" per model, e.g.
+# SOCION_MODEL_BACKENDS="sentiment=onnx-int8,sentence_embedder=onnx"
+# ----------------------------------------------------------------------
+DEFAULT_BACKEND = validate_backend(os.environ.get("SOCION_MODEL_BACKEND", "torch"))
+
+
+def _parse_backends(spec):
+    backends = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, backend = item.partition("=")
+        backends[name.strip()] = validate_backend(backend.strip())
+    return backends
+
+
+MODEL_BACKENDS = _parse_backends(os.environ.get("SOCION_MODEL_BACKENDS", ""))
+
+
+def get_backend(name):
+    """Inference backend configured for model `name`."""
+    return MODEL_BACKENDS.get(name, DEFAULT_BACKEND)
+
+
+# ----------------------------------------------------------------------
+# LOADERS – heavy imports stay inside so importing the registry is cheap.
+# `backend` defaults to get_backend(<model name>).
+# ----------------------------------------------------------------------
+def _text_pipeline(task, name, backend, **kwargs):
+    from transformers import pipeline
+
+    backend = backend or get_backend(name)
+    if backend == "torch":
+        return pipeline(task, model=MODEL_IDS[name], **kwargs)
+    model, tokenizer = load_sequence_classifier(MODEL_IDS[name], backend)
+    return pipeline(task, model=model, tokenizer=tokenizer, **kwargs)
+
+
+def _load_sentiment(backend=None):
+    return _text_pipeline("sentiment-analysis", "sentiment", backend)
+
+
+def _load_emotion(backend=None):
+    return _text_pipeline("text-classification", "emotion", backend, return_all_scores=True)
+
+
+def _load_category(backend=None):
+    return _text_pipeline("zero-shot-classification", "category", backend)
+
+
+def _load_ai_detector(backend=None):
+    from .analyzer.ai_text_detector import AITextDetector
+    return AITextDetector(MODEL_IDS["ai_detector"], backend=backend or get_backend("ai_detector"))
+
+
+def _load_sentence_embedder(backend=None):
+    return load_sentence_transformer(MODEL_IDS["sentence_embedder"],
+                                     backend or get_backend("sentence_embedder"))
+
+
+def _load_ocr():
+    from .extractor.ocr_engine import OCRReaderPool
+    return OCRReaderPool(['en'])
+
+
+_LOADERS = {
+    "sentiment": _load_sentiment,
+    "emotion": _load_emotion,
+    "category": _load_category,
+    "ai_detector": _load_ai_detector,
+    "sentence_embedder": _load_sentence_embedder,
+    "ocr": _load_ocr,
+}
+
+# Models warmed by warm_up() when no explicit list is given
+DEFAULT_WARM_MODELS = [
+    "sentiment",
+    "emotion",
+    "category",
+    "ai_detector",
+    "sentence_embedder",
+]
+
+
+_models = {}
+_load_errors = {}
+_load_times = {}
+_locks = {name: threading.Lock() for name in _LOADERS}
+_registry_lock = threading.Lock()
+
+
+def register_loader(name, loader):
+    """Register (or replace) the loader for `name`. Drops any loaded instance."""
+    with _registry_lock:
+        _LOADERS[name] = loader
+        _locks.setdefault(name, threading.Lock())
+        _models.pop(name, None)
+        _load_errors.pop(name, None)
+
+
+def get_model(name):
+    """
+    Return the shared instance for `name`, loading it on first use.
+
+    Args:
+        name (str): Registry key, e.g. "sentiment" or "sentence_embedder".
+
+    Returns:
+        object: The loaded model / pipeline.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    if name not in _LOADERS:
+        raise KeyError(f"Unknown model: {name}")
+
+    with _locks[name]:
+        # Another thread may have finished loading while we waited
+        model = _models.get(name)
+        if model is not None:
+            return model
+
+        print(f"[INFO] Loading model '{name}'...")
+        started = time.perf_counter()
+        try:
+            model = _LOADERS[name]()
+        except Exception as e:
+            _load_errors[name] = str(e)
+            print(f"[ERROR] Failed to load model '{name}': {e}")
+            raise
+        _load_times[name] = time.perf_counter() - started
+        _load_errors.pop(name, None)
+        _models[name] = model
+        print(f"[INFO] Model '{name}' ready in {_load_times[name]:.1f}s")
+        return model
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def load_seconds(name):
+    """Seconds the last load of `name` took (None if it never loaded)."""
+    return _load_times.get(name)
+
+
+def load_model(name, backend):
+    """
+    Build a fresh, uncached instance of a built-in model on `backend`
+    (used to compare backends side by side).
+    """
+    return _LOADERS[name](backend=validate_backend(backend))
+
+
+def warm_up(names=None):
+    """Load the given models (default: DEFAULT_WARM_MODELS). Never raises."""
+    for name in names or DEFAULT_WARM_MODELS:
+        try:
+            get_model(name)
+        except Exception:
+            # Error already recorded in _load_errors
+            continue
+
+
+def warm_up_async(names=None):
+    """Start warm_up() on a daemon thread and return the thread."""
+    thread = threading.Thread(target=warm_up, args=(names,), daemon=True,
+                              name="model-warmup")
+    thread.start()
+    return thread
+
+
+def is_ready(names=None):
+    """True once every model in `names` (default: DEFAULT_WARM_MODELS) is loaded."""
+    return all(name in _models for name in names or DEFAULT_WARM_MODELS)
+
+
+def readiness(names=None):
+    """Per-model status dict suitable for a health-check response."""
+    status = {}
+    for name in names or DEFAULT_WARM_MODELS:
+        if name in _models:
+            status[name] = {"state": "ready", "load_seconds": round(_load_times[name], 2)}
+        elif name in _load_errors:
+            status[name] = {"state": "error", "error": _load_errors[name]}
+        elif _locks[name].locked():
+            status[name] = {"state": "loading"}
+        else:
+            status[name] = {"state": "not_loaded"}
+    return {"ready": is_ready(names), "models": status}
@@ -0,0 +1,159 @@
+# backend/onnx_backend.py
+"""
+ONNX Runtime loaders for the transformer models.
+
+A model exported (and optionally int8-quantized) once is saved under
+ONNX_DIR and reused by every later load. Exports are built in a temporary
+directory and renamed into place under a file lock, so concurrent workers
+export each model once and never load a half-written one. Needs the
+optional packages `optimum[onnxruntime]` (sequence classifiers) and
+`onnxruntime` (sentence-transformers' ONNX backend); PyTorch stays the
+default.
+"""
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+
+# Accepted backend names; "torch" is the plain PyTorch fp32 path
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+ONNX_DIR = os.environ.get("SOCION_ONNX_DIR", os.path.join("cache", "onnx"))
+# Instruction set the dynamic int8 quantization targets
+QUANTIZATION_TARGET = os.environ.get("SOCION_ONNX_QUANTIZATION", "avx2")
+
+_QUANTIZED_FILE = "model_quantized.onnx"
+
+
+def _export_dir(model_id, backend):
+    if backend == "onnx-int8":
+        # One quantized copy per target instruction set
+        backend = f"{backend}-{QUANTIZATION_TARGET}"
+    return os.path.join(ONNX_DIR, re.sub(r"[^A-Za-z0-9_.-]", "--", model_id), backend)
+
+
+@contextmanager
+def _export_lock(path):
+    """Exclusive lock on `path` across processes (a no-op where fcntl is unavailable)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _export_once(target_dir, build):
+    """
+    Run build(tmp_dir) and rename the result to `target_dir`, unless it
+    already exists. Other processes exporting the same directory wait for
+    the first one and then reuse its output.
+    """
+    if os.path.isdir(target_dir):
+        return
+    parent = os.path.dirname(target_dir)
+    os.makedirs(parent, exist_ok=True)
+    with _export_lock(f"{target_dir}.lock"):
+        if os.path.isdir(target_dir):
+            return
+        tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".export-")
+        try:
+            build(tmp_dir)
+            os.replace(tmp_dir, target_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+
+def _require(module, package):
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError as e:
+        raise ImportError(f"ONNX backend needs `{package}` (pip install {package})") from e
+
+
+def validate_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}'; expected one of {', '.join(BACKENDS)}")
+    return backend
+
+
+def load_sequence_classifier(model_id, backend):
+    """
+    (model, tokenizer) for a sequence-classification checkpoint on `backend`.
+
+    ONNX models are drop-in replacements for the PyTorch ones: they accept
+    the same tokenizer output and return `.logits`, so pipelines and the
+    chunked-inference path work unchanged.
+    """
+    from transformers import AutoTokenizer
+
+    validate_backend(backend)
+    if backend == "torch":
+        from transformers import AutoModelForSequenceClassification
+        return (AutoModelForSequenceClassification.from_pretrained(model_id),
+                AutoTokenizer.from_pretrained(model_id))
+
+    ort = _require("optimum.onnxruntime", "optimum[onnxruntime]")
+    fp32_dir = _export_dir(model_id, "onnx")
+
+    def export(tmp_dir):
+        print(f"[INFO] Exporting {model_id} to ONNX ({fp32_dir})")
+        model = ort.ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+        model.save_pretrained(tmp_dir)
+        AutoTokenizer.from_pretrained(model_id).save_pretrained(tmp_dir)
+
+    _export_once(fp32_dir, export)
+
+    if backend == "onnx":
+        return (ort.ORTModelForSequenceClassification.from_pretrained(fp32_dir),
+                AutoTokenizer.from_pretrained(fp32_dir))
+
+    int8_dir = _export_dir(model_id, "onnx-int8")
+
+    def quantize(tmp_dir):
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+        print(f"[INFO] Quantizing {model_id} to int8 ({int8_dir})")
+        config = getattr(AutoQuantizationConfig, QUANTIZATION_TARGET)(is_static=False, per_channel=False)
+        quantizer = ort.ORTQuantizer.from_pretrained(fp32_dir)
+        quantizer.quantize(save_dir=tmp_dir, quantization_config=config)
+        AutoTokenizer.from_pretrained(fp32_dir).save_pretrained(tmp_dir)
+
+    _export_once(int8_dir, quantize)
+    return (ort.ORTModelForSequenceClassification.from_pretrained(int8_dir, file_name=_QUANTIZED_FILE),
+            AutoTokenizer.from_pretrained(int8_dir))
+
+
+def load_sentence_transformer(model_id, backend):
+    """SentenceTransformer for `model_id` on `backend` (uses its built-in ONNX support)."""
+    from sentence_transformers import SentenceTransformer
+
+    validate_backend(backend)
+    if backend == "torch":
+        return SentenceTransformer(model_id)
+
+    _require("onnxruntime", "onnxruntime")
+    if backend == "onnx":
+        return SentenceTransformer(model_id, backend="onnx")
+
+    int8_dir = _export_dir(model_id, "onnx-int8")
+    file_name = f"onnx/model_qint8_{QUANTIZATION_TARGET}.onnx"
+
+    def quantize(tmp_dir):
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        print(f"[INFO] Quantizing {model_id} to int8 ({int8_dir})")
+        model = SentenceTransformer(model_id, backend="onnx")
+        model.save(tmp_dir)
+        export_dynamic_quantized_onnx_model(model, QUANTIZATION_TARGET, tmp_dir)
+
+    _export_once(int8_dir, quantize)
+    return SentenceTransformer(int8_dir, backend="onnx", model_kwargs={"file_name": file_name})
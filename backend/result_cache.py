@@ -0,0 +1,184 @@
+# backend/result_cache.py
+"""
+Content-addressed caches for analysis results.
+
+* RESULT_CACHE – full aggregate_results() output keyed by the hash of the
+  uploaded bytes (plus a fingerprint of the pipeline's model versions).
+* STAGE_CACHE  – one stage's output keyed by (text hash, stage, model/version),
+  so swapping one model only invalidates that stage.
+
+Both are a bounded in-memory LRU in front of a JSON-file store on disk. The
+disk store is pruned every CACHE_PRUNE_EVERY writes: files unused for
+CACHE_MAX_AGE_DAYS go first, then the least recently used until the store
+fits its size budget.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+CACHE_ENABLED = os.environ.get("SOCION_RESULT_CACHE", "1") != "0"
+CACHE_DIR = os.environ.get("SOCION_CACHE_DIR", "cache")
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("SOCION_RESULT_CACHE_ENTRIES", "256"))
+STAGE_CACHE_MAX_ENTRIES = int(os.environ.get("SOCION_STAGE_CACHE_ENTRIES", "4096"))
+# Disk budget per store, and how long an unused entry survives
+RESULT_CACHE_MAX_DISK_MB = float(os.environ.get("SOCION_RESULT_CACHE_DISK_MB", "1024"))
+STAGE_CACHE_MAX_DISK_MB = float(os.environ.get("SOCION_STAGE_CACHE_DISK_MB", "512"))
+CACHE_MAX_AGE_DAYS = float(os.environ.get("SOCION_CACHE_MAX_AGE_DAYS", "30"))
+# Writes between two disk prunes (per process)
+CACHE_PRUNE_EVERY = int(os.environ.get("SOCION_CACHE_PRUNE_EVERY", "200"))
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def hash_bytes(data):
+    """sha256 hex digest of bytes (or str, encoded as UTF-8)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    """sha256 hex digest of a file, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU of JSON-serializable values, persisted one file per key."""
+
+    def __init__(self, name, max_entries, cache_dir=CACHE_DIR, persist=True, max_disk_mb=1024.0,
+                 max_age_days=CACHE_MAX_AGE_DAYS):
+        self.name = name
+        self.max_entries = max_entries
+        self.directory = os.path.join(cache_dir, name) if persist else None
+        self.max_disk_bytes = max_disk_mb * 2**20
+        self.max_age_s = max_age_days * 24 * 3600
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Cached value for `key`, or None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = None
+        if self.directory:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    value = json.load(f)
+                # mtime doubles as last-use time for pruning
+                os.utime(self._path(key))
+            except (OSError, ValueError):
+                value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store `value` in memory and (atomically) on disk. Never raises on disk errors."""
+        with self._lock:
+            self._remember(key, value)
+            self._writes += 1
+            prune = self._writes % CACHE_PRUNE_EVERY == 1
+
+        if not self.directory:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[WARN] {self.name} cache write failed: {e}")
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """
+        Delete disk entries unused for max_age_s, then the least recently
+        used ones until the store fits max_disk_bytes.
+
+        Returns:
+            int: Files removed. Never raises on disk errors.
+        """
+        if not self.directory:
+            return 0
+        files = []
+        for root, _dirs, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        cutoff = time.time() - self.max_age_s
+        removed = 0
+        for mtime, size, path in files:
+            if mtime >= cutoff and total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            print(f"[INFO] {self.name} cache: pruned {removed} files from disk")
+        return removed
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear_memory(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+RESULT_CACHE = ResultCache("results", RESULT_CACHE_MAX_ENTRIES, max_disk_mb=RESULT_CACHE_MAX_DISK_MB)
+STAGE_CACHE = ResultCache("stages", STAGE_CACHE_MAX_ENTRIES, max_disk_mb=STAGE_CACHE_MAX_DISK_MB)
+
+
+def result_key(content_hash, fingerprint):
+    """Key for a full result: uploaded-bytes hash + pipeline fingerprint."""
+    return hash_bytes(f"{content_hash}:{fingerprint}")
+
+
+def stage_key(text_hash, stage, version):
+    """Key for one stage's output on one text."""
+    return hash_bytes(f"{text_hash}:{stage}:{version}")
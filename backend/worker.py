@@ -0,0 +1,152 @@
+# backend/worker.py
+"""
+Worker processes for the job queue in backend/jobs.py.
+
+Run standalone (any number of times, on the host that holds the jobs DB and
+upload folder – SQLite in WAL mode needs a local filesystem):
+
+    python -m backend.worker --processes 2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+
+from . import jobs
+
+POLL_INTERVAL_S = float(os.environ.get("SOCION_WORKER_POLL", "0.5"))
+HEARTBEAT_INTERVAL_S = float(os.environ.get("SOCION_WORKER_HEARTBEAT", "5"))
+# How often a worker deletes finished jobs past their retention
+PURGE_INTERVAL_S = float(os.environ.get("SOCION_JOB_PURGE_INTERVAL", "600"))
+# How often a worker looks for jobs of dead workers and jobs past their deadline
+MAINTENANCE_INTERVAL_S = float(os.environ.get("SOCION_WORKER_MAINTENANCE_INTERVAL", "10"))
+
+
+def _heartbeat_loop(worker_id, state, stop):
+    while not stop.wait(HEARTBEAT_INTERVAL_S):
+        try:
+            jobs.heartbeat(worker_id, ready=state["ready"])
+        except Exception as e:
+            print(f"[WARN] heartbeat failed: {e}")
+
+
+def process_job(job):
+    """Run main_pipeline for one claimed job, recording every event."""
+    from .flow import main_pipeline
+
+    job_id = job["id"]
+    status = jobs.FAILED
+    # What /metrics learns about this job: the result's metadata or why it failed
+    measured = {"error": "crashed"}
+    try:
+        for event in main_pipeline(job["filepath"], content_hash=job["content_hash"], **job["options"]):
+            jobs.append_event(job_id, event)
+            data = json.loads(event)
+            # A pipeline that stops early (no text, extraction error) has
+            # already reported why and stays FAILED
+            if "result" in data:
+                status = jobs.DONE
+                measured = {"metadata": data["result"].get("metadata", {})}
+            elif "error" in data:
+                measured = {"error": data["error"]}
+    except Exception as e:
+        print(f"[ERROR] job {job_id} crashed: {e}")
+        jobs.append_event(job_id, json.dumps({"step": f"Analysis failed: {e}", "progress": 100}))
+    finally:
+        # A job failed meanwhile (past its deadline) keeps that outcome and
+        # has already been counted
+        if jobs.finish_job(job_id, status):
+            try:
+                jobs.record_job_metrics(job_id, measured)
+            except Exception as e:
+                print(f"[WARN] couldn't record metrics for job {job_id}: {e}")
+        else:
+            status = jobs.FAILED
+        # The upload is no longer needed once the job has finished
+        if os.path.exists(job["filepath"]):
+            os.remove(job["filepath"])
+    return status
+
+
+def run_worker(worker_id=None, warm=True, stop=None):
+    """Claim and process jobs until `stop` (a threading/multiprocessing Event) is set."""
+    from . import model_registry
+
+    worker_id = worker_id or f"worker-{uuid.uuid4().hex[:8]}"
+    stop = stop or threading.Event()
+    state = {"ready": False}
+
+    jobs.heartbeat(worker_id, ready=False)
+    hb_stop = threading.Event()
+    threading.Thread(target=_heartbeat_loop, args=(worker_id, state, hb_stop), daemon=True).start()
+
+    if warm:
+        model_registry.warm_up()
+        from .analyzer.hashtage_generator.hashtag_suggestor import warm_up_hashtags
+        warm_up_hashtags()
+    state["ready"] = True
+    jobs.heartbeat(worker_id, ready=True)
+    print(f"[INFO] {worker_id} ready (pid {os.getpid()})")
+
+    last_purge = last_maintenance = 0.0
+    try:
+        while not stop.is_set():
+            if time.monotonic() - last_purge > PURGE_INTERVAL_S:
+                last_purge = time.monotonic()
+                purged = jobs.purge_finished_jobs()
+                if purged:
+                    print(f"[INFO] {worker_id} purged {purged} finished jobs")
+            if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL_S:
+                last_maintenance = time.monotonic()
+                jobs.requeue_stale_jobs()
+                jobs.fail_overdue_jobs()
+            job = jobs.claim_next_job(worker_id)
+            if job is None:
+                time.sleep(POLL_INTERVAL_S)
+                continue
+            print(f"[INFO] {worker_id} running job {job['id']}")
+            process_job(job)
+    finally:
+        hb_stop.set()
+        jobs.remove_worker(worker_id)
+
+
+def start_workers(count, warm=True):
+    """Start `count` worker processes; returns (processes, stop_event)."""
+    # "spawn" keeps torch / tokenizer thread pools out of forked children
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    processes = []
+    for _ in range(count):
+        # Not daemonic: workers run their own process pools (e.g. PDF pages)
+        proc = ctx.Process(target=run_worker, kwargs={"warm": warm, "stop": stop})
+        proc.start()
+        processes.append(proc)
+    return processes, stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socion analysis worker")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes to start")
+    parser.add_argument("--no-warm", action="store_true", help="load models lazily instead of at start")
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        run_worker(warm=not args.no_warm)
+        return
+
+    processes, stop = start_workers(args.processes, warm=not args.no_warm)
+    try:
+        for proc in processes:
+            proc.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for proc in processes:
+            proc.join(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
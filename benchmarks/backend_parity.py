@@ -0,0 +1,148 @@
+# benchmarks/backend_parity.py
+"""
+Check an ONNX backend against the PyTorch path, model by model.
+
+Usage:
+    python -m benchmarks.backend_parity [--backend onnx-int8] [--models sentiment emotion ...]
+
+For each model, both backends score the same sample texts. Reports label
+agreement, the largest score difference, mean / p95 latency per text and
+the resident memory added by loading the model. Exits non-zero if any
+model falls below --min-agreement or above --max-score-diff.
+"""
+import argparse
+import gc
+import json
+import resource
+import statistics
+import sys
+import time
+
+from backend.analyzer.category_classifier import DEFAULT_CANDIDATE_LABELS
+from backend.model_registry import load_model
+from benchmarks.category_benchmark import SAMPLES
+
+
+TEXTS = [text for text, _ in SAMPLES] + [
+    "I absolutely loved this, best purchase I've made all year!",
+    "This is the worst customer service I have ever experienced.",
+    "The meeting has been moved to Thursday at 3pm.",
+    "Honestly I'm scared about what the results will show.",
+    "Wow, I did not expect that ending at all.",
+]
+
+DEFAULT_MODELS = ["sentiment", "emotion", "category", "ai_detector", "sentence_embedder"]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _rss_mb():
+    """Current resident set size in MB (Linux), else peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Each scorer returns (label, {label: score}) per text – or a vector for embeddings
+def _score_text_classifier(model, text):
+    scores = model(text, truncation=True, top_k=None)
+    scores = {item["label"]: item["score"] for item in scores}
+    return max(scores, key=scores.get), scores
+
+
+def _score_category(model, text):
+    result = model(text, DEFAULT_CANDIDATE_LABELS)
+    return result["labels"][0], dict(zip(result["labels"], result["scores"]))
+
+
+def _score_ai_detector(model, text):
+    probability = model.detect_ai(text)["ai_generated_probability"]
+    return probability >= 0.5, {"ai": probability}
+
+
+def _score_embedder(model, text):
+    vector = model.encode(text, normalize_embeddings=True)
+    return None, vector
+
+
+SCORERS = {
+    "sentiment": _score_text_classifier,
+    "emotion": _score_text_classifier,
+    "category": _score_category,
+    "ai_detector": _score_ai_detector,
+    "sentence_embedder": _score_embedder,
+}
+
+
+def run_backend(name, backend):
+    gc.collect()
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    model = load_model(name, backend)
+    load_s = time.perf_counter() - started
+    rss_added = _rss_mb() - rss_before
+
+    scorer = SCORERS[name]
+    scorer(model, TEXTS[0])  # warm-up run, not timed
+    outputs, latencies = [], []
+    for text in TEXTS:
+        started = time.perf_counter()
+        outputs.append(scorer(model, text))
+        latencies.append(time.perf_counter() - started)
+
+    del model
+    gc.collect()
+    return outputs, {
+        "load_s": round(load_s, 2),
+        "rss_added_mb": round(rss_added, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+    }
+
+
+def compare(name, reference, candidate):
+    if name == "sentence_embedder":
+        # Unit vectors: cosine similarity is a dot product
+        cosines = [float((ref @ cand)) for (_, ref), (_, cand) in zip(reference, candidate)]
+        return {"agreement": 1.0, "max_score_diff": round(1.0 - min(cosines), 6)}
+
+    agreement = statistics.mean(ref[0] == cand[0] for ref, cand in zip(reference, candidate))
+    max_diff = max(
+        abs(ref[1][label] - cand[1].get(label, 0.0))
+        for ref, cand in zip(reference, candidate)
+        for label in ref[1]
+    )
+    return {"agreement": round(agreement, 4), "max_score_diff": round(max_diff, 6)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", default="onnx-int8", choices=["onnx", "onnx-int8"], help="backend to check")
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS, choices=DEFAULT_MODELS, help="models to check")
+    parser.add_argument("--min-agreement", type=float, default=0.9, help="minimum top-label agreement")
+    parser.add_argument("--max-score-diff", type=float, default=0.1, help="maximum absolute score difference")
+    args = parser.parse_args()
+
+    report, failed = {}, []
+    for name in args.models:
+        reference, torch_stats = run_backend(name, "torch")
+        candidate, backend_stats = run_backend(name, args.backend)
+        parity = compare(name, reference, candidate)
+        report[name] = {"parity": parity, "torch": torch_stats, args.backend: backend_stats,
+                        "speedup": (round(torch_stats["mean_ms"] / backend_stats["mean_ms"], 2)
+                                    if backend_stats["mean_ms"] else None)}
+        if parity["agreement"] < args.min_agreement or parity["max_score_diff"] > args.max_score_diff:
+            failed.append(name)
+
+    print(json.dumps({"backend": args.backend, "texts": len(TEXTS), "models": report, "failed": failed}, indent=4))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
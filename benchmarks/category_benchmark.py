@@ -0,0 +1,97 @@
+# benchmarks/category_benchmark.py
+"""
+Compare prefilter vs exhaustive zero-shot category classification.
+
+Usage:
+    python -m benchmarks.category_benchmark [--top-k 8] [--repeats 1]
+
+Reports, per mode: top-1 accuracy on a small labelled sample, mean / p95
+latency per text, and how often the two modes agree. Exits non-zero unless
+prefilter is at accuracy parity with exhaustive (the default mode), which
+is the bar for switching SOCION_CATEGORY_MODE to "prefilter".
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from backend.analyzer.category_classifier import classify_category_batch
+from backend.model_registry import warm_up
+
+
+# (text, acceptable labels) – several labels overlap, so any listed one counts
+SAMPLES = [
+    ("Medical advancements in cancer treatment have improved survival rates.", {"Medicine", "Health", "Public Health"}),
+    ("The striker scored twice as United came back to win the derby.", {"Sports"}),
+    ("Bitcoin rallied above its previous high as ETF inflows surged.", {"Cryptocurrency", "Investing", "Finance", "Blockchain"}),
+    ("Our new React hooks guide shows how to manage state in large apps.", {"Web Development", "Software Development", "Technology"}),
+    ("Five easy high-protein breakfasts you can prep on Sunday.", {"Food", "Nutrition", "Fitness"}),
+    ("The senate passed the bill after a long debate over spending.", {"Politics", "Legal", "Economics"}),
+    ("Sea levels are rising faster than models predicted a decade ago.", {"Climate Change", "Environment", "Oceanography"}),
+    ("We raised our seed round and are hiring our first engineers.", {"Startups", "Entrepreneurship", "Business"}),
+    ("Try this 20 minute HIIT workout without any equipment.", {"Fitness", "Wellness", "Health"}),
+    ("The museum's new exhibit explores Renaissance portrait painting.", {"Art", "History", "Culture"}),
+    ("Backpacking through Vietnam on a budget: our two-week itinerary.", {"Travel", "Tourism"}),
+    ("The new transformer model beats previous benchmarks on translation.", {"Artificial Intelligence", "Machine Learning", "Technology", "Data Science"}),
+    ("Mindfulness practice can reduce anxiety and improve sleep.", {"Mental Health", "Wellness", "Psychology", "Spirituality"}),
+    ("Phishing attacks targeting remote workers doubled last quarter.", {"Cybersecurity", "Technology"}),
+    ("This season's runway looks were dominated by oversized tailoring.", {"Fashion", "Design"}),
+    ("NASA's rover collected rock samples from an ancient river delta.", {"Space Exploration", "Science", "Geology"}),
+    ("Tips for talking to your toddler about a new sibling.", {"Parenting", "Relationships"}),
+    ("Mortgage rates fell for the third week, boosting home sales.", {"Real Estate", "Finance", "Economics", "Personal Finance"}),
+    ("The band's new album blends jazz harmonies with hip-hop beats.", {"Music", "Entertainment"}),
+    ("How we cut our warehouse delivery times by rerouting trucks.", {"Logistics", "Supply Chain", "Business"}),
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_mode(mode, top_k, repeats):
+    """Classify every sample one at a time; returns (labels, per-text latencies)."""
+    labels, latencies = [], []
+    for _ in range(repeats):
+        labels = []
+        for text, _expected in SAMPLES:
+            started = time.perf_counter()
+            label, _score = classify_category_batch([text], mode=mode, top_k=top_k)[0]
+            latencies.append(time.perf_counter() - started)
+            labels.append(label)
+    return labels, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top-k", type=int, default=8, help="shortlist size for prefilter mode")
+    parser.add_argument("--repeats", type=int, default=1, help="passes over the sample set")
+    args = parser.parse_args()
+
+    warm_up(["category", "sentence_embedder"])
+
+    report = {}
+    predictions = {}
+    for mode in ("exhaustive", "prefilter"):
+        labels, latencies = run_mode(mode, args.top_k, args.repeats)
+        predictions[mode] = labels
+        correct = sum(label in expected for label, (_text, expected) in zip(labels, SAMPLES))
+        report[mode] = {
+            "accuracy": round(correct / len(SAMPLES), 3),
+            "mean_latency_s": round(statistics.mean(latencies), 4),
+            "p95_latency_s": round(_percentile(latencies, 95), 4),
+        }
+
+    agree = sum(a == b for a, b in zip(predictions["exhaustive"], predictions["prefilter"]))
+    report["agreement"] = round(agree / len(SAMPLES), 3)
+    report["speedup"] = round(report["exhaustive"]["mean_latency_s"] / report["prefilter"]["mean_latency_s"], 2)
+    report["top_k"] = args.top_k
+    report["prefilter_at_parity"] = report["prefilter"]["accuracy"] >= report["exhaustive"]["accuracy"]
+    print(json.dumps(report, indent=4))
+    sys.exit(0 if report["prefilter_at_parity"] else 1)
+
+
+if __name__ == "__main__":
+    main()
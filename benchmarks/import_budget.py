@@ -0,0 +1,83 @@
+# benchmarks/import_budget.py
+"""
+Check that the web tier and the pipeline modules import fast and light.
+
+Usage:
+    python -m benchmarks.import_budget [--budget-s 1.0] [--modules app backend.flow ...]
+
+Imports each module in a fresh interpreter and fails (exit 1) if it takes
+longer than --budget-s or pulls in any of HEAVY_MODULES – those must only
+be imported inside the functions that use them. On failure the slowest
+imports (from `python -X importtime`) are listed to show the culprit.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+# Modules that must never load at import time of the web tier / pipeline
+HEAVY_MODULES = (
+    "torch", "transformers", "sentence_transformers", "optimum", "onnxruntime", "easyocr",
+    "numpy", "pandas", "pyarrow", "PIL", "pdfminer", "docx", "nltk", "rake_nltk", "textstat",
+    "pyphen", "bs4", "requests",
+)
+
+DEFAULT_MODULES = ["app", "backend.flow", "backend.worker"]
+DEFAULT_BUDGET_S = float(os.environ.get("SOCION_IMPORT_BUDGET_S", "1.0"))
+
+_CHILD = """
+import importlib, json, sys, time
+started = time.perf_counter()
+importlib.import_module({module!r})
+print(json.dumps({{"seconds": time.perf_counter() - started, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure(module):
+    """(seconds, heavy modules loaded, [(cumulative_us, name)] slowest first) for one import."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD.format(module=module)],
+        cwd=root, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    heavy = sorted({name.split(".")[0] for name in report["modules"]} & set(HEAVY_MODULES))
+
+    timings = []
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        timings.append((int(cumulative), name))
+    timings.sort(reverse=True)
+    return report["seconds"], heavy, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES, help="modules to import")
+    parser.add_argument("--budget-s", type=float, default=DEFAULT_BUDGET_S, help="max seconds per import")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports listed on failure")
+    args = parser.parse_args()
+
+    report, failed = {}, []
+    for module in args.modules:
+        seconds, heavy, timings = measure(module)
+        entry = {"seconds": round(seconds, 3), "heavy_modules": heavy}
+        if seconds > args.budget_s or heavy:
+            failed.append(module)
+            entry["slowest"] = [f"{name} {us / 1000:.1f}ms" for us, name in timings[:args.top]]
+        report[module] = entry
+
+    print(json.dumps({"budget_s": args.budget_s, "modules": report, "failed": failed}, indent=4))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
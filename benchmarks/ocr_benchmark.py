@@ -0,0 +1,107 @@
+# benchmarks/ocr_benchmark.py
+"""
+OCR accuracy and latency of the image preprocessing, before vs after.
+
+Usage:
+    python -m benchmarks.ocr_benchmark [--font-sizes 12 16 24] [--lines 12]
+
+Renders known text as screenshot-like images (no DPI metadata) and as
+200 DPI page renders (what hybrid PDF OCR feeds in), then OCRs each with the
+real EasyOCR pool in two modes:
+    dpi-aware   – current preprocess_image: DPI scaling only when known
+    assume-300  – the old behaviour: images without DPI treated as 300 DPI
+Reports word recall, character similarity and mean latency per mode.
+"""
+import argparse
+import difflib
+import json
+import random
+import statistics
+import time
+from collections import Counter
+
+from benchmarks.pipeline_benchmark import make_text
+
+
+RENDER_DPI = 200
+
+
+def make_image(text, font_size, dpi=None):
+    """Black-on-white image of `text`, one line per row; `dpi` is stored in its info."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:  # Pillow < 10.1 has a single bitmap size
+        font = ImageFont.load_default()
+    lines = text.split("\n")
+    line_height = int(font_size * 1.6)
+    width = int(max(font.getlength(line) for line in lines)) + 40
+    image = Image.new("L", (width, line_height * len(lines) + 40), color=255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((20, 20 + line_height * i), line, fill=0, font=font)
+    if dpi:
+        image.info["dpi"] = (dpi, dpi)
+    return image
+
+
+def build_samples(font_sizes, lines, seed):
+    """[(name, reference text, PIL image)] – screenshots per font size plus page renders."""
+    rng = random.Random(seed)
+    samples = []
+    for size in font_sizes:
+        text = "\n".join(make_text(8, rng) for _ in range(lines))
+        samples.append((f"screenshot.{size}px", text, make_image(text, size)))
+        # A 10-12pt page rendered at RENDER_DPI has glyphs of roughly this height
+        samples.append((f"pdf_render.{size}px", text, make_image(text, size * RENDER_DPI // 100, RENDER_DPI)))
+    return samples
+
+
+def word_recall(reference, recognized):
+    expected = Counter(reference.lower().split())
+    found = Counter(recognized.lower().split())
+    return sum((expected & found).values()) / max(1, sum(expected.values()))
+
+
+def run_mode(pool, samples, mode):
+    from backend.extractor.ocr_engine import preprocess_image, recognize
+
+    report = {}
+    for name, text, image in samples:
+        image = image.copy()
+        image.info = dict(image.info)
+        if mode == "assume-300" and "dpi" not in image.info:
+            image.info["dpi"] = (300, 300)
+        started = time.perf_counter()
+        recognized = recognize(pool, preprocess_image(image))
+        elapsed = time.perf_counter() - started
+        report[name] = {
+            "word_recall": round(word_recall(text, recognized), 3),
+            "char_similarity": round(difflib.SequenceMatcher(None, text, recognized).ratio(), 3),
+            "latency_s": round(elapsed, 3),
+        }
+    report["mean"] = {
+        key: round(statistics.mean(r[key] for r in report.values()), 3)
+        for key in ("word_recall", "char_similarity", "latency_s")
+    }
+    return report
+
+
+def main():
+    from backend.model_registry import get_model
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--font-sizes", nargs="+", type=int, default=[12, 16, 24], help="glyph sizes in px")
+    parser.add_argument("--lines", type=int, default=12, help="text lines per image")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pool = get_model("ocr")
+    samples = build_samples(args.font_sizes, args.lines, args.seed)
+    report = {mode: run_mode(pool, samples, mode) for mode in ("assume-300", "dpi-aware")}
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
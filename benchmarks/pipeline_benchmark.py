@@ -0,0 +1,303 @@
+# benchmarks/pipeline_benchmark.py
+"""
+Per-stage and end-to-end pipeline benchmark with regression baselines.
+
+Usage:
+    python -m benchmarks.pipeline_benchmark [--stub-models] [--sizes small medium]
+        [--types pdf docx png] [--docs 5] [--save-baseline bench.json]
+        [--baseline bench.json --threshold 0.25]
+
+Builds synthetic documents of controlled sizes and file types, then times
+every extractor, every analysis stage (category ... engagement) and the full
+main_pipeline. Reports latency percentiles, throughput and peak RSS as JSON.
+With --baseline, exits non-zero if any p50/p95 latency or the peak RSS grew
+by more than --threshold (relative) over the saved run.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+
+# Words per synthetic document
+SIZES = {"small": 300, "medium": 3000, "large": 30000}
+FILE_TYPES = ("pdf", "docx", "png")
+
+# Latencies below this (ms) are noise; they never count as regressions
+MIN_REGRESSION_MS = 2.0
+
+_VOCABULARY = (
+    "content engagement audience creators platform growth strategy analytics video post story reel "
+    "marketing brand campaign product launch customers community feedback trends algorithm reach "
+    "followers comments shares likes hashtags caption schedule consistency quality authentic voice "
+    "the a of and to in is for on with that this it as are be by our your we you their from"
+).split()
+
+_PDF_LINE_WORDS = 12
+_PDF_PAGE_LINES = 48
+
+
+# ----------------------------------------------------------------------
+# SYNTHETIC CORPUS
+# ----------------------------------------------------------------------
+def make_text(words, rng):
+    """Prose of `words` words: sentences of 8-24 words, paragraphs of 3-6 sentences."""
+    paragraphs, sentences, written = [], [], 0
+    while written < words:
+        count = min(rng.randint(8, 24), words - written)
+        sentence = " ".join(rng.choice(_VOCABULARY) for _ in range(count))
+        sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        written += count
+        if len(sentences) >= rng.randint(3, 6):
+            paragraphs.append(" ".join(sentences))
+            sentences = []
+    if sentences:
+        paragraphs.append(" ".join(sentences))
+    return "\n".join(paragraphs)
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, text):
+    """Minimal multi-page PDF (Helvetica text layer) – no extra dependencies."""
+    words = text.split()
+    lines = [" ".join(words[i:i + _PDF_LINE_WORDS]) for i in range(0, len(words), _PDF_LINE_WORDS)] or [""]
+    pages = [lines[i:i + _PDF_PAGE_LINES] for i in range(0, len(lines), _PDF_PAGE_LINES)]
+
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        body = "BT /F1 10 Tf 50 760 Td 14 TL " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in page_lines) + " ET"
+        stream = body.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % i for i in page_ids), len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path, text):
+    from docx import Document
+
+    document = Document()
+    for paragraph in text.split("\n"):
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+
+def write_png(path, text):
+    """A screenshot-like image of the first lines of `text`."""
+    from PIL import Image, ImageDraw
+
+    words = text.split()
+    lines = [" ".join(words[i:i + 10]) for i in range(0, min(len(words), 400), 10)]
+    image = Image.new("L", (1200, 24 * len(lines) + 40), color=255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((20, 20 + 24 * i), line, fill=0)
+    image.save(path)
+
+
+WRITERS = {"pdf": write_pdf, "docx": write_docx, "png": write_png}
+
+
+def build_corpus(workdir, sizes, file_types, docs, seed):
+    """{size: [(text, {file_type: path})]} of synthetic documents."""
+    rng = random.Random(seed)
+    corpus = {}
+    for size in sizes:
+        corpus[size] = []
+        for i in range(docs):
+            text = make_text(SIZES[size], rng)
+            paths = {}
+            for file_type in file_types:
+                path = os.path.join(workdir, f"{size}_{i}.{file_type}")
+                WRITERS[file_type](path, text)
+                paths[file_type] = path
+            corpus[size].append((text, paths))
+    return corpus
+
+
+# ----------------------------------------------------------------------
+# MEASUREMENT
+# ----------------------------------------------------------------------
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return usage / 2**20 if sys.platform == "darwin" else usage / 1024
+
+
+def summarize(latencies, words):
+    total = sum(latencies)
+    return {
+        "n": len(latencies),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "docs_per_s": round(len(latencies) / total, 2) if total else None,
+        "words_per_s": round(words * len(latencies) / total, 1) if total else None,
+    }
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - started
+
+
+def bench_extractors(corpus, repeats):
+    from backend.extractor.master_extractor import master_text_extractor
+
+    report = {}
+    for size, docs in corpus.items():
+        for file_type in docs[0][1]:
+            latencies = [_timed(master_text_extractor, paths[file_type])[1]
+                         for _ in range(repeats) for _, paths in docs]
+            report[f"extract.{file_type}.{size}"] = summarize(latencies, SIZES[size])
+    return report
+
+
+def bench_stages(corpus, repeats):
+    """Each stage on its own, in dependency order, uncached."""
+    from backend.flow import PIPELINE_STAGES
+
+    report = {}
+    for size, docs in corpus.items():
+        latencies = {stage["name"]: [] for stage in PIPELINE_STAGES}
+        for _ in range(repeats):
+            for text, _ in docs:
+                results = {}
+                for stage in PIPELINE_STAGES:
+                    results[stage["name"]], elapsed = _timed(stage["run"], text, results)
+                    latencies[stage["name"]].append(elapsed)
+        for name, values in latencies.items():
+            report[f"stage.{name}.{size}"] = summarize(values, SIZES[size])
+    return report
+
+
+def bench_pipeline(corpus, repeats):
+    """main_pipeline end to end (result cache off) on the first file type."""
+    from backend.flow import main_pipeline
+
+    report = {}
+    for size, docs in corpus.items():
+        file_type = next(iter(docs[0][1]))
+        latencies = []
+        for _ in range(repeats):
+            for _, paths in docs:
+                started = time.perf_counter()
+                for _ in main_pipeline(paths[file_type]):
+                    pass
+                latencies.append(time.perf_counter() - started)
+        report[f"pipeline.{file_type}.{size}"] = summarize(latencies, SIZES[size])
+    return report
+
+
+def find_regressions(current, baseline, threshold):
+    """Human-readable regressions of `current` vs `baseline` (empty if none)."""
+    regressions = []
+    for key, metrics in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            now, before = metrics[metric], base[metric]
+            if now - before > MIN_REGRESSION_MS and now > before * (1 + threshold):
+                regressions.append(f"{key} {metric}: {before} -> {now} ms")
+    before_rss, now_rss = baseline.get("peak_rss_mb"), current["peak_rss_mb"]
+    if before_rss and now_rss > before_rss * (1 + threshold):
+        regressions.append(f"peak_rss_mb: {before_rss} -> {now_rss}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stub-models", action="store_true", help="use offline stub models")
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium"], choices=sorted(SIZES))
+    parser.add_argument("--types", nargs="+", default=list(FILE_TYPES), choices=FILE_TYPES)
+    parser.add_argument("--docs", type=int, default=5, help="documents per size")
+    parser.add_argument("--repeats", type=int, default=1, help="passes over the corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip", nargs="*", default=[], choices=["extract", "stages", "pipeline"])
+    parser.add_argument("--save-baseline", help="write this run's report to a JSON file")
+    parser.add_argument("--baseline", help="compare against a saved report")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="socion-bench-")
+    # Isolate caches so every run measures real work
+    os.environ["SOCION_RESULT_CACHE"] = "0"
+    os.environ["SOCION_CACHE_DIR"] = os.path.join(workdir, "cache")
+    os.environ["SOCION_HASHTAG_CACHE_DB"] = os.path.join(workdir, "hashtags.sqlite3")
+
+    try:
+        if args.stub_models:
+            from benchmarks.stub_models import install_stub_models
+            install_stub_models()
+        else:
+            from backend.model_registry import warm_up
+            warm_up()
+
+        corpus = build_corpus(workdir, args.sizes, args.types, args.docs, args.seed)
+        results = {}
+        if "extract" not in args.skip:
+            results.update(bench_extractors(corpus, args.repeats))
+        if "stages" not in args.skip:
+            results.update(bench_stages(corpus, args.repeats))
+        if "pipeline" not in args.skip:
+            results.update(bench_pipeline(corpus, args.repeats))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "config": {"stub_models": args.stub_models, "sizes": args.sizes, "types": args.types,
+                   "docs": args.docs, "repeats": args.repeats, "seed": args.seed},
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = find_regressions(report, json.load(f), args.threshold)
+        report["regressions"] = regressions
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=4))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/readability_benchmark.py
+"""
+Compare the single-pass readability engine with per-metric textstat calls.
+
+Usage:
+    python -m benchmarks.readability_benchmark [--sizes-mb 0.1 1 4] [--seed 0]
+
+For each synthetic text size, reports wall time for both implementations,
+the speedup, and the largest absolute score difference per metric.
+"""
+import argparse
+import json
+import random
+import time
+
+import textstat
+
+from backend.analyzer.readability_analyzer import analyze_readability
+
+
+_WORDS = (
+    "the quick brown fox jumps over lazy dog readability scores depend on sentence length "
+    "and syllables per word extraordinarily complicated vocabulary makes comprehension harder "
+    "social media content analysis engagement isn't easy it's surprisingly unpredictable "
+    "internationalization state-of-the-art naive approaches Dr. Smith U.S.A. 3.5 percent"
+).split()
+
+_TEXTSTAT_METRICS = {
+    "flesch_reading_ease": textstat.flesch_reading_ease,
+    "flesch_kincaid_grade": textstat.flesch_kincaid_grade,
+    "gunning_fog": textstat.gunning_fog,
+    "smog_index": textstat.smog_index,
+    "automated_readability_index": textstat.automated_readability_index,
+    "coleman_liau_index": textstat.coleman_liau_index,
+    "lix": textstat.lix,
+    "reading_time_seconds": textstat.reading_time,
+}
+
+
+def make_text(size_bytes, rng):
+    """Synthetic prose of roughly `size_bytes` characters."""
+    parts, size = [], 0
+    while size < size_bytes:
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 30)))
+        sentence = sentence[0].upper() + sentence[1:] + rng.choice(".!?")
+        parts.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(parts)
+
+
+def run_size(size_mb, rng):
+    text = make_text(int(size_mb * 1024 * 1024), rng)
+
+    started = time.perf_counter()
+    reference = {name: fn(text) for name, fn in _TEXTSTAT_METRICS.items()}
+    textstat_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores = analyze_readability(text)
+    engine_s = time.perf_counter() - started
+
+    return {
+        "size_mb": size_mb,
+        "textstat_s": round(textstat_s, 3),
+        "engine_s": round(engine_s, 3),
+        "speedup": round(textstat_s / engine_s, 2) if engine_s else None,
+        "max_abs_diff": {name: abs(reference[name] - scores[name]) for name in reference},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[0.1, 1, 4], help="text sizes to test")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the synthetic text")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    report = [run_size(size_mb, rng) for size_mb in args.sizes_mb]
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# benchmarks/stub_models.py
+"""
+Offline stand-ins for every registry model, for benchmarking the pipeline
+without downloads or GPU/CPU-heavy inference.
+
+Each stub answers with the same shapes as the real model and does a small
+amount of work proportional to its input (hashing it), so the rest of the
+pipeline – batching, caching, aggregation – is exercised for real.
+"""
+import hashlib
+import re
+from contextlib import contextmanager
+
+
+EMBEDDING_DIM = 32
+
+# Small English stopword list so keyword extraction needs no NLTK data
+STOPWORDS = (
+    "a an and are as at be but by for from has have he her his i in is it its of on or our "
+    "she so that the their them they this to was we were what when which who will with you your"
+).split()
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _unit_floats(text, count):
+    """`count` deterministic floats in [0, 1) derived from a hash of `text`."""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=64).digest()
+    while len(digest) < count:
+        digest += hashlib.blake2b(digest, digest_size=64).digest()
+    return [b / 256.0 for b in digest[:count]]
+
+
+class StubSentimentPipeline:
+    def __call__(self, texts, batch_size=16, truncation=True, **kwargs):
+        single = isinstance(texts, str)
+        results = []
+        for text in [texts] if single else texts:
+            score = 0.5 + _unit_floats(text, 1)[0] / 2
+            label = "POSITIVE" if _unit_floats(text[::-1], 1)[0] >= 0.5 else "NEGATIVE"
+            results.append({"label": label, "score": score})
+        return results[0] if single else results
+
+
+class StubEmotionPipeline:
+    LABELS = ["sadness", "joy", "love", "anger", "fear", "surprise"]
+
+    def __call__(self, texts, batch_size=16, truncation=True, **kwargs):
+        results = []
+        for text in texts:
+            raw = _unit_floats(text, len(self.LABELS))
+            total = sum(raw) or 1.0
+            results.append([{"label": label, "score": value / total} for label, value in zip(self.LABELS, raw)])
+        return results
+
+
+class _StubNLITokenizer:
+    def __call__(self, premises, hypotheses, **kwargs):
+        return {"pairs": list(zip(premises, hypotheses))}
+
+
+class _StubNLIModel:
+    class config:
+        label2id = {"contradiction": 0, "neutral": 1, "entailment": 2}
+
+    def __call__(self, pairs):
+        import numpy as np
+        from types import SimpleNamespace
+
+        logits = np.array([_unit_floats(premise + "|" + hypothesis, 3) for premise, hypothesis in pairs]) * 4 - 2
+        return SimpleNamespace(logits=logits)
+
+
+class StubZeroShotPipeline:
+    # Used directly by the batched multi-label path of the category prefilter
+    model = _StubNLIModel()
+    tokenizer = _StubNLITokenizer()
+
+    def _classify(self, text, labels):
+        raw = _unit_floats(text + "|".join(labels), len(labels))
+        total = sum(raw) or 1.0
+        ranked = sorted(zip(labels, raw), key=lambda pair: pair[1], reverse=True)
+        return {"sequence": text, "labels": [l for l, _ in ranked], "scores": [v / total for _, v in ranked]}
+
+    def __call__(self, texts, candidate_labels, batch_size=8, **kwargs):
+        if isinstance(texts, str):
+            return self._classify(texts, list(candidate_labels))
+        return [self._classify(text, list(candidate_labels)) for text in texts]
+
+
+class StubAIDetector:
+    def detect_ai(self, text):
+        return self.detect_ai_batch([text])[0]
+
+    def detect_ai_batch(self, texts, batch_size=16):
+        return [{"ai_generated_probability": _unit_floats(text, 1)[0]} for text in texts]
+
+
+class StubSentenceEmbedder:
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, convert_to_tensor=False,
+               normalize_embeddings=False, **kwargs):
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        vectors = np.array([_unit_floats(s, EMBEDDING_DIM) for s in ([sentences] if single else sentences)],
+                           dtype=np.float32) - 0.5
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        return vectors[0] if single else vectors
+
+
+class _StubReader:
+    def readtext(self, image, detail=0, batch_size=1, **kwargs):
+        digest = hashlib.blake2b(image.tobytes(), digest_size=8).hexdigest()
+        return [f"ocr text {digest}"]
+
+
+class StubOCRPool:
+    size = 1
+
+    @contextmanager
+    def reader(self):
+        yield _StubReader()
+
+
+def stub_scrape_best_hashtags(keyword):
+    """Offline stand-in for the hashtag scraper: a few tags derived from `keyword`."""
+    word = re.sub(r"\W+", "", keyword.lower()) or "tag"
+    return [f"#{word}", f"#{word}tips", f"#{word}daily", f"#best{word}", f"#{word}community"]
+
+
+STUB_LOADERS = {
+    "sentiment": StubSentimentPipeline,
+    "emotion": StubEmotionPipeline,
+    "category": StubZeroShotPipeline,
+    "ai_detector": StubAIDetector,
+    "sentence_embedder": StubSentenceEmbedder,
+    "ocr": StubOCRPool,
+}
+
+
+def install_stub_models():
+    """
+    Register the stubs with the model registry and make the text analyzers
+    run without downloaded data (no sliding-window chunking, which needs a
+    real tokenizer; built-in stopwords and sentence splitting for RAKE).
+    Hashtag scraping is stubbed too, so nothing touches the network.
+    """
+    from backend import model_registry
+    from backend.analyzer import emotion_detection, keyword_extractor, sentiment_analyzer
+    from backend.analyzer.hashtage_generator import hashtag_suggestor
+
+    for name, stub in STUB_LOADERS.items():
+        model_registry.register_loader(name, lambda backend=None, stub=stub: stub())
+
+    sentiment_analyzer.CHUNK_LONG_TEXTS = False
+    emotion_detection.CHUNK_LONG_TEXTS = False
+    keyword_extractor._engine = keyword_extractor.KeywordEngine(
+        stopwords=STOPWORDS,
+        sentence_tokenizer=_SENTENCE_RE.split,
+        corpus=keyword_extractor.KeywordCorpus(),
+    )
+    hashtag_suggestor.scrape_best_hashtags = stub_scrape_best_hashtags
+    return sorted(STUB_LOADERS)
@@ -0,0 +1,48 @@
+# benchmarks/test_backend_parity.py
+"""
+Opt-in pytest version of benchmarks.backend_parity.
+
+Usage:
+    SOCION_PARITY_TESTS=1 python -m pytest benchmarks/test_backend_parity.py
+
+Downloads / exports every model, so it only runs when SOCION_PARITY_TESTS=1;
+it is skipped when torch, transformers, sentence-transformers, optimum or
+onnxruntime is missing, or when a model can't be loaded (e.g. offline).
+Thresholds match the CLI defaults.
+"""
+import os
+
+import pytest
+
+if os.environ.get("SOCION_PARITY_TESTS", "0") != "1":
+    pytest.skip("set SOCION_PARITY_TESTS=1 to run the ONNX parity checks", allow_module_level=True)
+
+for _module in ("torch", "transformers", "sentence_transformers", "optimum.onnxruntime", "onnxruntime"):
+    pytest.importorskip(_module)
+
+from benchmarks.backend_parity import DEFAULT_MODELS, compare, run_backend  # noqa: E402
+
+
+MIN_AGREEMENT = float(os.environ.get("SOCION_PARITY_MIN_AGREEMENT", "0.9"))
+MAX_SCORE_DIFF = float(os.environ.get("SOCION_PARITY_MAX_SCORE_DIFF", "0.1"))
+
+_reference = {}
+
+
+def _run(name, backend):
+    try:
+        outputs, _ = run_backend(name, backend)
+    except (OSError, ImportError) as e:
+        pytest.skip(f"{name} unavailable on {backend}: {e}")
+    return outputs
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+@pytest.mark.parametrize("name", DEFAULT_MODELS)
+def test_backend_matches_torch(name, backend):
+    if name not in _reference:
+        _reference[name] = _run(name, "torch")
+    parity = compare(name, _reference[name], _run(name, backend))
+
+    assert parity["agreement"] >= MIN_AGREEMENT, parity
+    assert parity["max_score_diff"] <= MAX_SCORE_DIFF, parity
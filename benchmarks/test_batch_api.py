@@ -0,0 +1,84 @@
+# benchmarks/test_batch_api.py
+"""
+/batch end to end through Flask's test client, on the offline stub models.
+
+Usage:
+    python -m pytest benchmarks/test_batch_api.py
+
+Skipped when Flask or the text-analysis dependencies aren't installed.
+"""
+import io
+import json
+import os
+import tempfile
+
+import pytest
+
+pytest.importorskip("flask")
+
+_workdir = tempfile.mkdtemp(prefix="socion-test-")
+# Isolated state; read when the backend modules are imported
+os.environ.setdefault("SOCION_JOBS_DB", os.path.join(_workdir, "jobs.sqlite3"))
+os.environ.setdefault("SOCION_CACHE_DIR", os.path.join(_workdir, "cache"))
+os.environ.setdefault("SOCION_HASHTAG_CACHE_DB", os.path.join(_workdir, "hashtags.sqlite3"))
+os.environ.setdefault("SOCION_RESULT_CACHE", "0")
+
+try:
+    import app as web
+    from benchmarks.stub_models import install_stub_models
+except ImportError as e:
+    pytest.skip(f"app dependencies unavailable: {e}", allow_module_level=True)
+
+
+DOCUMENTS = [
+    {"id": "a", "text": "Creators grow their audience with consistent, authentic video content."},
+    {"id": "b", "text": "Our product launch campaign reached new customers across every platform."},
+]
+
+
+@pytest.fixture(scope="module")
+def client():
+    install_stub_models()
+    return web.app.test_client()
+
+
+def _events(response):
+    """[(event, data)] parsed from an SSE response body."""
+    events = []
+    for block in response.get_data(as_text=True).split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in fields:
+            events.append((fields["event"], fields.get("data")))
+    return events
+
+
+def _documents(events):
+    return [json.loads(data) for event, data in events if event == "document"]
+
+
+def test_batch_texts_part_streams_per_document_results(client):
+    body = "\n".join(json.dumps(doc) for doc in DOCUMENTS) + "\nnot json\n"
+    response = client.post(
+        "/batch?profile=quick",
+        data={"texts": (io.BytesIO(body.encode("utf-8")), "texts.jsonl")},
+        content_type="multipart/form-data",
+    )
+    events = _events(response)
+    documents = _documents(events)
+
+    assert [event for event, _ in events if event == "error"] == []
+    assert events[-1][0] == "done"
+    assert [doc["id"] for doc in documents] == ["a", "b", 3]
+    assert all("result" in doc for doc in documents[:2])
+    assert "error" in documents[2]
+    # The stored JSONL is removed once the stream ends
+    assert not [name for name in os.listdir(web.UPLOAD_FOLDER) if name.endswith("_texts.jsonl")]
+
+
+def test_batch_ndjson_body(client):
+    body = "\n".join(json.dumps(doc) for doc in DOCUMENTS)
+    response = client.post("/batch?profile=quick", data=body, content_type="application/x-ndjson")
+    documents = _documents(_events(response))
+
+    assert [doc["id"] for doc in documents] == ["a", "b"]
+    assert all(doc["result"]["metadata"]["failed_stages"] == [] for doc in documents)
@@ -0,0 +1,28 @@
+# benchmarks/test_import_budget.py
+"""
+Opt-in pytest version of benchmarks.import_budget.
+
+Usage:
+    SOCION_IMPORT_BUDGET_TESTS=1 python -m pytest benchmarks/test_import_budget.py
+
+Imports each of DEFAULT_MODULES in a fresh interpreter; wall-clock timings
+depend on the machine, so it only runs when SOCION_IMPORT_BUDGET_TESTS=1.
+The budget is SOCION_IMPORT_BUDGET_S, as for the CLI.
+"""
+import os
+
+import pytest
+
+if os.environ.get("SOCION_IMPORT_BUDGET_TESTS", "0") != "1":
+    pytest.skip("set SOCION_IMPORT_BUDGET_TESTS=1 to run the import budget checks", allow_module_level=True)
+
+from benchmarks.import_budget import DEFAULT_BUDGET_S, DEFAULT_MODULES, measure  # noqa: E402
+
+
+@pytest.mark.parametrize("module", DEFAULT_MODULES)
+def test_import_is_light_and_fast(module):
+    seconds, heavy, timings = measure(module)
+    slowest = [f"{name} {us / 1000:.1f}ms" for us, name in timings[:10]]
+
+    assert heavy == [], f"{module} imports {heavy} at import time"
+    assert seconds <= DEFAULT_BUDGET_S, f"{module} took {seconds:.3f}s; slowest: {slowest}"
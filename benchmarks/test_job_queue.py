@@ -0,0 +1,58 @@
+# benchmarks/test_job_queue.py
+"""
+Job queue deadlines and stale-job recovery on a throwaway jobs DB.
+
+Usage:
+    python -m pytest benchmarks/test_job_queue.py
+"""
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="socion-test-")
+# Read when backend.jobs is imported
+os.environ.setdefault("SOCION_JOBS_DB", os.path.join(_workdir, "jobs.sqlite3"))
+
+from backend import jobs  # noqa: E402
+
+
+def _running_job(worker_id):
+    upload = os.path.join(_workdir, f"{worker_id}.upload")
+    with open(upload, "w") as f:
+        f.write("text")
+    job_id = jobs.enqueue_job(upload)
+    jobs.heartbeat(worker_id, ready=True)
+    assert jobs.claim_next_job(worker_id)["id"] == job_id
+    return job_id, upload
+
+
+def test_job_past_deadline_is_failed_and_keeps_that_outcome():
+    job_id, upload = _running_job("worker-deadline")
+    assert jobs.fail_overdue_jobs(timeout=60) == 0
+
+    jobs.get_connection().execute("UPDATE jobs SET started_at = started_at - 120 WHERE id = ?", (job_id,))
+    assert jobs.fail_overdue_jobs(timeout=60) == 1
+    assert jobs.get_job(job_id)["status"] == jobs.FAILED
+    assert not os.path.exists(upload)
+    # The hung worker finishing late doesn't overwrite the failure
+    assert jobs.finish_job(job_id, jobs.DONE) is False
+    assert jobs.get_job(job_id)["status"] == jobs.FAILED
+    assert {"error": "timeout"} in [payload for _, payload in jobs.consume_job_metrics()]
+
+
+def test_job_metrics_are_consumed_once():
+    jobs.consume_job_metrics()
+    jobs.record_job_metrics("job-a", {"error": "no_text"})
+    jobs.record_job_metrics("job-b", {"metadata": {}})
+
+    assert [payload for _, payload in jobs.consume_job_metrics(limit=1)] == [{"error": "no_text"}]
+    assert [payload for _, payload in jobs.consume_job_metrics()] == [{"metadata": {}}]
+    assert jobs.consume_job_metrics() == []
+
+
+def test_job_of_dead_worker_is_requeued():
+    job_id, _ = _running_job("worker-dead")
+    assert jobs.requeue_stale_jobs(max_age=60) == 0
+
+    jobs.get_connection().execute("UPDATE workers SET heartbeat = heartbeat - 120 WHERE id = ?", ("worker-dead",))
+    assert jobs.requeue_stale_jobs(max_age=60) == 1
+    assert jobs.get_job(job_id)["status"] == jobs.QUEUED